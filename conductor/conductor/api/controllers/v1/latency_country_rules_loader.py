@@ -38,7 +38,8 @@ LOG = log.getLogger(__name__)
 class LatencyCountryRulesBaseController(object):
 
     def load(self, args):
-        latency_dataloader.LatencyDataLoader().load_into_country_letancy(args)
+        if not latency_dataloader.LatencyDataLoader().load_into_country_letancy(args):
+            return None
 
         response = "OK"
 
@@ -38,7 +38,8 @@ LOG = log.getLogger(__name__)
 class LatencyLoaderBaseController(object):
 
     def load(self, args):
-        latency_dataloader.LatencyDataLoader().load_into_rph(args)
+        if not latency_dataloader.LatencyDataLoader().load_into_rph(args):
+            return None
 
         response = "OK"
 
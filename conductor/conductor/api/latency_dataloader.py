@@ -17,102 +17,56 @@
 # -------------------------------------------------------------------------
 #
 
-import csv
+import collections
+
 from oslo_config import cfg
 from oslo_log import log
-import collections
-import json
-from conductor.common.models.region_placeholders import RegionPlaceholders
+
 from conductor.common.models.country_latency import CountryLatency
-from conductor.common.music import api
+from conductor.common.models.region_placeholders import RegionPlaceholders
+from conductor.common.models.table_version import TableVersion
 from conductor.common.music.model import base
 
 CONF = cfg.CONF
 LOG = log.getLogger(__name__)
 
-class LatencyDataLoader(object):
 
-    def __init__(self):
-        self.Region_PlaceHolder = base.create_dynamic_model(keyspace=CONF.keyspace, baseclass=RegionPlaceholders, classname="RegionPlaceholders")
-        self.Country_Latency = base.create_dynamic_model(keyspace=CONF.keyspace, baseclass=CountryLatency,classname="CountryLatency")
+class LatencyDataLoader(object):
+    """Loads the latency rules uploaded by an operator
 
+    Each upload replaces the rows of a table with a new generation of
+    them, written in bulk, and made visible at once through the version
+    of the table (see TableVersion.reload).
+    """
 
+    def __init__(self):
+        self.Region_PlaceHolder = base.create_dynamic_model(
+            keyspace=CONF.keyspace, baseclass=RegionPlaceholders, classname="RegionPlaceholders")
+        self.Country_Latency = base.create_dynamic_model(
+            keyspace=CONF.keyspace, baseclass=CountryLatency, classname="CountryLatency")
+        self.Table_Version = base.create_dynamic_model(
+            keyspace=CONF.keyspace, baseclass=TableVersion, classname="TableVersion")
 
     # load data into region place holder
     def load_into_rph(self, data):
-         LOG.debug("load_into_rph")
-         datamap = collections.OrderedDict()
-         group_map = collections.OrderedDict()
-         datamap = data #= json.loads(json_data)
-
-         region_placeholders = self.Region_PlaceHolder.query.all()
-         regions_id_list = list()
-         for region in region_placeholders:
-             regions_id_list.append(region.id)
-
-         LOG.debug("Removing all existing data from region place holders table")
-         for region_id in regions_id_list:
-             replace_holder_row = self.Region_PlaceHolder()
-             LOG.debug("Removing "+region_id)
-             response = replace_holder_row.delete(region_id)
-             LOG.debug("Removed " +str(response) )
-
-
-
-         for i, j in enumerate(datamap):
-             group_map[j['group']] = j['countries']
-
-         LOG.debug("inserting data into region place holders table")
-         for k, v in group_map.items():
-            group = k
-            countries = {k:v}
-            LOG.debug("inserting region "+group)
-            replace_holder_row = self.Region_PlaceHolder(group,countries)
-            response = replace_holder_row.insert()
-            LOG.debug("inserted " + str(response))
+        LOG.debug("load_into_rph")
+        group_map = collections.OrderedDict()
+        for row in data:
+            group_map[row['group']] = row['countries']
 
+        LOG.debug("Replacing the region place holders with {} groups".format(len(group_map)))
+        return self.Table_Version.reload(self.Region_PlaceHolder, [
+            self.Region_PlaceHolder(group, {group: countries})
+            for group, countries in group_map.items()])
 
     def load_into_country_letancy(self, data):
-         LOG.debug("load_into_country_letancy")
-         datamap = collections.OrderedDict() # Ordered Dict because the order of rows is important
-         group_map = collections.OrderedDict()
-         datamap = data#json.loads(data)
-
-
-         #before inserting the new data, remove the existing data from the country_latency table
-         country_latency_data = self.Country_Latency.query.all()
-         country_id_list = list()
-         for country in country_latency_data:
-             country_id_list.append(country.id)
-
-         LOG.debug("Removing all existing data from country latency table")
-         for country_id in country_id_list:
-             replace_holder_row = self.Country_Latency()
-             LOG.debug("removing " + country_id)
-             response = replace_holder_row.delete(country_id)
-             LOG.debug("removed " + str(response))
-
-
-
-
-         for i, j in enumerate(datamap):
-             group_map[j['country_name']] = j['groups']
-
-         LOG.debug("inserting data into country latency table")
-         for k, v in group_map.items():
-             country_name = k
-             group = list()
-             for g in v.split('|'):
-                 group.append(g)
-
-             groups = group
-             LOG.debug("inserting country " + country_name)
-             country_rules_holder_row = self.Country_Latency(country_name,groups)
-             response = country_rules_holder_row.insert();
-             LOG.debug("inserted " + str(response))
-
-
-
-
-
-
+        LOG.debug("load_into_country_letancy")
+        # Ordered Dict because the order of rows is important
+        group_map = collections.OrderedDict()
+        for row in data:
+            group_map[row['country_name']] = row['groups']
+
+        LOG.debug("Replacing the country latency rules with {} countries".format(len(group_map)))
+        return self.Table_Version.reload(self.Country_Latency, [
+            self.Country_Latency(country_name, groups.split('|'))
+            for country_name, groups in group_map.items()])
@@ -32,6 +32,13 @@ DB_BACKEND_OPTS = [
     cfg.BoolOpt('music_mock',
                 default=False,
                 help='use mock api.'),
+    cfg.StrOpt('json_codec',
+               default='auto',
+               choices=['auto', 'orjson', 'json'],
+               help='Codec of the JSON columns (e.g. plan translations '
+                    'and solutions, message arguments and responses). '
+                    'auto uses orjson when installed, json the standard '
+                    'library.'),
 ]
 
 CONF.register_opts(DB_BACKEND_OPTS, group='db_options')
@@ -19,9 +19,11 @@
 
 import copy
 import etcd3
+from etcd3 import events
 from grpc import RpcError
 import json
 from oslo_config import cfg
+import threading
 
 from conductor.common.etcd.utils import EtcdClientException
 from conductor.common.etcd.utils import validate_schema
@@ -42,6 +44,11 @@ ETCD_API_OPTS = [
     cfg.StrOpt('password',
                default='root',
                help='Password for authentication'),
+    cfg.IntOpt('max_txn_ops',
+               default=128,
+               min=1,
+               help='Maximum number of operations in a transaction, as '
+                    'configured on the etcd server (--max-txn-ops)'),
 ]
 
 CONF.register_opts(ETCD_API_OPTS, group='etcd_api')
@@ -49,6 +56,9 @@ CONF.register_opts(ETCD_API_OPTS, group='etcd_api')
 
 class EtcdAPI(object):
 
+    # Rows are read with the given columns only, see Query.defer
+    reads_columns = True
+
     def __init__(self):
         self.host = CONF.etcd_api.host
         self.port = CONF.etcd_api.port
@@ -118,27 +128,162 @@ class EtcdAPI(object):
     def row_update(self, keyspace, table, pk_name, pk_value, values, atomic=False, condition=True):
         key = f'{keyspace}/{table}/{pk_value}'
 
-        values[pk_name] = pk_value
         client = self.get_client()
-        if client.get(key) and self.validate_row(keyspace, table, values):
-            put_response = client.put(key, json.dumps(values))
+        raw_value = client.get(key)[0]
+        if not raw_value:
+            return "FAILURE"
+
+        # Like an update in MUSIC, only the given columns change
+        row = json.loads(raw_value)
+        row.update(values)
+        row[pk_name] = pk_value
+        if self.validate_row(keyspace, table, row):
+            put_response = client.put(key, json.dumps(row))
             return "SUCCESS" if put_response else "FAILURE"
 
         return "FAILURE"
 
-    def row_read(self, keyspace, table, pk_name=None, pk_value=None):
+    def row_read(self, keyspace, table, pk_name=None, pk_value=None, columns=None):
         schema = self.get_value(f'{keyspace}/{table}')
         if pk_name and pk_value and schema["PRIMARY KEY"] == f'({pk_name})':
             key = f'{keyspace}/{table}/{pk_value}'
-            return {pk_value: self.get_value(key)}
+            rows = {pk_value: self.get_value(key)}
+        else:
+            key_prefix = f'{keyspace}/{table}/'
+            rows = self.get_values_prefix(key_prefix, pk_name, pk_value)
 
-        key_prefix = f'{keyspace}/{table}/'
-        return self.get_values_prefix(key_prefix, pk_name, pk_value)
+        if columns:
+            # etcd stores rows as whole values, leave out the other columns
+            rows = dict((row_key, dict((c, row[c]) for c in columns if c in row))
+                        for row_key, row in rows.items() if row is not None)
+        return rows
 
     def row_delete(self, keyspace, table, pk_name, pk_value, atomic=False):
         key = f'{keyspace}/{table}/{pk_value}'
         self.get_client().delete(key)
 
+    def row_watch(self, keyspace, table, pk_value, condition, timeout):
+        """Block until the row satisfies condition or timeout elapses.
+
+        condition is a callable taking the row values. Returns True if the
+        row satisfied the condition (or was deleted) before the timeout.
+        """
+        key = f'{keyspace}/{table}/{pk_value}'
+        changed = threading.Event()
+
+        def _callback(response):
+            # Watch errors are handed to the callback as exceptions. Wake up
+            # the waiter so the caller can fall back to reading the row.
+            if isinstance(response, Exception):
+                changed.set()
+                return
+            for event in response.events:
+                if isinstance(event, events.DeleteEvent) or \
+                        condition(json.loads(event.value)):
+                    changed.set()
+
+        client = self.get_client()
+        watch_id = client.add_watch_callback(key, _callback)
+        try:
+            # Read after the watch is registered so a change that landed
+            # in between is not missed.
+            raw_value = client.get(key)[0]
+            if not raw_value or condition(json.loads(raw_value)):
+                return True
+            return changed.wait(timeout)
+        finally:
+            client.cancel_watch(watch_id)
+            client.close()
+
+    def _transact(self, client, operations):
+        """Run the operations in as few transactions as etcd allows"""
+        size = CONF.etcd_api.max_txn_ops
+        for start in range(0, len(operations), size):
+            succeeded, _ = client.transaction(
+                compare=[], success=operations[start:start + size], failure=[])
+            if not succeeded:
+                return False
+        return True
+
+    def rows_create(self, keyspace, table, pk_name, rows):
+        """Create many rows, in transactions of max_txn_ops rows"""
+        client = self.get_client()
+        schema = json.loads(client.get(f'{keyspace}/{table}')[0])
+        puts = []
+        for values in rows:
+            if not validate_schema(values, schema):
+                return False
+            key = f'{keyspace}/{table}/{values[pk_name]}'
+            puts.append(client.transactions.put(key, json.dumps(values)))
+        return self._transact(client, puts)
+
+    def rows_delete(self, keyspace, table, pk_name, pk_values):
+        """Delete many rows, in transactions of max_txn_ops rows"""
+        client = self.get_client()
+        return self._transact(client, [
+            client.transactions.delete(f'{keyspace}/{table}/{pk_value}')
+            for pk_value in pk_values])
+
+    def rows_read(self, keyspace, table, pk_name, pk_values, columns=None):
+        """Read the rows with the given primary keys, max_txn_ops at a time
+
+        Returns the rows found by primary key.
+        """
+        rows = {}
+        for (pk_value, value, _) in self._get_many(
+                self.get_client(), keyspace, table, pk_values):
+            row = json.loads(value)
+            if columns:
+                row = dict((c, row[c]) for c in columns if c in row)
+            rows[pk_value] = row
+        return rows
+
+    def _get_many(self, client, keyspace, table, pk_values):
+        """Yield the primary key, value and version of the rows found"""
+        pk_values = list(pk_values)
+        size = CONF.etcd_api.max_txn_ops
+        for start in range(0, len(pk_values), size):
+            chunk = pk_values[start:start + size]
+            _, responses = client.transaction(
+                compare=[], failure=[],
+                success=[client.transactions.get(f'{keyspace}/{table}/{pk_value}')
+                         for pk_value in chunk])
+            for pk_value, response in zip(chunk, responses):
+                for value, metadata in response:
+                    yield pk_value, value, metadata.version
+
+    def rows_insert_by_condition(self, keyspace, table, pk_name, rows, exists_status):
+        """Insert many rows with certain condition, max_txn_ops at a time
+
+        Each chunk of rows is put in one transaction, which only succeeds
+        if none of its rows was created or deleted since they were read.
+        Otherwise the rows of the chunk are inserted one at a time.
+        """
+        client = self.get_client()
+        size = CONF.etcd_api.max_txn_ops
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
+            existing = set(pk_value for pk_value, _, _ in self._get_many(
+                client, keyspace, table, [values[pk_name] for values in chunk]))
+            compare = []
+            puts = []
+            for values in chunk:
+                pk_value = values[pk_name]
+                key = f'{keyspace}/{table}/{pk_value}'
+                values = dict(values)
+                if pk_value in existing:
+                    compare.append(client.transactions.version(key) > 0)
+                    values["status"] = exists_status
+                else:
+                    compare.append(client.transactions.version(key) == 0)
+                puts.append(client.transactions.put(key, json.dumps(values)))
+            succeeded, _ = client.transaction(compare=compare, success=puts, failure=[])
+            if not succeeded:
+                for values in chunk:
+                    self.row_insert_by_condition(keyspace, table, pk_name, values[pk_name],
+                                                 dict(values), exists_status)
+        return True
+
     def row_insert_by_condition(self, keyspace, table, pk_name, pk_value, values, exists_status):
         key = f'{keyspace}/{table}/{pk_value}'
         values[pk_name] = pk_value
@@ -89,6 +89,14 @@ class OrderLock(base.Base):
                 self.__keyspace__, self.__tablename__, self.pk_name(),
                 self.pk_value(), self.values(), self.PARKED)
 
+    @classmethod
+    def insert_many(cls, rows):
+        """Insert order locks in bulk, parking the plans of existing ones"""
+        return \
+            db_backend.DB_API.rows_insert_by_condition(
+                cls.__keyspace__, cls.__tablename__, cls.pk_name(),
+                [row.values() for row in rows], cls.PARKED)
+
     def __init__(self, id=None, plans=None, is_spinup_completed=False, spinup_completed_timestamp=None, _insert=False):
         """Initializer"""
         super(OrderLock, self).__init__()
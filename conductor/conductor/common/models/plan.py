@@ -19,7 +19,6 @@
 
 """Plan Model"""
 
-import json
 import time
 
 from conductor.common.models import validate_uuid4
@@ -60,9 +59,9 @@ class Plan(base.Base):
     solver_counter = None
     reservation_owner = None
     reservation_counter = None
-    template = None
-    translation = None
-    solution = None
+    template = base.JSONPayload('template')
+    translation = base.JSONPayload('translation')
+    solution = base.JSONPayload('solution')
 
     # Status
     TEMPLATE = "template"  # Template ready for translation
@@ -87,6 +86,9 @@ class Plan(base.Base):
     WORKING = [TEMPLATE, TRANSLATING, SOLVING, RESERVING, ]
     FINISHED = [TRANSLATED, SOLVED, NOT_FOUND, ERROR, DONE, WAITING_SPINUP]
 
+    # JSON columns, left out when polling plans (see Query.defer)
+    PAYLOADS = ('template', 'translation', 'solution')
+
     @classmethod
     def schema(cls):
         """Return schema."""
@@ -190,9 +192,9 @@ class Plan(base.Base):
             'timeout': self.timeout,
             'recommend_max': self.recommend_max,
             'message': self.message,
-            'template': json.dumps(self.template),
-            'translation': json.dumps(self.translation),
-            'solution': json.dumps(self.solution),
+            'template': self.encoded('template'),
+            'translation': self.encoded('translation'),
+            'solution': self.encoded('solution'),
             'translation_owner': self.translation_owner,
             'translation_counter': self.translation_counter,
             'translation_begin_timestamp': self.translation_begin_timestamp,
@@ -239,9 +241,11 @@ class Plan(base.Base):
             self.solution = solution or {}
             self.insert()
         else:
-            self.template = json.loads(template)
-            self.translation = json.loads(translation)
-            self.solution = json.loads(solution)
+            self._raw_payloads = {
+                'template': template,
+                'translation': translation,
+                'solution': solution,
+            }
 
     def __repr__(self):
         """Object representation"""
@@ -0,0 +1,158 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2018 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+import uuid
+
+from oslo_log import log
+
+from conductor.common.music.model import base
+
+LOG = log.getLogger(__name__)
+
+
+def row_id(generation, index):
+    """Return the primary key of a row of a generation"""
+    return '{}.{}'.format(generation, index)
+
+
+def generation_of(pk_value):
+    """Return the generation of a row, None for rows loaded without one"""
+    generation, dot, _ = pk_value.partition('.')
+    return generation if dot else None
+
+
+class TableVersion(base.Base):
+    """Generation of the rows of tables loaded as a whole
+
+    Such tables hold the rows of their last generations. The version of
+    a table is the generation to read, so a new generation is made
+    visible at once, by updating a single row. Services caching the
+    tables compare the version with the one they read them at.
+    """
+
+    __tablename__ = "table_versions"
+    __keyspace__ = None
+
+    id = None
+    version = None
+
+    @classmethod
+    def schema(cls):
+        """Return schema."""
+        schema = {
+            'id': 'text',  # Name of the table
+            'version': 'text',  # Generation of the rows to read
+            'PRIMARY KEY': '(id)'
+        }
+        return schema
+
+    @classmethod
+    def atomic(cls):
+        """Use atomic operations"""
+        return True
+
+    @classmethod
+    def pk_name(cls):
+        """Primary key name"""
+        return 'id'
+
+    def pk_value(self):
+        """Primary key value"""
+        return self.id
+
+    def values(self):
+        """Values"""
+        value_dict = {
+            'id': self.id,
+            'version': self.version,
+        }
+        return value_dict
+
+    @classmethod
+    def bump(cls, table, version=None):
+        """Give a table a new version, and return it"""
+        version = version or str(uuid.uuid4())
+        cls(table, version).insert()
+        return version
+
+    @classmethod
+    def current(cls, table):
+        """Return the version of a table, None if never set"""
+        return cls.versions().get(table)
+
+    @classmethod
+    def versions(cls):
+        """Return the versions of all the tables, by table name"""
+        return dict((row.id, row.version)
+                    for row in cls.query.all())  # pylint: disable=E1101
+
+    @classmethod
+    def reload(cls, model, rows):
+        """Replace the rows of a table with a new generation of them
+
+        The rows are inserted in bulk, then the table version is changed
+        to their generation. Only then are the rows of generations older
+        than the previous one deleted, readers may still be reading it.
+        Returns False, leaving the table as it was, when the rows could
+        not be inserted.
+        """
+        table = model.__tablename__
+        previous = cls.current(table)
+        generation = str(uuid.uuid4())
+        rows = list(rows)
+        for index, row in enumerate(rows):
+            setattr(row, model.pk_name(), row_id(generation, index))
+        if not model.insert_many(rows):
+            LOG.error("Failed to insert {} rows of generation {} in table "
+                      "{}".format(len(rows), generation, table))
+            return False
+
+        cls.bump(table, generation)
+        LOG.info("Table {} now holds {} rows of generation {}".format(
+            table, len(rows), generation))
+
+        stale = [row.pk_value() for row in model.query.all()
+                 if generation_of(row.pk_value()) not in (generation, previous)]
+        if stale and not model.delete_many(stale):
+            LOG.warning("Failed to delete {} rows of old generations from "
+                        "table {}".format(len(stale), table))
+        return True
+
+    @staticmethod
+    def current_rows(rows, version):
+        """Return the rows of the generation of a table version"""
+        return [row for row in rows
+                if generation_of(row.pk_value()) == version]
+
+    def __init__(self, id=None, version=None, _insert=False):
+        """Initializer"""
+        super(TableVersion, self).__init__()
+        self.id = id
+        self.version = version
+
+    def __repr__(self):
+        """Object representation"""
+        return '<TableVersion {} ({})>'.format(self.id, self.version)
+
+    def __json__(self):
+        """JSON representation"""
+        json_ = {}
+        json_['id'] = self.id
+        json_['version'] = self.version
+        return json_
@@ -24,6 +24,8 @@ import json
 import logging
 import time
 
+import futurist
+from futurist import waiters
 from oslo_config import cfg
 from oslo_log import log
 
@@ -88,6 +90,12 @@ MUSIC_API_OPTS = [
     cfg.StrOpt('aafuser', help='username value that used for creating basic authorization header'),
     cfg.StrOpt('aafpass', help='password value that used for creating basic authorization header'),
     cfg.StrOpt('aafns', help='AAF namespace field used in MUSIC request header'),
+    cfg.IntOpt('bulk_concurrency',
+               default=8,
+               min=1,
+               help='Number of rows written concurrently by bulk '
+                    'operations (e.g. loading latency rules), MUSIC '
+                    'having no batches.'),
     cfg.StrOpt('certificate_authority_bundle_file',
                default='certificate_authority_bundle.pem',
                help='Certificate Authority Bundle file in pem format. '
@@ -98,6 +106,11 @@ MUSIC_API_OPTS = [
 CONF.register_opts(MUSIC_API_OPTS, group='music_api')
 
 
+def _project(row, columns):
+    """Return the columns of a row that it has"""
+    return dict((column, row[column]) for column in columns if column in row)
+
+
 class MusicAPI(object):
     """Wrapper for Music API"""
 
@@ -107,6 +120,9 @@ class MusicAPI(object):
     rest = None  # API Endpoint
     replication_factor = None  # Number of Music nodes to replicate across
 
+    # MUSIC returns rows with all their columns, see Query.defer
+    reads_columns = False
+
     def __init__(self):
         """Initializer."""
 
@@ -414,6 +430,94 @@ class MusicAPI(object):
         self.payload_delete(payload)
         return response and response.ok
 
+    def _concurrently(self, request, items):
+        """Make a request per item, bulk_concurrency at a time
+
+        Returns the results of the requests, None for those that failed.
+        """
+        if not items:
+            return []
+        executor = futurist.ThreadPoolExecutor(
+            max_workers=min(CONF.music_api.bulk_concurrency, len(items)))
+        try:
+            futures = [executor.submit(request, item) for item in items]
+            waiters.wait_for_all(futures)
+        finally:
+            executor.shutdown(wait=False)
+        return [None if future.exception() else future.result()
+                for future in futures]
+
+    def _bulk(self, request, items):
+        """Make a request per item, returns True if all of them succeeded"""
+        return all(self._concurrently(request, items))
+
+    def rows_read(self, keyspace, table, pk_name, pk_values):
+        """Read the rows with the given primary keys. Not atomic.
+
+        MUSIC has no batches, so the rows are read concurrently. Returns
+        the rows found by primary key.
+        """
+        def _read(pk_value):
+            return self.row_read(keyspace, table, pk_name, pk_value)
+
+        pk_values = list(pk_values)
+        rows = {}
+        for pk_value, result in zip(pk_values,
+                                    self._concurrently(_read, pk_values)):
+            for row in (result or {}).values():
+                rows[pk_value] = row
+        return rows
+
+    def rows_create(self, keyspace, table, pk_name, rows):
+        """Create many rows, with eventual consistency.
+
+        MUSIC has no batches, so the rows are created concurrently. They
+        must not be read before they have all been created, e.g. until
+        a row pointing to them is updated.
+        """
+        path = '/keyspaces/%(keyspace)s/tables/%(table)s/rows' % {
+            'keyspace': keyspace,
+            'table': table,
+        }
+
+        def _create(values):
+            data = {'consistencyInfo': {'type': 'eventual'},
+                    'values': values}
+            response = self.rest.request(method='post', path=path, data=data)
+            return response is not None and response.ok
+
+        if CONF.music_api.debug:
+            LOG.debug("Creating {} rows in table {}, keyspace {}".format(
+                len(rows), table, keyspace))
+        return self._bulk(_create, rows)
+
+    def rows_delete(self, keyspace, table, pk_name, pk_values):
+        """Delete many rows, with eventual consistency."""
+        def _delete(pk_value):
+            data = {'consistencyInfo': {'type': 'eventual'}}
+            path = self._row_url_path(keyspace, table, pk_name, pk_value)
+            response = self.rest.request(method='delete', path=path, data=data)
+            return response is not None and response.ok
+
+        if CONF.music_api.debug:
+            LOG.debug("Deleting {} rows from table {}, keyspace {}".format(
+                len(pk_values), table, keyspace))
+        return self._bulk(_delete, pk_values)
+
+    def rows_insert_by_condition(self, keyspace, table, pk_name, rows,
+                                 exists_status):
+        """Insert many rows with certain condition, concurrently
+
+        Returns True if all of them were inserted.
+        """
+        def _insert(values):
+            response = self.row_insert_by_condition(
+                keyspace, table, pk_name, values[pk_name], values,
+                exists_status)
+            return response is not None and response.status_code == 200
+
+        return self._bulk(_insert, rows)
+
     def row_insert_by_condition(self, keyspace, table, pk_name, pk_value, values, exists_status):
 
         """Insert a row with certain condition."""
@@ -576,6 +680,9 @@ class MockAPI(object):
         'keyspaces': {}
     }
 
+    # Rows are read with the given columns only, see Query.defer
+    reads_columns = True
+
     def __init__(self):
         """Initializer."""
         LOG.info(_LI("Initializing Music Mock API"))
@@ -601,12 +708,19 @@ class MockAPI(object):
     def _unset_table(self, keyspace, table):
         self._keyspaces[keyspace].pop(table)
 
-    def _get_row(self, keyspace, table, key=None):
+    def _get_row(self, keyspace, table, key=None, column=None, columns=None):
         rows = {}
         row_num = 0
         for row_key, row in self._keyspaces[keyspace][table].items():
-            if not key or key == row_key:
+            if column and key:
+                # Indexed (non primary key) column lookup
+                matched = row.get(column) == key
+            else:
+                matched = not key or key == row_key
+            if matched:
                 row_num += 1
+                if columns:
+                    row = _project(row, columns)
                 rows['row {}'.format(row_num)] = copy.deepcopy(row)
         return rows
 
@@ -631,7 +745,7 @@ class MockAPI(object):
         return True
 
     def row_create(self, keyspace, table,  # pylint: disable=R0913
-                   pk_name, pk_value, values, atomic=False):
+                   pk_name, pk_value, values, atomic=False, conditional=False):
         """Create a row."""
         if CONF.music_api.debug:
             LOG.debug("Creating row with pk_value {} in table "
@@ -640,20 +754,33 @@ class MockAPI(object):
         return True
 
     def row_update(self, keyspace, table,  # pylint: disable=R0913
-                   pk_name, pk_value, values, atomic=False):
-        """Update a row."""
+                   pk_name, pk_value, values, atomic=False, condition=None):
+        """Update a row.
+
+        As in MUSIC, only the given columns change, and a row with a
+        condition is only updated if its columns hold the given values.
+        Returns the status MUSIC would, 'SUCCESS' or 'FAILURE'.
+        """
         if CONF.music_api.debug:
             LOG.debug("Updating row with pk_value {} in table "
                       "{}, keyspace {}".format(pk_value, table, keyspace))
-        self._set_row(keyspace, table, pk_value, values)
-        return True
+        row = self._keyspaces[keyspace][table].get(pk_value)
+        if condition and (row is None or any(
+                row.get(k) != v for k, v in condition.items())):
+            return 'FAILURE'
+        if row is None:
+            self._set_row(keyspace, table, pk_value, values)
+        else:
+            row.update(values)
+        return 'SUCCESS'
 
-    def row_read(self, keyspace, table, pk_name=None, pk_value=None):
+    def row_read(self, keyspace, table, pk_name=None, pk_value=None,
+                 columns=None):
         """Read one or more rows. Not atomic."""
         if CONF.music_api.debug:
             LOG.debug("Reading row with pk_value {} from table "
                       "{}, keyspace {}".format(pk_value, table, keyspace))
-        values = self._get_row(keyspace, table, pk_value)
+        values = self._get_row(keyspace, table, pk_value, pk_name, columns)
         return values
 
     def row_delete(self, keyspace, table, pk_name, pk_value, atomic=False):
@@ -664,6 +791,46 @@ class MockAPI(object):
         self._unset_row(keyspace, table, pk_value)
         return True
 
+    def rows_create(self, keyspace, table, pk_name, rows):
+        """Create many rows."""
+        for values in rows:
+            self._set_row(keyspace, table, values[pk_name], values)
+        return True
+
+    def rows_delete(self, keyspace, table, pk_name, pk_values):
+        """Delete many rows."""
+        for pk_value in pk_values:
+            self._unset_row(keyspace, table, pk_value)
+        return True
+
+    def rows_read(self, keyspace, table, pk_name, pk_values, columns=None):
+        """Read the rows with the given primary keys."""
+        rows = {}
+        for pk_value in pk_values:
+            for row in self._get_row(keyspace, table, pk_value,
+                                     columns=columns).values():
+                rows[pk_value] = row
+        return rows
+
+    def rows_insert_by_condition(self, keyspace, table, pk_name, rows,
+                                 exists_status):
+        """Insert many rows, parking their plans in the rows that exist.
+
+        Plans are kept as JSON text, like in the map column of MUSIC.
+        """
+        for values in rows:
+            row = self._keyspaces[keyspace][table].get(values[pk_name])
+            if row is None:
+                row = dict(values, plans={})
+                self._set_row(keyspace, table, values[pk_name], row)
+                plans = values['plans']
+            else:
+                plans = dict((plan_id, dict(plan, status=exists_status))
+                             for plan_id, plan in values['plans'].items())
+            for plan_id, plan in plans.items():
+                row['plans'][plan_id] = json.dumps(plan)
+        return True
+
     def table_create(self, keyspace, table, schema):
         """Creates a table."""
         if CONF.music_api.debug:
@@ -45,6 +45,14 @@ MESSAGING_SERVER_OPTS = [
                min=1,
                help='Wait interval while checking for a message response. '
                     'Default value is 1 second.'),
+    cfg.FloatOpt('check_interval_initial',
+                 default=0.05,
+                 min=0.01,
+                 help='Initial wait interval while polling for a message '
+                      'response. It doubles after every check, up to '
+                      'check_interval. Not used with the etcd backend, '
+                      'which is notified of responses. '
+                      'Default value is 0.05 seconds.'),
     cfg.IntOpt('response_timeout',
                default=120,
                min=1,
@@ -143,15 +151,44 @@ class RPCClient(object):
 
     def __check_rpc_status(self, rpc_id, rpc_method):
         """Check status for a given message id"""
-        # Wait check_interval seconds before proceeding
-        check_interval = self.conf.messaging_server.check_interval
-        time.sleep(check_interval)
         if self.conf.messaging_server.debug:
             LOG.debug("Checking status for message {} method {} on "
                       "topic {}".format(rpc_id, rpc_method, self.target.topic))
         rpc = self.RPC.query.one(rpc_id)
         return rpc
 
+    def __poll_rpc_status(self, rpc_id, rpc_method, deadline):
+        """Poll for a message response until it finishes or times out
+
+        The wait between checks starts at check_interval_initial and
+        doubles up to check_interval, so fast responses are picked up
+        without hammering the backend on slow ones.
+        """
+        interval = self.conf.messaging_server.check_interval_initial
+        rpc = None
+        while time.time() < deadline:
+            time.sleep(min(interval, max(deadline - time.time(), 0)))
+            rpc = self.__check_rpc_status(rpc_id, rpc_method)
+            if rpc and rpc.finished:
+                break
+            interval = min(interval * 2,
+                           self.conf.messaging_server.check_interval)
+        return rpc
+
+    def __watch_rpc_status(self, rpc, rpc_method, deadline):
+        """Wait for a message response using backend change notifications"""
+        def _finished(row):
+            return row.get('status') in message.Message.FINISHED
+
+        rpc_id = rpc.id
+        while time.time() < deadline:
+            rpc.watch(condition=_finished,
+                      timeout=max(deadline - time.time(), 0))
+            rpc = self.__check_rpc_status(rpc_id, rpc_method)
+            if not rpc or rpc.finished:
+                break
+        return rpc
+
     def cast(self, ctxt, method, args):
         """Asynchronous Call"""
         rpc = self.RPC(action=self.RPC.CAST,
@@ -203,18 +240,16 @@ class RPCClient(object):
         if self.conf.messaging_server.debug:
             LOG.debug("Calling method {} with args {}".format(method, args))
 
-        # Check message status within a thread
-        executor = futurist.ThreadPoolExecutor()
-        started_at = time.time()
-        while (time.time() - started_at) <= self.conf.messaging_server.response_timeout:
-            fut = executor.submit(self.__check_rpc_status, rpc_id, method)
-            rpc = fut.result()
-            if rpc and rpc.finished:
-                if self.conf.messaging_server.debug:
-                    LOG.debug("Message {} method {} response received".
-                              format(rpc_id, method))
-                break
-        executor.shutdown()
+        # Wait for the response. etcd notifies us when the message row
+        # changes, other backends are polled with a backoff.
+        deadline = time.time() + self.conf.messaging_server.response_timeout
+        if self.conf.db_options.db_backend == 'etcd':
+            rpc = self.__watch_rpc_status(rpc, method, deadline)
+        else:
+            rpc = self.__poll_rpc_status(rpc_id, method, deadline)
+        if rpc and rpc.finished and self.conf.messaging_server.debug:
+            LOG.debug("Message {} method {} response received".
+                      format(rpc_id, method))
 
         # Get response, delete message, and return response
         if not rpc or not rpc.finished:
@@ -295,7 +330,8 @@ class RPCService(cotyledon.Service):
         Use this only when the parent service is not running concurrently.
         """
 
-        msgs = self.RPC.query.all()
+        msgs = self.RPC.query.get_plan_by_col('status',
+                                              message.Message.ENQUEUED)
         for msg in msgs:
             if msg.enqueued:
                 if 'plan_name' in list(msg.ctxt.keys()):  # Python 3 Conversion -- dict object to list object
@@ -334,20 +370,27 @@ class RPCService(cotyledon.Service):
         self._do()
         return True
 
-    # FIXME(jdandrea): Better name for this, please, kthx.
-    def _do(self):
-        """Look for a new RPC call and serve it"""
-        # Get all the messages in queue
-        msgs = self.RPC.query.all()
+    def _requeue_stale(self):
+        """Put messages back in the queue if their worker went quiet"""
+        msgs = self.RPC.query.get_plan_by_col('status',
+                                              message.Message.WORKING)
         for msg in msgs:
-            # Find the first msg marked as enqueued.
-
             if msg.working and \
                     (self.current_time_seconds() - self.millisec_to_sec(msg.updated)) \
                     > self.conf.messaging_server.response_timeout:
                 msg.status = message.Message.ENQUEUED
                 msg.update(condition=self.working_status_condition)
 
+    # FIXME(jdandrea): Better name for this, please, kthx.
+    def _do(self):
+        """Look for a new RPC call and serve it"""
+        self._requeue_stale()
+
+        # Only read the messages waiting in queue, using the status index.
+        msgs = self.RPC.query.get_plan_by_col('status',
+                                              message.Message.ENQUEUED)
+        for msg in msgs:
+            # Find the first msg marked as enqueued.
             if not msg.enqueued:
                 continue
             if 'plan_name' in list(msg.ctxt.keys()):  # Python 3 Conversion -- dict object to list object
@@ -19,7 +19,6 @@
 
 """Message Model"""
 
-import json
 import time
 
 from conductor.common.music.model import base
@@ -50,12 +49,12 @@ class Message(base.Base):
     action = None
     created = None
     updated = None
-    ctxt = None
+    ctxt = base.JSONPayload('ctxt')
     method = None
-    args = None
+    args = base.JSONPayload('args')
     status = None
     owner = None
-    response = None
+    response = base.JSONPayload('response')
     failure = None
 
     # Actions
@@ -90,6 +89,14 @@ class Message(base.Base):
         }
         return schema
 
+    @classmethod
+    def indexes(cls):
+        """Return indexes"""
+        indexes = [
+            'status'
+        ]
+        return indexes
+
     @classmethod
     def atomic(cls):
         """Use atomic operations"""
@@ -134,12 +141,12 @@ class Message(base.Base):
             'action': self.action,
             'created': self.created,
             'updated': self.updated,
-            'ctxt': json.dumps(self.ctxt),
+            'ctxt': self.encoded('ctxt'),
             'method': self.method,
-            'args': json.dumps(self.args),
+            'args': self.encoded('args'),
             'status': self.status,
             'owner': self.owner,
-            'response': json.dumps(self.response),
+            'response': self.encoded('response'),
             'failure': self.failure,  # already serialized by oslo_messaging
         }
 
@@ -161,9 +168,11 @@ class Message(base.Base):
             self.failure = failure or ""
             self.insert()
         else:
-            self.ctxt = json.loads(ctxt)
-            self.args = json.loads(args)
-            self.response = json.loads(response)
+            self._raw_payloads = {
+                'ctxt': ctxt,
+                'args': args,
+                'response': response,
+            }
             self.failure = failure  # oslo_messaging will deserialize this
 
     def __repr__(self):
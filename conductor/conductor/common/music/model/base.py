@@ -21,12 +21,19 @@
 
 from abc import ABCMeta
 from abc import abstractmethod
+import collections.abc
+import json
 import uuid
 
 from oslo_config import cfg
 from oslo_log import log as logging
 import six
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from conductor.common.classes import abstractclassmethod
 from conductor.common.classes import classproperty
 from conductor.common import db_backend
@@ -37,6 +44,105 @@ LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 
 
+def json_default(value):
+    """Encode mappings that are not dicts (e.g. candidates) as objects"""
+    if isinstance(value, collections.abc.Mapping):
+        return dict(value)
+    raise TypeError("Object of type {} is not JSON serializable".format(
+        type(value).__name__))
+
+
+class JSONCodec(object):
+    """Encodes and decodes JSON text columns with the standard library"""
+
+    def dumps(self, value):
+        return json.dumps(value, default=json_default)
+
+    def loads(self, text):
+        return json.loads(text)
+
+
+class OrjsonCodec(JSONCodec):
+    """Encodes and decodes JSON text columns with orjson
+
+    Values orjson does not handle (e.g. integers beyond 64 bits or NaN
+    literals) go through the standard library.
+    """
+
+    def dumps(self, value):
+        try:
+            return orjson.dumps(value, default=json_default,
+                                option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return super(OrjsonCodec, self).dumps(value)
+
+    def loads(self, text):
+        try:
+            return orjson.loads(text)
+        except ValueError:
+            return super(OrjsonCodec, self).loads(text)
+
+
+JSON_CODECS = {
+    'json': JSONCodec(),
+}
+if orjson is not None:
+    JSON_CODECS['orjson'] = OrjsonCodec()
+
+
+def json_codec():
+    """Return the codec of JSON text columns
+
+    Falls back to the standard library when the configured codec is
+    not installed.
+    """
+    name = CONF.db_options.json_codec
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in JSON_CODECS else 'json'
+    return JSON_CODECS.get(name, JSON_CODECS['json'])
+
+
+class JSONPayload(object):
+    """A JSON text column that is only decoded when first accessed.
+
+    Rows are often read in bulk, or only to change their status. A
+    column is decoded when first accessed. Until then, it is written
+    back as the text it was read as.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.name in instance.__dict__.get('_deferred', ()):
+            instance.load_deferred()
+        payloads = instance.__dict__.setdefault('_payloads', {})
+        raw_payloads = instance.__dict__.get('_raw_payloads', {})
+        if self.name in raw_payloads:
+            # A column missing from the row (e.g. it was deleted since it
+            # was queried) holds no payload
+            text = raw_payloads.pop(self.name)
+            payloads[self.name] = \
+                None if text is None else json_codec().loads(text)
+        return payloads.get(self.name)
+
+    def __set__(self, instance, value):
+        instance.__dict__.get('_deferred', set()).discard(self.name)
+        instance.__dict__.get('_raw_payloads', {}).pop(self.name, None)
+        instance.__dict__.setdefault('_payloads', {})[self.name] = value
+
+    def encode(self, instance):
+        """Return the JSON text of the column, None if it was not read"""
+        if self.name in instance.__dict__.get('_deferred', ()):
+            return None
+        raw_payloads = instance.__dict__.get('_raw_payloads', {})
+        if self.name in raw_payloads:
+            return raw_payloads[self.name]
+        return json_codec().dumps(self.__get__(instance, type(instance)))
+
+
 @six.add_metaclass(ABCMeta)
 class Base(object):
     """A custom declarative base ORM-style class.
@@ -126,12 +232,38 @@ class Base(object):
         response = db_backend.DB_API.row_create(**kwargs)
         return response
 
+    @classmethod
+    def insert_many(cls, rows):
+        """Insert rows, whose primary key is set, in bulk
+
+        Not atomic, see the rows_create of the backend.
+        """
+        kwargs = cls.__kwargs()
+        kwargs['pk_name'] = cls.pk_name()
+        kwargs['rows'] = []
+        for row in rows:
+            values = row.values()
+            values[kwargs['pk_name']] = row.pk_value()
+            kwargs['rows'].append(values)
+        return db_backend.DB_API.rows_create(**kwargs)
+
+    @classmethod
+    def delete_many(cls, pk_values):
+        """Delete rows in bulk"""
+        kwargs = cls.__kwargs()
+        kwargs['pk_name'] = cls.pk_name()
+        kwargs['pk_values'] = list(pk_values)
+        return db_backend.DB_API.rows_delete(**kwargs)
+
     def update(self, condition=None):
         """Update row"""
         kwargs = self.__kwargs()
         kwargs['pk_name'] = self.pk_name()
         kwargs['pk_value'] = self.pk_value()
         kwargs['values'] = self.values()
+        # Columns that were not read are left as they are
+        for name in self.__dict__.get('_deferred', ()):
+            kwargs['values'].pop(name, None)
 
         # In active-active, all update operations should be atomic
         kwargs['atomic'] = True
@@ -151,6 +283,16 @@ class Base(object):
         kwargs['atomic'] = self.atomic()
         db_backend.DB_API.row_delete(**kwargs)
 
+    def watch(self, condition, timeout):
+        """Wait for row changes until condition holds or timeout elapses
+
+        Only backends with change notifications (etcd) implement this.
+        """
+        kwargs = self.__kwargs()
+        kwargs['pk_value'] = self.pk_value()
+        return db_backend.DB_API.row_watch(condition=condition,
+                                           timeout=timeout, **kwargs)
+
     @classmethod
     def filter_by(cls, **kwargs):
         """Filter objects"""
@@ -161,6 +303,32 @@ class Base(object):
         # TODO(jdandrea): Implement in music? May be a no-op
         pass
 
+    def defer(self, names):
+        """Mark JSONPayload columns as not read from the row yet"""
+        deferred = self.__dict__.setdefault('_deferred', set())
+        deferred.update(names)
+        for name in names:
+            self.__dict__.get('_payloads', {}).pop(name, None)
+            self.__dict__.get('_raw_payloads', {}).pop(name, None)
+
+    def load_deferred(self):
+        """Read the deferred columns from the row"""
+        deferred = self.__dict__.pop('_deferred', None)
+        if not deferred:
+            return
+        kwargs = self.__kwargs()
+        rows = db_backend.DB_API.row_read(
+            pk_name=self.pk_name(), pk_value=self.pk_value(),
+            columns=sorted(deferred), **kwargs)
+        row = next(iter(rows.values()), None) if rows else None
+        raw_payloads = self.__dict__.setdefault('_raw_payloads', {})
+        for name in deferred:
+            raw_payloads[name] = (row or {}).get(name)
+
+    def encoded(self, name):
+        """Return the JSON text of a JSONPayload column"""
+        return getattr(type(self), name).encode(self)
+
     def as_dict(self):
         """Return object representation as a dictionary"""
         return dict((k, v) for k, v in self.__dict__.items()
@@ -38,7 +38,7 @@ class Query(object):
     """Data Query"""
     model = None
 
-    def __init__(self, model):
+    def __init__(self, model, deferred=()):
         """Initializer"""
         if inspect.isclass(model):
             self.model = model
@@ -46,6 +46,26 @@ class Query(object):
         # elif isinstance(model, basestring):
         #     self.model = get_class('conductor_api.models.' + model)
         assert inspect.isclass(self.model)
+        self.deferred = frozenset(deferred)
+
+    def defer(self, *names):
+        """Return a query that leaves out the given JSON columns
+
+        The columns of the objects found are read when first accessed.
+        Use it to scan rows for the few columns deciding what to do with
+        them, e.g. the status of plans.
+
+        Backends returning whole rows (MUSIC) would send the columns
+        anyway, and again when they are accessed. With those, the query
+        reads the columns along with the rest of the row.
+        """
+        for name in names:
+            if not hasattr(getattr(self.model, name, None), 'encode'):
+                raise ValueError("{} is not a JSON column of {}".format(
+                    name, self.model.__name__))
+        if not getattr(db_backend.DB_API, 'reads_columns', False):
+            return self
+        return Query(self.model, self.deferred.union(names))
 
     def __kwargs(self):
         """Return common keyword args"""
@@ -53,6 +73,10 @@ class Query(object):
             'keyspace': self.model.__keyspace__,
             'table': self.model.__tablename__,  # pylint: disable=E1101
         }
+        if self.deferred:
+            kwargs['columns'] = [
+                column for column in self.model.schema()
+                if column != 'PRIMARY KEY' and column not in self.deferred]
         return kwargs
 
     def __rows_to_objects(self, rows):
@@ -61,8 +85,12 @@ class Query(object):
         pk_name = self.model.pk_name()  # pylint: disable=E1101
         for row_id, row in rows.items():  # pylint: disable=W0612
             the_id = row.pop(pk_name)
+            for name in self.deferred:
+                row.setdefault(name, None)
             result = self.model(_insert=False, **row)
             setattr(result, pk_name, the_id)
+            if self.deferred:
+                result.defer(self.deferred)
             results.append(result)
         return Results(results)
 
@@ -80,6 +108,13 @@ class Query(object):
         rows = db_backend.DB_API.row_read(**kwargs)
         return self.__rows_to_objects(rows)
 
+    def get_many(self, pk_values):
+        """Return the objects with the given primary keys, read in bulk"""
+        kwargs = self.__kwargs()
+        rows = db_backend.DB_API.rows_read(
+            pk_name=self.model.pk_name(), pk_values=pk_values, **kwargs)
+        return self.__rows_to_objects(rows)
+
     def get_plan_by_col(self, pk_name, pk_value):
         # Before using this method, create an index the column (except the primary key)
         # you want to filter by.
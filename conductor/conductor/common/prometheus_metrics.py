@@ -21,6 +21,8 @@
 from oslo_config import cfg
 from oslo_log import log
 from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
 from prometheus_client import start_http_server
 
 LOG = log.getLogger(__name__)
@@ -95,6 +97,24 @@ HPA_CLOUD_REGION_UNSUCCESSFUL = Counter(
     ['customer_name', 'service_name', 'cloud_region']
 )
 
+# Template translation scheduling
+TRANSLATION_PLANS_CLAIMED = Gauge(
+    'translation_plans_claimed',
+    'Number of plans claimed for translation in the last polling interval'
+)
+
+TRANSLATION_PLANS_IN_FLIGHT = Gauge(
+    'translation_plans_in_flight',
+    'Number of plans being translated'
+)
+
+# A&AI cache
+AAI_CACHE_REFRESH_DURATION = Histogram(
+    'aai_cache_refresh_duration_seconds',
+    'Time taken to refresh the A&AI cloud region cache',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, float('inf'))
+)
+
 
 def _init_metrics(port_index):
     '''
@@ -63,7 +63,7 @@ class REST(object):
     def __init__(self, server_url, retries=3, connect_timeout=3.05,
                  read_timeout=12.05, username=None, password=None,
                  cert_file=None, cert_key_file=None, ca_bundle_file=None,
-                 log_debug=False):
+                 log_debug=False, max_connections_per_host=None):
         """Initializer."""
         parsed = parse.urlparse(server_url, 'http')
         if parsed.scheme not in ('http', 'https'):
@@ -95,6 +95,12 @@ class REST(object):
         # Use connection pooling, kthx.
         # http://docs.python-requests.org/en/master/user/advanced/
         self.session = requests.Session()
+        if max_connections_per_host:
+            # Requests beyond the limit wait for a pooled connection
+            adapter = requests.adapters.HTTPAdapter(
+                pool_maxsize=max_connections_per_host, pool_block=True)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
 
     def request(self, method='get', content_type='application/json',
                 path='', headers=None, data=None):
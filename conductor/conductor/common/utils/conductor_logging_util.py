@@ -19,6 +19,7 @@
 
 import json
 import logging
+import threading
 
 from conductor.common import db_backend
 
@@ -33,6 +34,20 @@ class LoggerFilter(logging.Filter):
         return True
 
 
+# Plan logged about by the current thread, see setThreadLoggerFilter
+_thread_context = threading.local()
+
+
+class ThreadLoggerFilter(LoggerFilter):
+    """Tags records with the plan of the thread logging them"""
+
+    def filter(self, record):
+        record.transaction_id = getattr(_thread_context, 'transaction_id',
+                                        None)
+        record.plan_id = getattr(_thread_context, 'plan_id', None)
+        return True
+
+
 def getTransactionId(keyspace, plan_id):
     """get transaction id from a pariticular plan in MUSIC """
 
@@ -47,7 +62,7 @@ def getTransactionId(keyspace, plan_id):
                 return data["transaction-id"]
 
 
-def setLoggerFilter(logger, keyspace, plan_id):
+def _setFormattersAndFilter(logger, logger_filter):
 
     generic_formatter = logging.Formatter('%(asctime)s|%(transaction_id)s|%(thread)d|%(levelname)s|%(module)s|%('
                                           'name)s: '
@@ -64,10 +79,6 @@ def setLoggerFilter(logger, keyspace, plan_id):
     error_formatter = logging.Formatter('%(asctime)s|%(transaction_id)s|%(thread)d|Conductor|N/A|N/A|N/A|ERROR|500'
                                         '|N/A|%(name)s : [-] plan id: %(plan_id)s [-] %(message)s')
 
-    logger_filter = LoggerFilter()
-    logger_filter.transaction_id = getTransactionId(keyspace, plan_id)
-    logger_filter.plan_id = plan_id
-
     for handler in logger.logger.parent.handlers:
         if hasattr(handler, 'baseFilename') and "audit" in handler.baseFilename:
             handler.setFormatter(audit_formatter)
@@ -78,3 +89,25 @@ def setLoggerFilter(logger, keyspace, plan_id):
         else:
             handler.setFormatter(generic_formatter)
         handler.addFilter(logger_filter)
+
+
+def setLoggerFilter(logger, keyspace, plan_id):
+    logger_filter = LoggerFilter()
+    logger_filter.transaction_id = getTransactionId(keyspace, plan_id)
+    logger_filter.plan_id = plan_id
+    _setFormattersAndFilter(logger, logger_filter)
+
+
+def setThreadLoggerFilter(logger):
+    """Tag records with the plan of the thread logging them
+
+    For services handling several plans at once. Call it once, then
+    setThreadLoggerContext from each thread as it takes up a plan.
+    """
+    _setFormattersAndFilter(logger, ThreadLoggerFilter())
+
+
+def setThreadLoggerContext(keyspace, plan_id):
+    """Tag the records of the current thread with the plan"""
+    _thread_context.transaction_id = getTransactionId(keyspace, plan_id)
+    _thread_context.plan_id = plan_id
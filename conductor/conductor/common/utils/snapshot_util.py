@@ -0,0 +1,160 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2018 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+"""Read-mostly snapshots shared by processes on the same host
+
+A snapshot is a file of pickled records behind an index of their
+offsets. One process publishes a new snapshot by writing it aside and
+renaming it over the current one. The others memory map the file and
+decode a record only when it is read, so the records live once in the
+page cache instead of once per process. A process keeps the snapshot it
+has mapped until it loads the next one.
+"""
+
+import collections.abc
+import contextlib
+import fcntl
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+
+MAGIC = b'CNDSNAP1'
+
+# magic, version, created, index length; record offsets in the index
+# are relative to the end of the index
+HEADER = struct.Struct('<8sQdQ')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class Snapshot(collections.abc.Mapping):
+    """Read-only mapping of the records of a snapshot file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as snapshot_file:
+            stat = os.fstat(snapshot_file.fileno())
+            if stat.st_size < HEADER.size:
+                raise SnapshotError("{} is not a snapshot".format(path))
+            self._map = mmap.mmap(snapshot_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        magic, self.version, self.created, index_length = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise SnapshotError("{} is not a snapshot".format(path))
+        self.identity = (stat.st_dev, stat.st_ino)
+        self._index = pickle.loads(
+            self._map[HEADER.size:HEADER.size + index_length])
+        self._body = HEADER.size + index_length
+
+    def __getitem__(self, key):
+        offset, length = self._index[key]
+        offset += self._body
+        return pickle.loads(self._map[offset:offset + length])
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+def write_snapshot(path, records, version):
+    """Atomically replace the snapshot at path with the given records"""
+    blobs = []
+    index = {}
+    offset = 0
+    for key, record in records.items():
+        blob = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        index[key] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    encoded_index = pickle.dumps(index, pickle.HIGHEST_PROTOCOL)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as snapshot_file:
+            snapshot_file.write(HEADER.pack(MAGIC, version, time.time(),
+                                            len(encoded_index)))
+            snapshot_file.write(encoded_index)
+            for blob in blobs:
+                snapshot_file.write(blob)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class SharedSnapshot(object):
+    """A snapshot file published by one process and read by the others"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self._snapshot = None
+
+    def load(self):
+        """Return the current snapshot, None if none was published yet
+
+        A snapshot published since the last call is mapped in place of
+        the previous one.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return self._snapshot
+        if self._snapshot is None or \
+                self._snapshot.identity != (stat.st_dev, stat.st_ino):
+            self._snapshot = Snapshot(self.path)
+        return self._snapshot
+
+    def publish(self, records):
+        """Publish records as the next version and return its snapshot"""
+        current = self.load()
+        version = current.version + 1 if current is not None else 1
+        write_snapshot(self.path, records, version)
+        return self.load()
+
+    @contextlib.contextmanager
+    def writer(self, blocking=False):
+        """Hold the writer lock shared by the processes of the host
+
+        Yields whether the lock is held. Without blocking, the lock is
+        not held when another process holds it.
+        """
+        with open(self.lock_path, 'a') as lock_file:
+            flags = fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file.fileno(), flags)
+            except (IOError, OSError):
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
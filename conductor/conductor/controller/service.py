@@ -19,6 +19,7 @@
 
 import cotyledon
 
+import conductor.common.prometheus_metrics as PC
 from conductor.common import db_backend
 from conductor.common.models import order_lock
 from conductor.common.models import plan
@@ -71,6 +72,10 @@ class ControllerServiceLauncher(object):
     def __init__(self, conf):
         self.conf = conf
 
+        # Initialize Prometheus metrics Endpoint
+        # Controller service uses index 2
+        PC._init_metrics(2)
+
         # Set up Music access.
         self.music = db_backend.get_client()
         self.music.keyspace_create(keyspace=conf.keyspace)
@@ -430,24 +430,6 @@ class Translator(object):
                 #     # Add to our list of parsed candidates
                 #     inventory_candidates.append(candidate)
 
-            # Ask conductor-data for one or more candidates.
-            ctxt = {
-                "plan_id": self._plan_id,
-                "plan_name": self._plan_name,
-                "keyspace": self.conf.keyspace,
-            }
-            args = {
-                "demands": {
-                    name: requirements,
-                },
-                "plan_info": {
-                    "plan_id": self._plan_id,
-                    "plan_name": self._plan_name
-                },
-                "triage_translator_data": self.triageTranslatorData.__dict__
-
-            }
-
             # Check if required_candidate and excluded candidate
             # are mutually exclusive.
             for requirement in requirements:
@@ -465,25 +447,46 @@ class Translator(object):
                         " list are not mutually exclusive for demand"
                         " {}".format(name)
                     )
-            response = self.data_service.call(
-                ctxt=ctxt,
-                method="resolve_demands",
-                args=args)
-
-            resolved_demands = \
-                response and response.get('resolved_demands')
-            triage_data_trans = \
-                response and response.get('trans')
-
-            required_candidates = resolved_demands \
-                .get('required_candidates')
-            if not resolved_demands:
+            parsed[name] = {
+                "candidates": inventory_candidates,
+            }
+
+        # Ask conductor-data for the candidates of all demands at once.
+        ctxt = {
+            "plan_id": self._plan_id,
+            "plan_name": self._plan_name,
+            "keyspace": self.conf.keyspace,
+        }
+        args = {
+            "demands": demands_copy,
+            "plan_info": {
+                "plan_id": self._plan_id,
+                "plan_name": self._plan_name
+            },
+            "triage_translator_data": self.triageTranslatorData.__dict__
+        }
+        response = self.data_service.call(
+            ctxt=ctxt,
+            method="resolve_all_demands",
+            args=args)
+
+        resolved_demands = \
+            response and response.get('resolved_demands')
+        triage_data_trans = \
+            response and response.get('trans')
+
+        for name in demands_copy:
+            inventory_candidates = parsed[name]["candidates"]
+            if not resolved_demands or \
+                    resolved_demands.get(name) is None:
                 self.triageTranslator.thefinalCallTrans(triage_data_trans)
                 raise TranslatorException(
                     "Unable to resolve inventory "
                     "candidates for demand {}"
                     .format(name)
                 )
+            required_candidates = \
+                (resolved_demands.get('required_candidates') or {}).get(name)
             resolved_candidates = resolved_demands.get(name)
             for candidate in resolved_candidates:
                 inventory_candidates.append(candidate)
@@ -501,9 +504,6 @@ class Translator(object):
                         "candidate for demand {}"
                         .format(name)
                     )
-            parsed[name] = {
-                "candidates": inventory_candidates,
-            }
         self.triageTranslator.thefinalCallTrans(triage_data_trans)
         return parsed
 
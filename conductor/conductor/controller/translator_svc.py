@@ -26,6 +26,7 @@ import futurist
 from oslo_config import cfg
 from oslo_log import log
 
+import conductor.common.prometheus_metrics as PC
 from conductor.common.config_loader import load_config_file
 from conductor.common import db_backend
 from conductor.common.music import messaging as music_messaging
@@ -52,6 +53,12 @@ CONTROLLER_OPTS = [
     cfg.IntOpt('max_translation_counter',
                default=1,
                min=1),
+    cfg.IntOpt('translation_workers',
+               default=4,
+               min=1,
+               help='Number of plans each translator worker translates at '
+                    'once. Up to this many plans are claimed per polling '
+                    'interval. Default value is 4.'),
     cfg.StrOpt('opt_schema_file',
                default='opt_schema.json',
                help='json schema file which will be used to validate the '
@@ -102,6 +109,9 @@ class TranslatorService(cotyledon.Service):
             "status": self.Plan.TRANSLATING
         }
 
+        # Plans being translated by this worker
+        self.translations = set()
+
         if not self.conf.controller.concurrent:
             self._reset_template_status()
 
@@ -118,7 +128,8 @@ class TranslatorService(cotyledon.Service):
 
         Use this only when the translator service is not running concurrently.
         """
-        plans = self.Plan.query.get_plan_by_col("status", self.Plan.TRANSLATING)
+        plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.TRANSLATING)
         for the_plan in plans:
             the_plan.status = self.Plan.TEMPLATE
             # Use only in active-passive mode, so don't have to be atomic
@@ -188,8 +199,20 @@ class TranslatorService(cotyledon.Service):
             LOG.info(_LI("Changing the template status from translating to {}, "
                          "atomic update response from MUSIC {}").format(plan.status, _is_success))
 
-    def __check_for_templates(self):
-        """Wait for the polling interval, then do the real template check."""
+    def _translate_in_flight(self, plan):
+        """Translate a claimed plan, counting it as in flight"""
+        PC.TRANSLATION_PLANS_IN_FLIGHT.inc()
+        try:
+            self.translate(plan)
+        finally:
+            PC.TRANSLATION_PLANS_IN_FLIGHT.dec()
+
+    def __check_for_templates(self, translation_executor):
+        """Wait for the polling interval, then do the real template check.
+
+        Claims as many plans as there are idle translation workers and
+        translates them on translation_executor.
+        """
 
         # Wait for at least poll_interval sec
         polling_interval = self.conf.controller.polling_interval
@@ -198,15 +221,25 @@ class TranslatorService(cotyledon.Service):
 
         # Instead of using the query.all() method, now creating an index for 'status'
         # field in conductor.plans table, and query plans by status columns
-        template_plans = self.Plan.query.get_plan_by_col("status", self.Plan.TEMPLATE)
-        translating_plans = self.Plan.query.get_plan_by_col("status", self.Plan.TRANSLATING)
+        template_plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.TEMPLATE)
+        translating_plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.TRANSLATING)
 
         # combine the plans with status = 'template' and 'translating' together
         plans = template_plans + translating_plans
 
+        self.translations = set(
+            fut for fut in self.translations if not fut.done())
+        idle_workers = \
+            self.conf.controller.translation_workers - len(self.translations)
+        claimed = 0
+
         for plan in plans:
             # If there's a template to be translated, do it!
             if plan.status == self.Plan.TEMPLATE:
+                if claimed >= idle_workers:
+                    continue
                 if plan.translation_counter >= self.conf.controller.max_translation_counter:
                     message = _LE("Tried {} times. Plan {} is unable to translate") \
                         .format(self.conf.controller.max_translation_counter, plan.id)
@@ -214,7 +247,7 @@ class TranslatorService(cotyledon.Service):
                     plan.status = self.Plan.ERROR
                     plan.update(condition=self.template_status_condition)
                     LOG.error(message)
-                    break
+                    continue
                 else:
                     # change the plan status to "translating" and assign the current machine as translation owner
                     plan.status = self.Plan.TRANSLATING
@@ -225,12 +258,12 @@ class TranslatorService(cotyledon.Service):
                     log_util.setLoggerFilter(LOG, self.conf.keyspace, plan.id)
                     LOG.info(_LE("Plan {} is trying to update the status from 'template' to 'translating',"
                                  " get {} response from MUSIC").format(plan.id, _is_updated))
-                    if not _is_updated:
-                        break
 
+                    # Another worker may have claimed the plan first
                     if _is_updated and 'SUCCESS' in _is_updated:
-                        self.translate(plan)
-                break
+                        claimed += 1
+                        self.translations.add(translation_executor.submit(
+                            self._translate_in_flight, plan))
 
             # TODO(larry): sychronized clock among Conducotr VMs, or use an offset
             elif plan.status == self.Plan.TRANSLATING and (self.current_time_seconds()
@@ -238,23 +271,28 @@ class TranslatorService(cotyledon.Service):
                     > self.conf.messaging_server.timeout:
                 plan.status = self.Plan.TEMPLATE
                 plan.update(condition=self.translating_status_condition)
-                break
 
             elif plan.timedout:
                 # TODO(jdandrea): How to tell all involved to stop working?
                 # Not enough to just set status.
                 continue
 
+        PC.TRANSLATION_PLANS_CLAIMED.set(claimed)
+
     def run(self):
         """Run"""
         LOG.debug("{}".format(self.__class__.__name__))
         # Look for templates to translate from within a thread
         executor = futurist.ThreadPoolExecutor()
+        translation_executor = futurist.ThreadPoolExecutor(
+            max_workers=self.conf.controller.translation_workers)
 
         while self.running:
-            fut = executor.submit(self.__check_for_templates)
+            fut = executor.submit(self.__check_for_templates,
+                                  translation_executor)
             fut.result()
         executor.shutdown()
+        translation_executor.shutdown()
 
     def terminate(self):
         """Terminate"""
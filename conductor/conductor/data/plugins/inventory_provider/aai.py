@@ -19,15 +19,22 @@
 #
 
 import copy
+import futurist
+from futurist import waiters
 import json
+import os
+import random
 import re
+import threading
 import time
 import uuid
 
 from oslo_config import cfg
 from oslo_log import log
 
+import conductor.common.prometheus_metrics as PC
 from conductor.common import rest
+from conductor.common.utils import snapshot_util
 from conductor.data.plugins import constants
 from conductor.data.plugins.inventory_provider import base
 from conductor.data.plugins.inventory_provider.candidates.candidate import Candidate
@@ -71,6 +78,37 @@ AAI_OPTS = [
     cfg.StrOpt('aai_retries',
                default='3',
                help='Number of retry for A&AI Rest Call'),
+    cfg.IntOpt('resolve_concurrency',
+               default=8,
+               min=1,
+               help='Number of VNFs whose A&AI sub-resources (vservers, '
+                    'complexes, l-interfaces, vf-modules, ...) are '
+                    'resolved concurrently for a demand.'),
+    cfg.IntOpt('cache_refresh_concurrency',
+               default=8,
+               min=1,
+               help='Number of complexes and cloud region flavors fetched '
+                    'concurrently while refreshing the local cache.'),
+    cfg.FloatOpt('cache_refresh_jitter',
+                 default=0.1,
+                 min=0,
+                 max=1,
+                 help='Fraction of cache_refresh_interval by which each '
+                      'background cache refresh is randomly moved, so that '
+                      'data workers do not refresh at the same time.'),
+    cfg.StrOpt('shared_cache_dir',
+               default='',
+               help='Directory of the cloud region cache shared by the data '
+                    'workers of a host. One worker refreshes it and all '
+                    'workers memory map it, instead of each worker '
+                    'refreshing and holding its own copy. This only saves '
+                    'memory with several data workers (data.workers). '
+                    'Empty to keep one cache per worker.'),
+    cfg.IntOpt('max_connections',
+               default=8,
+               min=1,
+               help='Maximum number of concurrent connections to the A&AI '
+                    'host. Further requests wait for a free connection.'),
     cfg.StrOpt('server_url_version',
                default='v10',
                help='The version of A&AI in v# format.'),
@@ -117,7 +155,6 @@ class AAI(base.InventoryProviderBase):
         self.last_refresh_time = None
         self.complex_cache_refresh_interval = \
             self.conf.aai.complex_cache_refresh_interval
-        self.complex_last_refresh_time = None
         self.timeout = self.conf.aai.aai_rest_timeout
         self.retries = self.conf.aai.aai_retries
         self.username = self.conf.aai.username
@@ -127,6 +164,20 @@ class AAI(base.InventoryProviderBase):
         # Cache is initially empty
         self._aai_cache = {}
         self._aai_complex_cache = {}
+        self._refresh_lock = threading.Lock()
+        self._shared_regions = None
+        if self.conf.aai.shared_cache_dir:
+            self._shared_regions = snapshot_util.SharedSnapshot(
+                os.path.join(self.conf.aai.shared_cache_dir,
+                             'aai_cloud_regions.snapshot'))
+
+        # Background refresh of the caches, started in the process that
+        # serves requests
+        self._refresher_pid = None
+        self._refresh_requested = threading.Event()
+        self._revalidating_complexes = set()
+        self._revalidate_lock = threading.Lock()
+        self._revalidate_executor = None
 
     def initialize(self):
 
@@ -134,21 +185,9 @@ class AAI(base.InventoryProviderBase):
         # Initialize the Python requests
         self._init_python_request()
 
-        # Refresh the cache once for now
+        # Refresh the cache once, later refreshes run in the background
         self._refresh_cache()
 
-        # TODO(jdandrea): Make this periodic, and without a True condition!
-        # executor = futurist.ThreadPoolExecutor()
-        # while True:
-        #     fut = executor.submit(self.refresh_cache)
-        #     fut.result()
-        #
-        #     # Now wait for the next time.
-        #     # FIXME(jdandrea): Put inside refresh_cache()?
-        #     refresh_interval = self.conf.aai.cache_refresh_interval
-        #     time.sleep(refresh_interval)
-        # executor.shutdown()
-
     def name(self):
         """Return human-readable name."""
         return "A&AI"
@@ -210,82 +249,192 @@ class AAI(base.InventoryProviderBase):
             "ca_bundle_file": self.verify,
             "log_debug": self.conf.debug,
             "read_timeout": self.timeout,
+            "max_connections_per_host": self.conf.aai.max_connections,
         }
         self.rest = rest.REST(**kwargs)
 
-    def _refresh_cache(self):
-        """Refresh the A&AI cache."""
-        if not self.last_refresh_time or \
-                (time.time() - self.last_refresh_time) > \
-                self.cache_refresh_interval * 60:
-            # TODO(jdandrea): This is presently brute force.
-            # It does not persist to Music. A general purpose ORM caching
-            # object likely needs to be made, with a key (hopefully we
-            # can use one that is not just a UUID), a value, and a
-            # timestamp. The other alternative is to not use the ORM
-            # layer and call the API directly, but that is
-            # also trading one set of todos for another ...
-
-            # Get all A&AI sites
-            LOG.info(_LI("**** Refreshing A&AI cache *****"))
-            path = self._aai_versioned_path(
-                '/cloud-infrastructure/cloud-regions/?depth=0')
-            response = self._request(
-                path=path, context="cloud regions", value="all")
-            if response is None:
+    def _cache_expired(self):
+        if self._shared_regions is not None:
+            self._load_shared_regions()
+        return not self.last_refresh_time or \
+            (time.time() - self.last_refresh_time) > \
+            self.cache_refresh_interval * 60
+
+    def _refresh_cache(self, force=False):
+        """Refresh the A&AI cache.
+
+        The new cache is built aside and swapped in once complete. Only
+        one refresh runs at a time, meanwhile requests use the current
+        cache. Without a cache yet, wait for the refresh in progress.
+        """
+        if not force and not self._cache_expired():
+            return
+        if not self._refresh_lock.acquire(not self._aai_cache):
+            return
+        try:
+            if not force and not self._cache_expired():
                 return
-            regions = {}
-            if response.status_code == 200:
-                body = response.json()
-                regions = body.get('cloud-region', {})
-            if not regions:
-                # Nothing to update the cache with
-                LOG.error(_LE("A&AI returned no regions, link: {}{}").
-                          format(self.base, path))
+            if self._shared_regions is None:
+                self._rebuild_cache()
                 return
+            # One data worker rebuilds the shared cache, the others keep
+            # serving the current snapshot until it is published. Without
+            # a cache yet, wait for the worker rebuilding it.
+            with self._shared_regions.writer(
+                    blocking=not self._aai_cache) as writing:
+                if writing and (force or self._cache_expired()):
+                    self._rebuild_cache()
+        finally:
+            self._refresh_lock.release()
+
+    def _rebuild_cache(self):
+        """Build a new cache and swap it in"""
+        # TODO(jdandrea): This is presently brute force.
+        # It does not persist to Music. A general purpose ORM caching
+        # object likely needs to be made, with a key (hopefully we
+        # can use one that is not just a UUID), a value, and a
+        # timestamp. The other alternative is to not use the ORM
+        # layer and call the API directly, but that is
+        # also trading one set of todos for another ...
+        with PC.AAI_CACHE_REFRESH_DURATION.time():
+            cache = self._build_cache()
+        if cache is None:
+            return
+        if self._shared_regions is not None:
+            cache['cloud_region'] = \
+                self._shared_regions.publish(cache['cloud_region'])
+        self._aai_cache = cache
+        self.last_refresh_time = time.time()
+        LOG.info(_LI("**** A&AI cache refresh complete *****"))
+
+    def _load_shared_regions(self):
+        """Use the shared cache if another worker published a newer one"""
+        try:
+            regions = self._shared_regions.load()
+        except (IOError, OSError, snapshot_util.SnapshotError) as exc:
+            LOG.error(_LE("A&AI shared cache {} could not be loaded: {}").
+                      format(self._shared_regions.path, exc))
+            return
+        if regions is None or \
+                regions.created <= (self.last_refresh_time or 0):
+            return
+        self._aai_cache = {
+            'cloud_region': regions,
+            'service': {},
+        }
+        self.last_refresh_time = regions.created
+
+    def _next_refresh_delay(self):
+        """Seconds until the next background refresh, with jitter"""
+        interval = self.cache_refresh_interval * 60
+        jitter = self.conf.aai.cache_refresh_jitter
+        return interval * random.uniform(1 - jitter, 1 + jitter)
+
+    def _refresh_periodically(self):
+        """Refresh the A&AI cache whenever due or requested"""
+        while True:
+            self._refresh_requested.wait(self._next_refresh_delay())
+            try:
+                # A shared cache may have been refreshed by another worker
+                self._refresh_cache(force=self._shared_regions is None)
+            except Exception as exc:
+                LOG.error(_LE("A&AI cache refresh failed: {}").format(exc))
+            # Requests made during the refresh are served by it
+            self._refresh_requested.clear()
+
+    def _start_refresher(self):
+        """Start the background refresher, once per process
+
+        Data workers are forked after the plugins are initialized, and
+        threads do not survive a fork.
+        """
+        pid = os.getpid()
+        if self._refresher_pid == pid:
+            return
+        with self._revalidate_lock:
+            if self._refresher_pid == pid:
+                return
+            self._revalidating_complexes = set()
+            self._revalidate_executor = futurist.ThreadPoolExecutor(
+                max_workers=self.conf.aai.cache_refresh_concurrency)
+            refresher = threading.Thread(target=self._refresh_periodically,
+                                         name='aai-cache-refresher')
+            refresher.daemon = True
+            refresher.start()
+            self._refresher_pid = pid
+
+    def _build_cache(self):
+        """Build a new A&AI cache of all cloud regions
+
+        Complexes shared by cloud regions are fetched once. Complexes and
+        flavors are fetched concurrently. Returns None when A&AI has no
+        cloud regions.
+        """
+        # Get all A&AI sites
+        LOG.info(_LI("**** Refreshing A&AI cache *****"))
+        path = self._aai_versioned_path(
+            '/cloud-infrastructure/cloud-regions/?depth=0')
+        response = self._request(
+            path=path, context="cloud regions", value="all")
+        if response is None:
+            return
+        regions = {}
+        if response.status_code == 200:
+            body = response.json()
+            regions = body.get('cloud-region', {})
+        if not regions:
+            # Nothing to update the cache with
+            LOG.error(_LE("A&AI returned no regions, link: {}{}").
+                      format(self.base, path))
+            return
+
+        sites = []
+        complex_links = {}
+        for region in regions:
+            cloud_region_id = region.get('cloud-region-id')
+            cloud_region_version = region.get('cloud-region-version')
+            if not (cloud_region_version and cloud_region_id):
+                continue
+            rel_link_data_list = \
+                self._get_aai_rel_link_data(
+                    data=region,
+                    related_to='complex',
+                    search_key='complex.physical-location-id')
+            if len(rel_link_data_list) > 1:
+                LOG.error(_LE("Region {} has more than one complex").
+                          format(cloud_region_id))
+                LOG.debug("Region {}: {}".format(cloud_region_id, region))
+                continue
+            rel_link_data = rel_link_data_list[0] if rel_link_data_list \
+                else {}
+            complex_id = rel_link_data.get("d_value")
+            complex_link = rel_link_data.get("link")
+            if not (complex_id and complex_link):  # no complex information
+                LOG.error(_LE("Region {} does not reference a complex").
+                          format(cloud_region_id))
+                continue
+            complex_links.setdefault(complex_id, complex_link)
+            sites.append((region, complex_id, complex_link))
+
+        executor = futurist.ThreadPoolExecutor(
+            max_workers=self.conf.aai.cache_refresh_concurrency)
+        try:
+            complexes = dict(
+                (complex_id, executor.submit(self._get_complex,
+                                             complex_link=complex_link,
+                                             complex_id=complex_id))
+                for complex_id, complex_link in complex_links.items())
+            waiters.wait_for_all(list(complexes.values()))
+
             cache = {
                 'cloud_region': {},
                 'service': {},
             }
-            for region in regions:
+            for region, complex_id, complex_link in sites:
                 cloud_region_id = region.get('cloud-region-id')
-
                 LOG.debug("Working on region '{}' ".format(cloud_region_id))
 
-                cloud_region_version = region.get('cloud-region-version')
-                cloud_owner = region.get('cloud-owner')
-                cloud_type = region.get('cloud-type')
-                cloud_zone = region.get('cloud-zone')
-
-                physical_location_list = self._get_aai_rel_link_data(data=region, related_to='complex',
-                                                                     search_key='complex.physical-location-id')
-                if len(physical_location_list) > 0:
-                    physical_location_id = physical_location_list[0].get('d_value')
-
-                if not (cloud_region_version and cloud_region_id):
-                    continue
-                rel_link_data_list = \
-                    self._get_aai_rel_link_data(
-                        data=region,
-                        related_to='complex',
-                        search_key='complex.physical-location-id')
-                if len(rel_link_data_list) > 1:
-                    LOG.error(_LE("Region {} has more than one complex").
-                              format(cloud_region_id))
-                    LOG.debug("Region {}: {}".format(cloud_region_id, region))
-
-                    continue
-                rel_link_data = rel_link_data_list[0]
-                complex_id = rel_link_data.get("d_value")
-                complex_link = rel_link_data.get("link")
-                if complex_id and complex_link:
-                    complex_info = self._get_complex(
-                        complex_link=complex_link,
-                        complex_id=complex_id)
-                else:  # no complex information
-                    LOG.error(_LE("Region {} does not reference a complex").
-                              format(cloud_region_id))
-                    continue
+                complex_info = complexes[complex_id].result()
                 if not complex_info:
                     LOG.error(_LE("Region {}, complex {} info not found, "
                                   "link {}").format(cloud_region_id,
@@ -296,7 +445,7 @@ class AAI(base.InventoryProviderBase):
                 longitude = complex_info.get('longitude')
                 city = complex_info.get('city')
                 state = complex_info.get('state')
-                region = complex_info.get('region')
+                complex_region = complex_info.get('region')
                 country = complex_info.get('country')
                 complex_name = complex_info.get('complex-name')
 
@@ -310,15 +459,14 @@ class AAI(base.InventoryProviderBase):
                               format(complex_id, missing_keys, complex_link))
                     LOG.debug("Complex {}: {}".
                               format(complex_id, complex_info))
-
                     continue
                 cache['cloud_region'][cloud_region_id] = {
-                    'cloud_region_version': cloud_region_version,
-                    'cloud_owner': cloud_owner,
-                    'cloud_type': cloud_type,
-                    'cloud_zone': cloud_zone,
+                    'cloud_region_version': region.get('cloud-region-version'),
+                    'cloud_owner': region.get('cloud-owner'),
+                    'cloud_type': region.get('cloud-type'),
+                    'cloud_zone': region.get('cloud-zone'),
                     'complex_name': complex_name,
-                    'physical_location_id': physical_location_id,
+                    'physical_location_id': complex_id,
                     'complex': {
                         'complex_id': complex_id,
                         'complex_name': complex_name,
@@ -326,22 +474,28 @@ class AAI(base.InventoryProviderBase):
                         'longitude': longitude,
                         'city': city,
                         'state': state,
-                        'region': region,
+                        'region': complex_region,
                         'country': country,
                     }
                 }
-
-                # Added for HPA support
-                if self.conf.HPA_enabled:
-                    flavors = self._get_flavors(cloud_owner, cloud_region_id)
-                    cache['cloud_region'][cloud_region_id]['flavors'] = flavors
-
                 LOG.debug("Candidate with cloud_region_id '{}' selected "
                           "as a potential candidate - ".format(cloud_region_id))
-            LOG.debug("Done with region '{}' ".format(cloud_region_id))
-            self._aai_cache = cache
-            self.last_refresh_time = time.time()
-            LOG.info(_LI("**** A&AI cache refresh complete *****"))
+
+            # Added for HPA support
+            if cache['cloud_region'] and self.conf.HPA_enabled:
+                flavors = dict(
+                    (cloud_region_id, executor.submit(
+                        self._get_flavors, site['cloud_owner'],
+                        cloud_region_id))
+                    for cloud_region_id, site in cache['cloud_region'].items())
+                waiters.wait_for_all(list(flavors.values()))
+                for cloud_region_id, future in flavors.items():
+                    cache['cloud_region'][cloud_region_id]['flavors'] = \
+                        future.result()
+        finally:
+            # idle workers exit on their own, don't wait for them
+            executor.shutdown(wait=False)
+        return cache
 
     @staticmethod
     def _get_aai_rel_link(data, related_to):
@@ -415,46 +569,80 @@ class AAI(base.InventoryProviderBase):
                 return True
         return False
 
+    def _complex_expired(self, fetched_at):
+        return (time.time() - fetched_at) > \
+            self.complex_cache_refresh_interval * 60
+
     def _get_complex(self, complex_link, complex_id=None):
+        """Return the complex, from the cache when possible
 
-        if not self.complex_last_refresh_time or \
-                (time.time() - self.complex_last_refresh_time) > \
-                self.complex_cache_refresh_interval * 60:
-            self._aai_complex_cache.clear()
+        Expired complexes are still served while they are fetched again
+        in the background.
+        """
         if complex_id and complex_id in self._aai_complex_cache:
-            return self._aai_complex_cache[complex_id]
-        else:
-            path = self._aai_versioned_path(self._get_aai_path_from_link(complex_link))
-            response = self._request(path=path, context="complex", value=complex_id)
-            if response is None:
+            fetched_at, complex_info = self._aai_complex_cache[complex_id]
+            if self._complex_expired(fetched_at):
+                self._revalidate_complex(complex_link, complex_id)
+            return complex_info
+        return self._fetch_complex(complex_link, complex_id)
+
+    def _revalidate_complex(self, complex_link, complex_id):
+        """Fetch an expired complex again in the background"""
+        self._start_refresher()
+        with self._revalidate_lock:
+            if complex_id in self._revalidating_complexes:
                 return
-            if response.status_code == 200:
-                complex_info = response.json()
-                if 'complex' in complex_info:
-                    complex_info = complex_info.get('complex')
+            self._revalidating_complexes.add(complex_id)
+
+        def _revalidate():
+            try:
+                self._fetch_complex(complex_link, complex_id)
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating_complexes.discard(complex_id)
+        self._revalidate_executor.submit(_revalidate)
+
+    def _fetch_complex(self, complex_link, complex_id=None):
+        path = self._aai_versioned_path(self._get_aai_path_from_link(complex_link))
+        response = self._request(path=path, context="complex", value=complex_id)
+        if response is None:
+            return
+        if response.status_code == 200:
+            complex_info = response.json()
+            if 'complex' in complex_info:
+                complex_info = complex_info.get('complex')
 
-                latitude = complex_info.get('latitude')
-                longitude = complex_info.get('longitude')
-                city = complex_info.get('city')
-                country = complex_info.get('country')
-                # removed the state check for countries in Europe that do not always enter states
-                if not (latitude and longitude and city and country):
-                    keys = ('latitude', 'longitude', 'city', 'country')
-                    missing_keys = \
-                        list(set(keys).difference(set(complex_info.keys())))
-                    LOG.error(_LE("Complex {} is missing {}, link: {}").
-                              format(complex_id, missing_keys, complex_link))
-                    LOG.debug("Complex {}: {}".format(complex_id, complex_info))
-                    return
+            latitude = complex_info.get('latitude')
+            longitude = complex_info.get('longitude')
+            city = complex_info.get('city')
+            country = complex_info.get('country')
+            # removed the state check for countries in Europe that do not always enter states
+            if not (latitude and longitude and city and country):
+                keys = ('latitude', 'longitude', 'city', 'country')
+                missing_keys = \
+                    list(set(keys).difference(set(complex_info.keys())))
+                LOG.error(_LE("Complex {} is missing {}, link: {}").
+                          format(complex_id, missing_keys, complex_link))
+                LOG.debug("Complex {}: {}".format(complex_id, complex_info))
+                return
 
-                if complex_id:  # cache only if complex_id is given
-                    self._aai_complex_cache[complex_id] = response.json()
-                    self.complex_last_refresh_time = time.time()
+            if complex_id:  # cache only if complex_id is given
+                self._aai_complex_cache[complex_id] = \
+                    (time.time(), response.json())
 
-                return complex_info
+            return complex_info
 
     def _get_regions(self):
-        self._refresh_cache()
+        """Return the cached cloud regions
+
+        Once the cache has been built, an expired cache is still served
+        while the background refresher builds a new one.
+        """
+        self._start_refresher()
+        if not self._aai_cache:
+            self._refresh_cache()
+        elif self._cache_expired():
+            self._refresh_requested.set()
         regions = self._aai_cache.get('cloud_region', {})
         return regions
 
@@ -1123,6 +1311,39 @@ class AAI(base.InventoryProviderBase):
             complex_info = self.build_complex_dict(complex_info, '')
             return complex_info
 
+    def resolve_vnfs_concurrently(self, resolve, vnfs, name,
+                                  triage_translator_data):
+        """Run resolve(vnf, triage_translator_data) for each VNF
+
+        VNFs are resolved on a bounded thread pool. Their candidates and
+        dropped candidates are gathered in VNF order, as if the VNFs had
+        been resolved one after the other.
+        """
+        if not vnfs:
+            return []
+
+        executor = futurist.ThreadPoolExecutor(
+            max_workers=min(self.conf.aai.resolve_concurrency, len(vnfs)))
+        tasks = []
+        for vnf in vnfs:
+            vnf_triage_data = {'dropped_candidates': [
+                {'name': name, 'translation_dropped': []}]}
+            tasks.append((executor.submit(resolve, vnf, vnf_triage_data),
+                          vnf_triage_data))
+        waiters.wait_for_all([future for future, _ in tasks])
+        executor.shutdown(wait=False)
+
+        candidates = []
+        for future, vnf_triage_data in tasks:
+            dropped = vnf_triage_data['dropped_candidates'][0]
+            for dropped_c in (triage_translator_data or {}).get(
+                    'dropped_candidates', []):
+                if dropped_c['name'] == name:
+                    dropped_c['translation_dropped'].extend(
+                        dropped['translation_dropped'])
+            candidates.extend(future.result())
+        return candidates
+
     def resolve_demands(self, demands, plan_info, triage_translator_data):
         """Resolve demands into inventory candidate lists"""
 
@@ -1288,24 +1509,27 @@ class AAI(base.InventoryProviderBase):
                             continue
                         # add vnf (with vnf_id as key) to the dictionary
                         vnf_dict[vnf_id] = vnf
+
+                    def resolve_service_vnf(vnf, triage_translator_data):
+                        candidates = list()
                         vnf_info = dict()
                         vnf_info['host_id'] = vnf.get("vnf-name")
                         vlan_info = self.build_vlan_info(vlan_key, port_key)
                         cloud = self.resolve_cloud_for_vnf('', '', vnf, service_type, name, triage_translator_data)
                         if cloud['location_id'] is None or cloud['cloud_owner'] is None or \
                                 cloud['cloud_region_version'] is None:
-                            continue
+                            return candidates
 
                         rl_data = self.resolve_global_customer_id_for_vnf('', cloud['location_id'], vnf, customer_id,
                                                                           service_type, name, triage_translator_data)
                         if rl_data is None:
-                            continue
+                            return candidates
                         else:
                             vs_cust_id = rl_data.get('d_value')
                         rl_data = self.resolve_service_instance_id_for_vnf('', cloud['location_id'], vnf, customer_id,
                                                                            service_type, name, triage_translator_data)
                         if rl_data is None:
-                            continue
+                            return candidates
                         else:
                             vs_service_instance_id = rl_data.get('d_value')
 
@@ -1319,7 +1543,7 @@ class AAI(base.InventoryProviderBase):
                             self.triage_translator.collectDroppedCandiate('', cloud['location_id'], name,
                                                                           triage_translator_data,
                                                                           reason="vserver is for a different customer")
-                            continue
+                            return candidates
                         # Added vim-id for short-term workaround
                         other = dict()
                         other['vim-id'] = self.get_vim_id(cloud['cloud_owner'], cloud['location_id'])
@@ -1338,7 +1562,7 @@ class AAI(base.InventoryProviderBase):
                                                                              complex_list, service_type, name,
                                                                              triage_translator_data)
                         if "complex_name" not in complex_info:
-                            continue
+                            return candidates
 
                         service_candidate = Service(info=info, cloud_region=cloud, complex=complex_info,
                                                     generic_vnf=vnf_info, additional_fields=other, vlan=vlan_info)
@@ -1356,33 +1580,37 @@ class AAI(base.InventoryProviderBase):
                                                                           candidate['location_id'], name,
                                                                           triage_translator_data,
                                                                           reason="attibute check error")
-                            continue
+                            return candidates
                         self.assign_candidate_existing_placement(candidate, existing_placement)
 
                         # Pick only candidates not in the excluded list
                         # if excluded candidate list is provided
                         if excluded_candidates and self.match_candidate_by_list(candidate, excluded_candidates, True,
                                                                                 name, triage_translator_data):
-                            continue
+                            return candidates
 
                         # Pick only candidates in the required list
                         # if required candidate list is provided
                         if required_candidates and not self.match_candidate_by_list(candidate, required_candidates,
                                                                                     False, name,
                                                                                     triage_translator_data):
-                            continue
+                            return candidates
 
                         # add the candidate to the demand
                         # Pick only candidates from the restricted_region
                         # or restricted_complex
                         if not self.match_region(candidate, restricted_region_id, restricted_complex_id, name,
                                                  triage_translator_data):
-                            continue
+                            return candidates
                         else:
                             self.add_passthrough_attributes(candidate, passthrough_attributes, name)
-                            resolved_demands[name].append(candidate)
+                            candidates.append(candidate)
                             LOG.debug(">>>>>>> Candidate <<<<<<<")
                             LOG.debug(json.dumps(candidate, indent=4))
+                        return candidates
+
+                    resolved_demands[name].extend(self.resolve_vnfs_concurrently(
+                        resolve_service_vnf, list(vnf_dict.values()), name, triage_translator_data))
 
                 elif (inventory_type == 'vfmodule') and customer_id:
 
@@ -1416,6 +1644,9 @@ class AAI(base.InventoryProviderBase):
                         # add vnf (with vnf_id as key) to the dictionary
                         vnf_dict[vnf_id] = vnf
 
+                    def resolve_vfmodule_vnf(vnf, triage_translator_data):
+                        candidates = list()
+
                         # INFO
                         info = Candidate.build_candidate_info('aai', inventory_type,
                                                               self.conf.data.service_candidate_cost,
@@ -1428,14 +1659,14 @@ class AAI(base.InventoryProviderBase):
                         rl_data = self.resolve_global_customer_id_for_vnf('', '', vnf, customer_id,
                                                                           service_type, name, triage_translator_data)
                         if rl_data is None:
-                            continue
+                            return candidates
                         else:
                             vs_cust_id = rl_data.get('d_value')
 
                         rl_data = self.resolve_service_instance_id_for_vnf('', '', vnf, customer_id,
                                                                            service_type, name, triage_translator_data)
                         if rl_data is None:
-                            continue
+                            return candidates
                         else:
                             vs_service_instance_id = rl_data.get('d_value')
 
@@ -1447,12 +1678,12 @@ class AAI(base.InventoryProviderBase):
                                                                           triage_translator_data,
                                                                           reason="candidate is for a different"
                                                                                  " customer")
-                            continue
+                            return candidates
 
                         vf_modules_list = self.resolve_vf_modules_for_generic_vnf('', '', vnf, name,
                                                                                   triage_translator_data)
                         if vf_modules_list is None:
-                            continue
+                            return candidates
 
                         for vf_module in vf_modules_list:
                             # for vfmodule demands we allow to have vfmodules from different cloud regions
@@ -1549,12 +1780,13 @@ class AAI(base.InventoryProviderBase):
                                 continue
                             else:
                                 self.add_passthrough_attributes(candidate, passthrough_attributes, name)
-                                resolved_demands[name].append(candidate)
+                                candidates.append(candidate)
                                 LOG.debug(">>>>>>> Candidate <<<<<<<")
-                                with open("vf.log", mode='w') as log_file:
-                                    log_file.write(">>>>>>>Vf Candidate <<<<<<<")
-                                    log_file.write(json.dumps(candidate, indent=4))
                                 LOG.debug(json.dumps(candidate, indent=4))
+                        return candidates
+
+                    resolved_demands[name].extend(self.resolve_vnfs_concurrently(
+                        resolve_vfmodule_vnf, list(vnf_dict.values()), name, triage_translator_data))
 
                 elif inventory_type == 'transport' \
                         and customer_id and service_type and \
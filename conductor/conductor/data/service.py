@@ -21,8 +21,13 @@
 # import json
 # import os
 
+import collections
+import copy
+
 import conductor.common.prometheus_metrics as PC
 import cotyledon
+import futurist
+from futurist import waiters
 from conductor import messaging
 # from conductor import __file__ as conductor_root
 from conductor.common.music import messaging as music_messaging
@@ -70,6 +75,19 @@ DATA_OPTS = [
                  default=1.0),
     cfg.FloatOpt('nsst_candidate_cost',
                  default=1.0),
+    cfg.IntOpt('resident_plans',
+               default=10,
+               min=1,
+               help='Number of plans for which resident candidate fields '
+                    'are kept by each worker for batched constraint '
+                    'evaluation. Least recently used plans are dropped '
+                    'first. Default value is 10.'),
+    cfg.IntOpt('resolve_concurrency',
+               default=8,
+               min=1,
+               help='Number of demands resolved at once by each worker '
+                    'when a plan resolves all of its demands in a single '
+                    'request. Default value is 8.'),
 ]
 
 CONF.register_opts(DATA_OPTS, group='data')
@@ -117,6 +135,15 @@ class DataServiceLauncher(object):
             svcmgr.run()
 
 
+# Candidate checks that may be chained in evaluate_candidates
+BATCHED_METHODS = [
+    'invoke_method',
+    'get_candidates_by_attributes',
+    'get_candidates_from_service',
+    'get_candidates_with_vim_capacity',
+]
+
+
 class DataEndpoint(object):
     def __init__(self, ip_ext_manager, vc_ext_manager, sc_ext_manager):
 
@@ -124,6 +151,8 @@ class DataEndpoint(object):
         self.vc_ext_manager = vc_ext_manager
         self.sc_ext_manager = sc_ext_manager
         self.plugin_cache = {}
+        # plan id -> demand name -> candidate id -> resident fields
+        self.resident_candidates = collections.OrderedDict()
         self.triage_data_trans = {
             'plan_id': None,
             'plan_name': None,
@@ -509,6 +538,85 @@ class DataEndpoint(object):
 
         return {'response': candidate_list, 'error': error}
 
+    def _get_resident_candidates(self, plan_id, demand_name):
+        """Return the resident candidate fields of a plan demand"""
+        plan_candidates = self.resident_candidates.pop(plan_id, {})
+        # Keep the most recently used plan last, drop the oldest ones.
+        self.resident_candidates[plan_id] = plan_candidates
+        while len(self.resident_candidates) > CONF.data.resident_plans:
+            self.resident_candidates.popitem(last=False)
+        return plan_candidates.setdefault(demand_name, {})
+
+    def evaluate_candidates(self, ctx, arg):
+        '''
+        RPC for running several candidate checks in one round trip
+        :param ctx: context, carries the plan_id
+        :param arg: demand_name, candidate_list without resident fields,
+                    requests as a list of (method, args) pairs and,
+                    optionally, resident fields keyed by candidate id
+        :return: response with the remaining candidates (without resident
+                 fields), or the candidate ids whose resident fields are
+                 missing
+        '''
+        resident = self._get_resident_candidates(ctx.get('plan_id'),
+                                                 arg['demand_name'])
+        resident.update(arg.get('resident') or {})
+
+        candidate_list = arg['candidate_list']
+        missing = [c['candidate_id'] for c in candidate_list
+                   if c['candidate_id'] not in resident]
+        if missing:
+            return {'response': {'missing': missing}, 'error': False}
+        for candidate in candidate_list:
+            candidate.update(resident[candidate['candidate_id']])
+
+        error = False
+        for method, method_arg in arg['requests']:
+            if method not in BATCHED_METHODS:
+                LOG.error(_LE("Method {} can not be batched").format(method))
+                error = True
+                break
+            method_arg['candidate_list'] = candidate_list
+            result = getattr(self, method)(ctx, method_arg)
+            error = error or result.get('error')
+            candidate_list = result.get('response') or []
+            if not candidate_list:
+                break
+
+        for candidate in candidate_list:
+            for field in resident.get(candidate['candidate_id'], {}):
+                candidate.pop(field, None)
+        return {'response': {'candidate_list': candidate_list},
+                'error': error}
+
+    def _resolve_demands(self, demands, plan_info, triage_translator_data):
+        """Resolve demands with every inventory provider
+
+        Returns None when no provider answered.
+        """
+        results = self.ip_ext_manager.map_method(
+            'resolve_demands',
+            demands, plan_info, triage_translator_data
+        )
+        if not results:
+            return None
+        if len(results) > 1:
+            return self.get_resolved_demands_from_result(results)
+        return results[0]
+
+    def _collect_translator_triage(self, triage_translator_data):
+        """Keep the dropped candidates of a plan for the translator"""
+        if self.triage_data_trans['plan_id']== None :
+            self.triage_data_trans['plan_name'] = triage_translator_data['plan_name']
+            self.triage_data_trans['plan_id'] = triage_translator_data['plan_id']
+            self.triage_data_trans['translator_triage'].append(triage_translator_data['dropped_candidates'])
+        elif not self.triage_data_trans['plan_id'] == triage_translator_data['plan_id'] :
+            self.triage_data_trans = {'plan_id': triage_translator_data['plan_id'],
+                                      'plan_name': triage_translator_data['plan_name'], 'translator_triage': []}
+            self.triage_data_trans['translator_triage'].append(triage_translator_data['dropped_candidates'])
+        else:
+            self.triage_data_trans['translator_triage'].append(triage_translator_data['dropped_candidates'])
+
     def resolve_demands(self, ctx, arg):
 
         log_util.setLoggerFilter(LOG, ctx.get('keyspace'), ctx.get('plan_id'))
@@ -517,26 +625,10 @@ class DataEndpoint(object):
         demands = arg.get('demands')
         plan_info = arg.get('plan_info')
         triage_translator_data = arg.get('triage_translator_data')
-        resolved_demands = None
-        results = self.ip_ext_manager.map_method(
-            'resolve_demands',
-            demands, plan_info, triage_translator_data
-        )
-        if results and len(results) > 0:
-            if len(results) > 1:
-                resolved_demands = self.get_resolved_demands_from_result(results)
-            else:
-                resolved_demands = results[0]
-            if self.triage_data_trans['plan_id']== None :
-                self.triage_data_trans['plan_name'] = triage_translator_data['plan_name']
-                self.triage_data_trans['plan_id'] = triage_translator_data['plan_id']
-                self.triage_data_trans['translator_triage'].append(triage_translator_data['dropped_candidates'])
-            elif not self.triage_data_trans['plan_id'] == triage_translator_data['plan_id'] :
-                self.triage_data_trans = {'plan_id': triage_translator_data['plan_id'],
-                                          'plan_name': triage_translator_data['plan_name'], 'translator_triage': []}
-                self.triage_data_trans['translator_triage'].append(triage_translator_data['dropped_candidates'])
-            else:
-                self.triage_data_trans['translator_triage'].append(triage_translator_data['dropped_candidates'])
+        resolved_demands = self._resolve_demands(demands, plan_info,
+                                                 triage_translator_data)
+        if resolved_demands is not None:
+            self._collect_translator_triage(triage_translator_data)
         else:
             error = True
 
@@ -544,6 +636,62 @@ class DataEndpoint(object):
                              'trans': self.triage_data_trans},
                 'error': error}
 
+    def resolve_all_demands(self, ctx, arg):
+        """Resolve every demand of a plan in one request
+
+        Demands are resolved concurrently, each as resolve_demands would
+        resolve it alone, and their triage data is kept in demand order.
+        Demands no provider answered for, or whose provider failed, are
+        left out. The required
+        candidates of the demands are returned by demand name, under
+        'required_candidates'.
+        """
+        log_util.setLoggerFilter(LOG, ctx.get('keyspace'), ctx.get('plan_id'))
+
+        error = False
+        demands = arg.get('demands') or {}
+        plan_info = arg.get('plan_info')
+        triage_translator_data = arg.get('triage_translator_data')
+
+        tasks = []
+        if demands:
+            executor = futurist.ThreadPoolExecutor(
+                max_workers=min(CONF.data.resolve_concurrency, len(demands)))
+            for name, requirements in demands.items():
+                demand_triage_data = copy.deepcopy(triage_translator_data)
+                future = executor.submit(self._resolve_demands,
+                                         {name: requirements}, plan_info,
+                                         demand_triage_data)
+                tasks.append((name, future, demand_triage_data))
+            # No demand is still being resolved once this returns, even
+            # when resolving another one failed
+            waiters.wait_for_all([future for _, future, _ in tasks])
+            executor.shutdown(wait=False)
+
+        resolved_demands = {}
+        required_candidates = {}
+        for name, future, demand_triage_data in tasks:
+            if future.exception() is not None:
+                LOG.error(_LE("Resolving demand {} failed: {}").format(
+                    name, future.exception()))
+                error = True
+                continue
+            resolved = future.result()
+            if resolved is None:
+                LOG.error(_LE("Unable to resolve demand {}").format(name))
+                error = True
+                continue
+            required = resolved.pop('required_candidates', None)
+            if required:
+                required_candidates[name] = required
+            resolved_demands.update(resolved)
+            self._collect_translator_triage(demand_triage_data)
+        resolved_demands['required_candidates'] = required_candidates
+
+        return {'response': {'resolved_demands': resolved_demands,
+                             'trans': self.triage_data_trans},
+                'error': error}
+
     def get_resolved_demands_from_result(self, results):
         resolved_demands = {de: [] for de in results[0].keys()}
         for result in results:
@@ -36,7 +36,9 @@ import conductor.data.plugins.service_controller.sdnc
 import conductor.data.plugins.vim_controller.multicloud
 import conductor.reservation.service
 import conductor.service
+import conductor.solver.optimizer.optimizer
 import conductor.solver.service
+import conductor.solver.triage_tool.triage_data
 
 
 def list_opts():
@@ -72,7 +74,10 @@ def list_opts():
         ('messaging_server',
          conductor.common.music.messaging.component.MESSAGING_SERVER_OPTS),
         ('music_api', conductor.common.music.api.MUSIC_API_OPTS),
-        ('solver', conductor.solver.service.SOLVER_OPTS),
+        ('solver', itertools.chain(
+            conductor.solver.service.SOLVER_OPTS,
+            conductor.solver.optimizer.optimizer.SOLVER_OPTS,
+            conductor.solver.triage_tool.triage_data.TRIAGE_OPTS)),
         ('reservation', conductor.reservation.service.reservation_OPTS),
         ('aaf_sms', conductor.common.sms.AAF_SMS_OPTS),
         ('aaf_api',
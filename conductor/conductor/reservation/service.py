@@ -162,7 +162,8 @@ class ReservationService(cotyledon.Service):
 
         Use this only when the reservation service is not running concurrently.
         """
-        plans = self.Plan.query.get_plan_by_col("status", self.Plan.RESERVING)
+        plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.RESERVING)
         for the_plan in plans:
             the_plan.status = self.Plan.SOLVED
             # Use only in active-passive mode, so don't have to be atomic
@@ -261,8 +262,10 @@ class ReservationService(cotyledon.Service):
 
             # Instead of using the query.all() method, now creating an index for 'status'
             # field in conductor.plans table, and query plans by status columns
-            solved_plans = self.Plan.query.get_plan_by_col("status", self.Plan.SOLVED)
-            reserving_plans = self.Plan.query.get_plan_by_col("status", self.Plan.RESERVING)
+            solved_plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+                "status", self.Plan.SOLVED)
+            reserving_plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+                "status", self.Plan.RESERVING)
 
             # combine the plans with status = 'solved' and 'reserving' together
             plans = solved_plans + reserving_plans
@@ -18,7 +18,6 @@
 # -------------------------------------------------------------------------
 #
 
-import copy
 import operator
 from oslo_log import log
 import sys
@@ -35,7 +34,7 @@ class BestFirst(search.Search):
         search.Search.__init__(self, conf)
 
     def search(self, _demand_list, _objective):
-        dlist = copy.deepcopy(_demand_list)
+        dlist = list(_demand_list)
         heuristic_solution = self._search_by_fit_first(dlist, _objective)
         if heuristic_solution is None:
             LOG.debug("no solution")
@@ -20,15 +20,20 @@
 
 
 import operator
+
+import numpy as np
 from oslo_log import log
 
 from conductor.solver.optimizer.constraints import constraint
+from conductor.solver.request import candidate_table
 from conductor.solver.utils import utils
 
 LOG = log.getLogger(__name__)
 
 
 class AccessDistance(constraint.Constraint):
+    path_independent = True
+
     def __init__(self, _name, _type, _demand_list, _priority=0,
                  _comparison_operator=operator.le,
                  _threshold=None, _location=None):
@@ -48,19 +53,26 @@ class AccessDistance(constraint.Constraint):
             LOG.debug("Empty candidate list, need to get " +
                       "the candidate list for the demand/service")
             return _candidate_list
-        conflict_list = []
         cei = _request.cei
-        for candidate in _candidate_list:
-            air_distance = utils.compute_air_distance(
-                self.location.value,
-                cei.get_candidate_location(candidate))
-            if not self.comparison_operator(air_distance,
-                                            self.distance_threshold):
-                if candidate not in conflict_list:
-                    conflict_list.append(candidate)
+        table, rows = candidate_table.rows_of(_candidate_list)
+        if table is not None:
+            # Read the coordinates off the table columns, only looking
+            # up the candidates without any
+            locations = table.coordinates(rows)
+            for i in np.flatnonzero(np.isnan(locations).any(axis=1)):
+                locations[i] = cei.get_candidate_location(_candidate_list[i])
+        else:
+            locations = [cei.get_candidate_location(c)
+                         for c in _candidate_list]
+        air_distances = utils.compute_air_distances(
+            self.location.value, locations)
+        mask = self.comparison_operator(air_distances,
+                                        self.distance_threshold)
 
+        if table is not None:
+            return table.select(rows[mask])
         _candidate_list = \
-            [c for c in _candidate_list if c not in conflict_list]
+            [c for c, keep in zip(_candidate_list, mask) if keep]
         # self.distance_threshold
         # cei = _request.constraint_engine_interface
         # _candidate_list = \
@@ -23,6 +23,7 @@
 
 # Conductor imports
 from conductor.solver.optimizer.constraints import constraint
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
 
 # Third-party library imports
 from oslo_log import log
@@ -31,6 +32,8 @@ LOG = log.getLogger(__name__)
 
 
 class Attribute(constraint.Constraint):
+    path_independent = True
+
     def __init__(self, _name, _type, _demand_list, _priority=0,
                  _properties=None):
         constraint.Constraint.__init__(
@@ -41,9 +44,15 @@ class Attribute(constraint.Constraint):
         # call conductor engine with request parameters
         cei = _request.cei
         demand_name = _decision_path.current_demand.name
-        select_list = cei.get_candidates_by_attributes(demand_name,
-                                                       _candidate_list,
-                                                       self.properties)
+        if cei.batched:
+            select_list = cei.evaluate_candidates(
+                _request.plan_id, demand_name, _candidate_list,
+                [cei.attributes_request(demand_name, self.properties)]) or []
+        else:
+            select_list = cei.get_candidates_by_attributes(demand_name,
+                                                           _candidate_list,
+                                                           self.properties)
+        selected = CandidateIndex.keys(select_list)
         _candidate_list[:] = \
-            [c for c in _candidate_list if c in select_list]
+            [c for c in _candidate_list if CandidateIndex.key(c) in selected]
         return _candidate_list
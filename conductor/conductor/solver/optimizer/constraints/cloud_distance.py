@@ -40,8 +40,6 @@ class CloudDistance(constraint.Constraint):
             raise ValueError
 
     def solve(self, _decision_path, _candidate_list, _request):
-        conflict_list = []
-
         # get the list of candidates filtered from the previous demand
         solved_demands = list()  # demands that have been solved in the past
         decision_list = list()
@@ -65,28 +63,20 @@ class CloudDistance(constraint.Constraint):
 
         # LOG.debug("decisions = {}".format(decision_list))
 
-        # temp copy to iterate
-        # temp_candidate_list = copy.deepcopy(_candidate_list)
-        # for candidate in temp_candidate_list:
-        for candidate in _candidate_list:
-            # check if candidate satisfies constraint
-            # for all relevant decisions thus far
-            is_candidate = True
-            for filtered_candidate in decision_list:
-                cei = _request.cei
-                if not self.comparison_operator(
-                        utils.compute_air_distance(
-                            cei.get_candidate_location(candidate),
-                            cei.get_candidate_location(filtered_candidate)),
-                        self.distance_threshold):
-                    is_candidate = False
+        if not decision_list:
+            return _candidate_list
 
-            if not is_candidate:
-                if candidate not in conflict_list:
-                    conflict_list.append(candidate)
+        # check if candidates satisfy the constraint
+        # for all relevant decisions thus far
+        cei = _request.cei
+        air_distances = utils.compute_air_distance_matrix(
+            [cei.get_candidate_location(c) for c in _candidate_list],
+            [cei.get_candidate_location(d) for d in decision_list])
+        mask = self.comparison_operator(
+            air_distances, self.distance_threshold).all(axis=1)
 
         _candidate_list = \
-            [c for c in _candidate_list if c not in conflict_list]
+            [c for c, keep in zip(_candidate_list, mask) if keep]
 
         # msg = "final candidate list for demand {} is "
         # LOG.debug(msg.format(_decision_path.current_demand.name))
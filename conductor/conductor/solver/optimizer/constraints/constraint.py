@@ -22,6 +22,8 @@ import abc
 from oslo_log import log
 import six
 
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
+
 LOG = log.getLogger(__name__)
 
 
@@ -29,6 +31,10 @@ LOG = log.getLogger(__name__)
 class Constraint(object):
     """Base class for Constraints"""
 
+    # Set in constraints whose verdict on a candidate depends on the
+    # candidate alone, not on the decisions made for other demands.
+    path_independent = False
+
     def __init__(self, _name, _type, _demand_list, _priority=0):
         """Common initializer.
 
@@ -39,6 +45,49 @@ class Constraint(object):
         self.demand_list = _demand_list
         self.check_priority = _priority
 
+        # demand name -> candidate key -> solved candidate (None if dropped)
+        self.verdicts = {}
+
+    def memoized_solve(self, _decision_path, _candidate_list, _request):
+        """Solve, reusing the verdicts of path independent constraints.
+
+        Constraints live as long as the plan, so every search for the plan
+        (e.g. one per requested solution) only solves the candidates not
+        seen before for the demand.
+        """
+        if not self.path_independent:
+            return self.solve(_decision_path, _candidate_list, _request)
+
+        verdicts = self.verdicts.setdefault(
+            _decision_path.current_demand.name, {})
+        unseen = [c for c in _candidate_list
+                  if CandidateIndex.key(c) not in verdicts]
+        if unseen:
+            # solve() may filter the list it is given in place
+            solved = self.solve(_decision_path, list(unseen), _request)
+            for candidate in unseen:
+                verdicts[CandidateIndex.key(candidate)] = None
+            for candidate in solved or []:
+                verdicts[CandidateIndex.key(candidate)] = candidate
+
+        solved = []
+        for candidate in _candidate_list:
+            verdict = verdicts[CandidateIndex.key(candidate)]
+            if verdict is not None:
+                solved.append(verdict)
+        return solved
+
+    def reset_triage_state(self):
+        """Drop the triage constraints of the memoized candidates
+
+        Verdicts may hold copies of the candidates handed back by the data
+        service, the search annotates those too.
+        """
+        for verdicts in self.verdicts.values():
+            for candidate in verdicts.values():
+                if candidate is not None and 'constraints' in candidate:
+                    candidate['constraints'] = []
+
     @abc.abstractmethod
     def solve(self, _decision_path, _candidate_list, _request):
         """Solve.
@@ -34,6 +34,8 @@ LOG = log.getLogger(__name__)
 
 
 class HPA(constraint.Constraint):
+    path_independent = True
+
     def __init__(self, _name, _type, _demand_list, _priority=0,
                  _properties=None):
         constraint.Constraint.__init__(
@@ -54,6 +56,24 @@ class HPA(constraint.Constraint):
         LOG.info(_LI("Solving constraint type '{}' for demand - [{}]").format(
             self.constraint_type, demand_name))
         vm_label_list = self.properties.get('evaluate')
+        if cei.batched:
+            # Match all vm labels in a single data service round trip.
+            requests = [cei.hpa_request(vm_demand['id'],
+                                        vm_demand['type'],
+                                        vm_demand['directives'],
+                                        vm_demand['flavorProperties'])
+                        for vm_demand in vm_label_list]
+            response = cei.evaluate_candidates(_request.plan_id,
+                                               demand_name,
+                                               _candidate_list, requests)
+            if not response:
+                LOG.error(_LE("No matching candidates for HPA exists"))
+
+                # Metrics to Prometheus
+                PC.HPA_CLOUD_REGION_UNSUCCESSFUL.labels('ONAP', 'N/A',
+                                                        'ALL').inc()
+            return response
+
         for vm_demand in vm_label_list:
             id = vm_demand['id']
             type = vm_demand['type']
@@ -21,6 +21,8 @@
 
 from oslo_log import log
 
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
+
 from .constraint import Constraint    # Python 3 import statement relative imports
 
 LOG = log.getLogger(__name__)
@@ -50,8 +52,9 @@ class InventoryGroup(Constraint):
             _candidate_list,
             _decision_path.current_demand.name,
             resolved_candidate)
+        selected = CandidateIndex.keys(inventory_group_candidates)
         _candidate_list = [candidate for candidate in _candidate_list if
-                           (candidate in inventory_group_candidates)]
+                           CandidateIndex.key(candidate) in selected]
 
         '''
         # Alternate implementation that *may* be more efficient
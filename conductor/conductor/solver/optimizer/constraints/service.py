@@ -21,11 +21,14 @@ from oslo_log import log
 
 from conductor.i18n import _LE
 from conductor.solver.optimizer.constraints import constraint
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
 
 LOG = log.getLogger(__name__)
 
 
 class Service(constraint.Constraint):
+    path_independent = True
+
     def __init__(self, _name, _type, _demand_list, _priority=0,
                  _controller=None, _request=None, _cost=None,
                  _inventory_type=None):
@@ -65,10 +68,18 @@ class Service(constraint.Constraint):
         if len(candidates_to_check) > 0:
             cei = _request.cei
             request_type = _request.request_type
-            filtered_list = cei.get_candidates_from_service(
-                self.name, self.constraint_type, candidates_to_check,
-                self.controller, self.inventory_type, self.request,
-                self.cost, demand_name, request_type)
+            if cei.batched:
+                filtered_list = cei.evaluate_candidates(
+                    _request.plan_id, demand_name, candidates_to_check,
+                    [cei.service_request(
+                        self.name, self.constraint_type, self.controller,
+                        self.inventory_type, self.request, self.cost,
+                        demand_name, request_type)]) or []
+            else:
+                filtered_list = cei.get_candidates_from_service(
+                    self.name, self.constraint_type, candidates_to_check,
+                    self.controller, self.inventory_type, self.request,
+                    self.cost, demand_name, request_type)
             for c in filtered_list:
                 select_list.append(c)
         else:
@@ -78,5 +89,7 @@ class Service(constraint.Constraint):
                 self.inventory_type, demand_name)
             )
 
-        _candidate_list[:] = [c for c in _candidate_list if c in select_list]
+        selected = CandidateIndex.keys(select_list)
+        _candidate_list[:] = [c for c in _candidate_list
+                              if CandidateIndex.key(c) in selected]
         return _candidate_list
@@ -19,6 +19,7 @@
 
 from conductor.i18n import _LI
 from conductor.solver.optimizer.constraints import constraint
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
 from conductor.solver.utils.utils import OPERATIONS
 from oslo_log import log
 
@@ -26,6 +27,7 @@ LOG = log.getLogger(__name__)
 
 
 class Threshold(constraint.Constraint):
+    path_independent = True
 
     def __init__(self, _name, _type, _demand_list, _priority=0,
                  _properties=None):
@@ -35,7 +37,7 @@ class Threshold(constraint.Constraint):
 
     def solve(self, _decision_path, _candidate_list, _request):
 
-        conflict_list = list()
+        conflicts = set()
         demand_name = _decision_path.current_demand.name
 
         LOG.info(_LI("Solving constraint {} of type '{}' for demand - [{}]").format(
@@ -49,9 +51,10 @@ class Threshold(constraint.Constraint):
 
                 attribute_value = candidate.get(attribute)
                 if not attribute_value or not operation(attribute_value, threshold):
-                    conflict_list.append(candidate)
+                    conflicts.add(CandidateIndex.key(candidate))
                     break
 
-        filtered_candidates = [c for c in _candidate_list if c not in conflict_list]
+        filtered_candidates = [c for c in _candidate_list
+                               if CandidateIndex.key(c) not in conflicts]
 
         return filtered_candidates
\ No newline at end of file
@@ -33,6 +33,8 @@ LOG = log.getLogger(__name__)
 
 
 class VimFit(constraint.Constraint):
+    path_independent = True
+
     def __init__(self, _name, _type, _demand_list, _priority=0,
                  _properties=None):
         constraint.Constraint.__init__(
@@ -53,8 +55,14 @@ class VimFit(constraint.Constraint):
         vim_request = self.properties.get('request')
         LOG.info(_LI("Solving constraint type '{}' for demand - [{}]").format(
             self.constraint_type, demand_name))
-        response = (
-            cei.get_candidates_with_vim_capacity(_candidate_list, vim_request))
+        if cei.batched:
+            response = cei.evaluate_candidates(
+                _request.plan_id, demand_name, _candidate_list,
+                [cei.vim_capacity_request(vim_request)])
+        else:
+            response = (
+                cei.get_candidates_with_vim_capacity(_candidate_list,
+                                                     vim_request))
         if response:
             _candidate_list = response
         return _candidate_list
@@ -22,6 +22,8 @@
 import operator
 from oslo_log import log
 
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
+
 from .constraint import Constraint # Python 3 import statement relative imports
 
 LOG = log.getLogger(__name__)
@@ -43,7 +45,7 @@ class Zone(Constraint):
             self.comparison_operator = operator.ne
 
     def solve(self, _decision_path, _candidate_list, _request):
-        conflict_list = []
+        conflicts = set()
 
         decision_list = list()
         # find previously made decisions for the constraint's demand list
@@ -74,12 +76,12 @@ class Zone(Constraint):
                     is_candidate = False
 
             if not is_candidate:
-                if candidate not in conflict_list:
-                    conflict_list.append(candidate)
-                    # _candidate_list.remove(candidate)
+                conflicts.add(CandidateIndex.key(candidate))
+                # _candidate_list.remove(candidate)
 
         _candidate_list[:] =\
-            [c for c in _candidate_list if c not in conflict_list]
+            [c for c in _candidate_list
+             if CandidateIndex.key(c) not in conflicts]
 
         # msg = "final candidate list for demand {} is "
         # LOG.debug(msg.format(_decision_path.current_demand.name))
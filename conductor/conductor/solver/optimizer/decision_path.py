@@ -19,9 +19,6 @@
 #
 
 
-import copy
-
-
 class DecisionPath(object):
 
     def __init__(self):
@@ -49,7 +46,9 @@ class DecisionPath(object):
         self.total_cost = 0.0
 
     def set_decisions(self, _prior_decisions):
-        self.decisions = copy.deepcopy(_prior_decisions)
+        # Paths share the candidates of their prior decisions, which are
+        # never modified through a path; only the mapping is copied.
+        self.decisions = dict(_prior_decisions)
 
     def set_decision_id(self, _dk, _rk):
         self.decision_id += (str(_dk) + ":" + str(_rk) + ">")
@@ -33,11 +33,13 @@ class FitFirst(search.Search):
     def __init__(self, conf):
         search.Search.__init__(self, conf)
 
-    def search(self, _demand_list, _objective, _request):
+    def search(self, _demand_list, _objective, _request, _begin_time=None):
         decision_path = dpath.DecisionPath()
         decision_path.set_decisions({})
 
-        _begin_time = int(round(time.time()))
+        # The search times out solver_timeout seconds after _begin_time
+        if _begin_time is None:
+            _begin_time = int(round(time.time()))
 
         # Begin the recursive serarch
         return self._find_current_best(
@@ -82,12 +84,16 @@ class FitFirst(search.Search):
         # Start recursive search
         while True:
             best_resource = None
+            # Operands that do not involve this demand have the same
+            # value for every candidate, evaluate them only once
+            prepared = _objective.prepare(_decision_path, demand.name,
+                                          _request)
             # Find best candidate that optimizes the cost for demand.
             # The candidate list can be empty if the constraints
             # rule out all candidates
             for candidate in candidate_list:
                 _decision_path.decisions[demand.name] = candidate
-                _objective.compute(_decision_path, _request)
+                _objective.compute_delta(_decision_path, _request, prepared)
                 # this will set the total_value of the _decision_path
                 # thus far up to the demand
                 if _objective.goal is None:
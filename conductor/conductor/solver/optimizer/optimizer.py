@@ -20,14 +20,17 @@
 from oslo_config import cfg
 from oslo_log import log
 import copy
+import futurist
+from futurist import waiters
 import time
 
 from conductor import service
-# from conductor.solver.optimizer import decision_path as dpath
+from conductor.solver.optimizer import decision_path as dpath
 # from conductor.solver.optimizer import best_first
 # from conductor.solver.optimizer import greedy
 from conductor.solver.optimizer import fit_first
 from conductor.solver.optimizer import random_pick
+from conductor.solver.optimizer import search
 from conductor.solver.request import demand
 from conductor.solver.triage_tool.triage_data import TriageData
 
@@ -36,7 +39,13 @@ LOG = log.getLogger(__name__)
 CONF = cfg.CONF
 
 SOLVER_OPTS = [
-
+    cfg.IntOpt('presolve_workers',
+               default=4,
+               min=0,
+               help='Number of threads solving the path independent '
+                    'constraints (HPA, vim_fit, attribute, service, ...) '
+                    'of all demands concurrently before the search starts. '
+                    'Set to 0 to solve them during the search instead.'),
 ]
 
 CONF.register_opts(SOLVER_OPTS, group='solver')
@@ -48,9 +57,9 @@ class Optimizer(object):
     def __init__(self, conf, _requests=None, _begin_time=None):
         self.conf = conf
 
-        # start time of solving the plan
-        if _begin_time is not None:
-            self._begin_time = _begin_time
+        # start time of solving the plan, the search for more solutions
+        # stops solver_timeout seconds after it
+        self._begin_time = _begin_time
 
         # self.search = greedy.Greedy(self.conf)
         self.search = None
@@ -71,6 +80,54 @@ class Optimizer(object):
         #     req_sim.generate_requests()
         #     self.requests = req_sim.requests
 
+    def presolve_constraints(self):
+        """Solve the path independent constraints of all demands
+
+        Demands are solved concurrently. Constraints memoize their
+        verdicts, which leaves only the path dependent constraints
+        (aic_distance, zone, inventory_group, ...) to the search.
+        """
+        workers = self.conf.solver.presolve_workers
+        for rk in self.requests:
+            request = self.requests[rk]
+            demand_list = [d for d in request.demands.values()
+                           if any(c.path_independent
+                                  for c in d.constraint_list)]
+            if not workers or not demand_list:
+                continue
+
+            st = time.time()
+            executor = futurist.ThreadPoolExecutor(
+                max_workers=min(workers, len(demand_list)))
+            futures = [executor.submit(self._presolve_demand, request, d)
+                       for d in demand_list]
+            waiters.wait_for_all(futures)
+            # idle workers exit on their own, don't wait for them
+            executor.shutdown(wait=False)
+            for d, future in zip(demand_list, futures):
+                if future.exception() is not None:
+                    # the search solves the demand again
+                    LOG.warning("presolving demand {} failed: {}".format(
+                        d.name, future.exception()))
+            LOG.debug("presolve delay = {} sec".format(time.time() - st))
+
+    def _presolve_demand(self, _request, _demand):
+        decision_path = dpath.DecisionPath()
+        decision_path.set_decisions({})
+        decision_path.current_demand = _demand
+
+        candidate_list = list(_demand.resources.values())
+        search.assign_node_id(candidate_list, _demand.name)
+        for constraint in _demand.constraint_list:
+            # Path dependent constraints only ever drop candidates, so
+            # the verdicts on this superset cover what the search asks
+            if not constraint.path_independent:
+                continue
+            candidate_list = constraint.memoized_solve(
+                decision_path, candidate_list, _request)
+            if not candidate_list:
+                break
+
     def get_solution(self, num_solutions):
 
         LOG.debug("search start for max {} solutions".format(num_solutions))
@@ -90,10 +147,19 @@ class Optimizer(object):
             rand_counter = 10
             while num_solutions == 'all' or num_solutions > 0:
 
+                # the search itself gives up on timing out, don't start
+                # another one for the next solution
+                if decision_list and self._timed_out():
+                    LOG.info("Plan timed out after {} solution(s)".format(
+                        len(decision_list)))
+                    break
+
                 LOG.debug("searching for the solution {}".format(len(decision_list) + 1))
 
                 st = time.time()
-                _copy_demand_list = copy.deepcopy(demand_list)
+                # The search pops demands off the list, keep their order
+                _copy_demand_list = list(demand_list)
+                self._reset_triage_state(demand_list)
 
                 if not request.objective.goal:
                     LOG.debug("No objective function is provided. "
@@ -104,11 +170,12 @@ class Optimizer(object):
                     LOG.debug("Fit first algorithm is used")
                     self.search = fit_first.FitFirst(self.conf)
                     best_path = self.search.search(demand_list,
-                                                   request.objective, request)
+                                                   request.objective, request,
+                                                   self._begin_time)
 
                 LOG.debug("search delay = {} sec".format(time.time() - st))
 
-                demand_list = copy.deepcopy(_copy_demand_list)
+                demand_list = list(_copy_demand_list)
 
                 if best_path is not None:
                     self.search.print_decisions(best_path)
@@ -124,8 +191,11 @@ class Optimizer(object):
                     LOG.debug("no solution found")
                     break
 
-                # add the current solution to decision_list
-                decision_list.append(best_path.decisions)
+                # add the current solution to decision_list, copying the
+                # chosen candidates as later searches annotate them
+                decision_list.append(dict(
+                    (demand_name, copy.copy(candidate))
+                    for demand_name, candidate in best_path.decisions.items()))
 
                 #remove the candidate with "uniqueness = true"
                 self._remove_unique_candidate(request, best_path, demand_list)
@@ -135,6 +205,22 @@ class Optimizer(object):
             self.search.triageSolver.getSolution(decision_list)
             return decision_list
 
+    def _timed_out(self):
+        if self._begin_time is None:
+            return False
+        return (int(round(time.time())) - self._begin_time) > \
+            self.conf.solver.solver_timeout
+
+    def _reset_triage_state(self, demand_list):
+        # Searches run on the same candidates, drop the constraints that
+        # filtered them out in the previous search
+        for current_demand in demand_list:
+            for candidate in current_demand.resources.values():
+                if 'constraints' in candidate:
+                    candidate['constraints'] = []
+            for constraint in current_demand.constraint_list:
+                constraint.reset_triage_state()
+
     def _has_candidates(self, request):
         for demand_name, demand in request.demands.items():
             LOG.debug("Req Available resources: {} {}".format(demand_name, len(request.demands[demand_name].resources)))
@@ -23,10 +23,20 @@ from oslo_log import log
 
 from conductor.solver.optimizer import decision_path as dpath
 from conductor.solver.triage_tool.triage_data import TriageData
+from conductor.solver.utils.constraint_engine_interface import CandidateIndex
 
 LOG = log.getLogger(__name__)
 
 
+def assign_node_id(candidate_list, demand_name):
+    """Tag candidates with the node id used by the triage tool"""
+    for cr in candidate_list:
+        if not 'node_id' in cr:
+            cr['name'] = demand_name
+            cr['node_id'] = (demand_name + '|' + cr['candidate_id'])
+            cr['constraints'] = []
+
+
 class Search(object):
 
     def __init__(self, conf):
@@ -59,7 +69,8 @@ class Search(object):
 
             solver['candidate_before_list'] = candidate_list
             candidate_list =\
-                constraint.solve(_decision_path, candidate_list, _request)
+                constraint.memoized_solve(_decision_path, candidate_list,
+                                          _request)
             LOG.debug("Available candidates after solving "
                       "constraint {}".format(candidate_list))
             solver['constraint_name_for_can'] = constraint.name
@@ -86,8 +97,9 @@ class Search(object):
         _candidate_list[:] = sorted(_candidate_list, key=itemgetter("cost"))
     def dropped_candidate(self,candidates_before, candidate_after, constraint_name, demand_name):
         dropped_candidate = []
+        kept = CandidateIndex.keys(candidate_after)
         for dc in candidates_before:
-            if dc not in candidate_after:
+            if CandidateIndex.key(dc) not in kept:
                 dropped_details={}
                 dropped_details['constraint_name_dropped'] = constraint_name
                 dropped_details['name'] = demand_name
@@ -95,11 +107,7 @@ class Search(object):
                 dropped_candidate.append(dc)
         self.triageSolver.droppedCadidatesStatus(dropped_candidate)
     def assignNodeId(self, candidate_list, demand_name):
-        for cr in candidate_list:
-            if not 'node_id' in cr:
-                cr['name'] = demand_name
-                cr['node_id'] = (demand_name + '|' + cr['candidate_id'])
-                cr['constraints'] = []
+        assign_node_id(candidate_list, demand_name)
     def print_decisions(self, _best_path):
         if _best_path:
             msg = "--- demand = {}, chosen resource = {} at {}"
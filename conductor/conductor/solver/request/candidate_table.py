@@ -0,0 +1,216 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+"""Columnar storage of the candidates of a demand
+
+A demand may have tens of thousands of candidates sharing the same keys
+and mostly the same values. The table keeps one column per key, with
+interned strings, instead of one dict per candidate. Candidates are
+handed out as row views that read and write the table, so constraints
+keep working with mappings.
+"""
+
+import collections.abc
+import copy
+import sys
+
+import numpy as np
+
+# Value of a column for the rows without the key
+_MISSING = object()
+
+
+class CandidateRow(collections.abc.MutableMapping):
+    """A candidate, as a view of its row in a CandidateTable
+
+    Like a dict, equal to any mapping with the same items. Copies are
+    plain dicts.
+    """
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, key):
+        column = self.table.columns.get(key)
+        if column is None or column[self.row] is _MISSING:
+            raise KeyError(key)
+        return column[self.row]
+
+    def __setitem__(self, key, value):
+        self.table.set_value(self.row, key, value)
+
+    def __delitem__(self, key):
+        self[key]
+        self.table.set_value(self.row, key, _MISSING)
+
+    def __iter__(self):
+        for key, column in list(self.table.columns.items()):
+            if column[self.row] is not _MISSING:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        column = self.table.columns.get(key)
+        return column is not None and column[self.row] is not _MISSING
+
+    def get(self, key, default=None):
+        column = self.table.columns.get(key)
+        if column is None or column[self.row] is _MISSING:
+            return default
+        return column[self.row]
+
+    def __eq__(self, other):
+        if isinstance(other, CandidateRow) and other.table is self.table:
+            # candidate ids are unique within a table
+            return other.row == self.row
+        if isinstance(other, collections.abc.Mapping):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class CandidateTable(collections.abc.MutableMapping):
+    """The candidates of a demand, by candidate id"""
+
+    def __init__(self, candidates=()):
+        # key -> value of each row
+        self.columns = {}
+        self._size = 0
+        # candidate id -> row, of the candidates in the table
+        self._rows = {}
+        self._views = []
+        # key -> float array of a column, built when first asked for
+        self._numeric = {}
+        for candidate in candidates:
+            self[candidate['candidate_id']] = candidate
+
+    def set_value(self, row, key, value):
+        column = self.columns.get(key)
+        if column is None:
+            if value is _MISSING:
+                return
+            column = [_MISSING] * self._size
+            self.columns[sys.intern(key) if isinstance(key, str)
+                         else key] = column
+        if isinstance(value, str):
+            value = sys.intern(value)
+        column[row] = value
+        self._numeric.pop(key, None)
+
+    def view(self, row):
+        """Return the view of a row, the same one every time"""
+        view = self._views[row]
+        if view is None:
+            view = self._views[row] = CandidateRow(self, int(row))
+        return view
+
+    def __getitem__(self, candidate_id):
+        return self.view(self._rows[candidate_id])
+
+    def __setitem__(self, candidate_id, candidate):
+        row = self._rows.get(candidate_id)
+        if row is None:
+            row = self._size
+            self._size += 1
+            self._views.append(None)
+            self._numeric = {}
+            for column in self.columns.values():
+                column.append(_MISSING)
+        else:
+            for key in list(self.view(row)):
+                self.set_value(row, key, _MISSING)
+        for key, value in candidate.items():
+            self.set_value(row, key, value)
+        self._rows[candidate_id] = row
+
+    def __delitem__(self, candidate_id):
+        # The row stays, views of it may still be in use
+        del self._rows[candidate_id]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def numeric(self, key):
+        """Return a column as floats, NaN where missing or not a number"""
+        values = self._numeric.get(key)
+        if values is None:
+            values = np.full(self._size, np.nan)
+            for row, value in enumerate(self.columns.get(key, ())):
+                try:
+                    values[row] = float(value)
+                except (TypeError, ValueError):
+                    pass
+            self._numeric[key] = values
+        return values
+
+    def rows_of(self, candidates):
+        """Return the rows of the candidates, None if not all are views
+        of this table
+        """
+        rows = np.empty(len(candidates), dtype=np.intp)
+        for i, candidate in enumerate(candidates):
+            if not isinstance(candidate, CandidateRow) or \
+                    candidate.table is not self:
+                return None
+            rows[i] = candidate.row
+        return rows
+
+    def select(self, rows):
+        """Return the views of the rows"""
+        return [self.view(row) for row in rows]
+
+    def coordinates(self, rows):
+        """Return the (latitude, longitude)s of the rows, NaN if unknown"""
+        return np.column_stack((self.numeric('latitude')[rows],
+                                self.numeric('longitude')[rows]))
+
+
+def rows_of(candidates):
+    """Return the table holding all the candidates and their rows
+
+    (None, None) unless all the candidates are views of the same table.
+    """
+    if not candidates or not isinstance(candidates[0], CandidateRow):
+        return None, None
+    table = candidates[0].table
+    rows = table.rows_of(candidates)
+    if rows is None:
+        return None, None
+    return table, rows
@@ -18,6 +18,8 @@
 # -------------------------------------------------------------------------
 #
 
+from conductor.solver.request.candidate_table import CandidateTable
+
 
 class Demand(object):
 
@@ -26,8 +28,8 @@ class Demand(object):
 
         # initial candidates (regions or services) for this demand
         # key = region_id (or service_id),
-        # value = region (or service) instance
-        self.resources = {}
+        # value = region (or service), stored by column
+        self.resources = CandidateTable()
 
         # applicable constraint checkers
         # a list of constraint instances to be applied
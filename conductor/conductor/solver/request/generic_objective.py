@@ -47,6 +47,15 @@ class GenericObjective(object):
             _decision_path.cumulated_value + \
             _decision_path.heuristic_to_go_value
 
+    def prepare(self, _decision_path, _demand_name, _request):
+        """Operation functions are not split, see compute_delta()"""
+        return None
+
+    def compute_delta(self, _decision_path, _request, _prepared):
+        # Operators such as min/max are not additive over the operands,
+        # so the whole function is evaluated for each candidate.
+        self.compute(_decision_path, _request)
+
     def compute_operation_function(self, operation_function, _decision_path, _request):
         operator = operation_function.get('operator')
         operands = operation_function.get('operands')
@@ -0,0 +1,165 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+
+"""Latency rules of the countries of customers
+
+The rules come from the region placeholders and country latency tables.
+They only change when an operator loads new ones, so the solver keeps
+them resolved, with their latency weights, until the version of the
+tables changes.
+"""
+
+import collections
+import threading
+
+from oslo_log import log
+
+LOG = log.getLogger(__name__)
+
+# Rules of the countries without rules of their own
+WILDCARD = "*"
+
+
+def filter_invalid_rules(countries_list, regions_map):
+    """Replace region placeholders by their countries, drop unknown ones"""
+    invalid_rules = list()
+    for i, e in enumerate(countries_list):
+        if e is None:
+            continue
+
+        for k, region in enumerate(e.split(',')):
+            LOG.info("Processing the Rule for  " + region)
+            if region.__len__() != 3:
+                if region == WILDCARD:
+                    continue
+                region_list = regions_map.get(region)
+
+                if region_list is None:
+                    LOG.info("Invalid region " + region)
+                    invalid_rules.append(region)
+                    continue
+                countries_list.remove(countries_list[i])
+                countries_list.insert(i, region_list)
+    for ir in invalid_rules:
+        LOG.info("Filtering out invalid rules from countries list ")
+        LOG.info("invalid rule " + ir)
+
+    countries_list = list(filter(lambda country: (country not in invalid_rules), countries_list))
+
+    available_countries = ''
+    for cl in countries_list:
+        available_countries += cl
+        available_countries += ','
+
+    LOG.info("Available countries after the filteration " + available_countries[:-1])
+
+    return countries_list
+
+
+class CountryRules(object):
+    """The latency groups of a country, resolved with the region
+    placeholders, and the latency weight of their countries
+
+    The countries of the first group weigh 0, those of the next one 1,
+    and so on. With a trailing wildcard, the countries of candidates
+    in no group come last.
+    """
+
+    def __init__(self, groups, regions_maps):
+        groups = filter_invalid_rules(list(groups), regions_maps)
+        self.wildcard = bool(groups) and groups[-1] == WILDCARD
+        if self.wildcard:
+            groups.pop()
+        self.groups = groups
+        self.weights = collections.OrderedDict()
+        self.next_weight = 0
+        for group in groups:
+            if group is None:
+                continue
+            for country in group.split(','):
+                self.weights[country] = self.next_weight
+            self.next_weight += 1
+
+    def unlisted(self, countries):
+        """Return the countries in no group"""
+        return [country for country in set(countries)
+                if country not in self.weights]
+
+
+class LatencyRules(object):
+    """Cache of the rules of the countries, shared by the plans of a
+    solver worker
+
+    The tables are read again only when their version changed, which
+    the latency data loader does whenever it loads them. Only the rows
+    of the generation of their version are read.
+    """
+
+    def __init__(self, region_placeholders, country_latency, table_version):
+        self.RegionPlaceholders = region_placeholders
+        self.CountryLatency = country_latency
+        self.TableVersion = table_version
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._version = None
+        self._countries = {}
+
+    def _load(self):
+        """Read the tables, if they changed since they were last read"""
+        versions = self.TableVersion.versions()
+        version = (versions.get(self.RegionPlaceholders.__tablename__),
+                   versions.get(self.CountryLatency.__tablename__))
+        with self._lock:
+            if self._loaded and version == self._version:
+                return self._countries
+
+            regions_maps = dict()
+            for region in self.TableVersion.current_rows(
+                    self.RegionPlaceholders.query.all(), version[0]):
+                regions_maps.update(region.countries)
+            countries = dict(
+                (country.country_name, CountryRules(country.groups or [],
+                                                    regions_maps))
+                for country in self.TableVersion.current_rows(
+                    self.CountryLatency.query.all(), version[1]))
+            LOG.info("Read the latency rules of {} countries and {} "
+                     "regions, versions {}".format(len(countries),
+                                                   len(regions_maps), version))
+
+            self._countries = countries
+            self._version = version
+            self._loaded = True
+            return countries
+
+    @property
+    def version(self):
+        """Versions of the tables the rules were last read at"""
+        return self._version
+
+    def country_rules(self, country):
+        """Return the rules of a country, the wildcard ones if it has
+        none, None if there are no wildcard ones either
+        """
+        countries = self._load()
+        rules = countries.get(country)
+        if rules is None:
+            LOG.info("country is not present is country latency table, looking for * wildcard entry")
+            rules = countries.get(WILDCARD)
+        return rules
@@ -36,7 +36,38 @@ class Objective(object):
             if self.operation == "sum":
                 value += op.compute(_decision_path, _request)
 
-        _decision_path.cumulated_value = value
+        self._set_value(_decision_path, value)
+
+    def prepare(self, _decision_path, _demand_name, _request):
+        """Evaluate the operands that do not depend on _demand_name
+
+        The result is handed to compute_delta() for each candidate of
+        the demand, so only the operands bound to it are re-evaluated.
+        """
+        fixed_value = 0.0
+        bound_operands = []
+
+        if self.operation == "sum":
+            for op in self.operand_list:
+                if op.depends_on(_demand_name):
+                    bound_operands.append(op)
+                else:
+                    fixed_value += op.compute(_decision_path, _request)
+
+        return fixed_value, bound_operands
+
+    def compute_delta(self, _decision_path, _request, _prepared):
+        """Compute the path value from the result of prepare()"""
+        value, bound_operands = _prepared
+
+        for op in bound_operands:
+            value += op.compute(_decision_path, _request)
+
+        self._set_value(_decision_path, value)
+
+    @staticmethod
+    def _set_value(_decision_path, _value):
+        _decision_path.cumulated_value = _value
         _decision_path.total_value = \
             _decision_path.cumulated_value + \
             _decision_path.heuristic_to_go_value
@@ -49,13 +80,24 @@ class Operand(object):
         self.weight = 0
         self.function = None
 
+    def depends_on(self, _demand_name):
+        """Return True if the value changes with the _demand_name decision"""
+        if self.function.func_type == "hpa_score":
+            return True
+        if self.function.func_type in ("latency_between",
+                                       "distance_between"):
+            return any(not isinstance(loc, demand.Location)
+                       and loc.name == _demand_name
+                       for loc in (self.function.loc_a, self.function.loc_z))
+        return False
+
     def compute(self, _decision_path, _request):
         value = 0.0
         cei = _request.cei
         if self.function.func_type == "latency_between":
             if isinstance(self.function.loc_a, demand.Location):
                 if self.function.loc_z.name in \
-                        list(_decision_path.decisions.keys()):    # Python 3 Conversion -- dict object to list object
+                        _decision_path.decisions:
                     resource = \
                         _decision_path.decisions[self.function.loc_z.name]
                     candidate_cost = resource.get('cost')
@@ -70,7 +112,7 @@ class Operand(object):
                         + candidate_cost
             elif isinstance(self.function.loc_z, demand.Location):
                 if self.function.loc_a.name in \
-                        list(_decision_path.decisions.keys()):    # Python 3 Conversion -- dict object to list object
+                        _decision_path.decisions:
                     resource = \
                         _decision_path.decisions[self.function.loc_a.name]
                     candidate_cost = resource.get('cost')
@@ -85,9 +127,9 @@ class Operand(object):
                         + candidate_cost
             else:
                 if self.function.loc_a.name in \
-                        list(_decision_path.decisions.keys()) and \
+                        _decision_path.decisions and \
                    self.function.loc_z.name in \
-                        list(_decision_path.decisions.keys()):  # Python 3 Conversion -- dict object to list object
+                        _decision_path.decisions:
                     resource_a = \
                         _decision_path.decisions[self.function.loc_a.name]
                     loc_a = None
@@ -122,7 +164,7 @@ class Operand(object):
         elif self.function.func_type == "distance_between":
             if isinstance(self.function.loc_a, demand.Location):
                 if self.function.loc_z.name in \
-                        list(_decision_path.decisions.keys()):   # Python 3 Conversion -- dict object to list object
+                        _decision_path.decisions:
                     resource = \
                         _decision_path.decisions[self.function.loc_z.name]
                     candidate_cost = resource.get('cost')
@@ -137,7 +179,7 @@ class Operand(object):
                         + candidate_cost
             elif isinstance(self.function.loc_z, demand.Location):
                 if self.function.loc_a.name in \
-                        list(_decision_path.decisions.keys()):    # Python 3 Conversion -- dict object to list object
+                        _decision_path.decisions:
                     resource = \
                         _decision_path.decisions[self.function.loc_a.name]
                     candidate_cost = resource.get('cost')
@@ -152,9 +194,9 @@ class Operand(object):
                         + candidate_cost
             else:
                 if self.function.loc_a.name in \
-                        list(_decision_path.decisions.keys()) and \
+                        _decision_path.decisions and \
                    self.function.loc_z.name in \
-                        list(_decision_path.decisions.keys()):    # Python 3 Conversion -- dict object to list object
+                        _decision_path.decisions:
                     resource_a = \
                         _decision_path.decisions[self.function.loc_a.name]
                     loc_a = None
@@ -45,6 +45,7 @@ from conductor.solver.request.functions import distance_between
 from conductor.solver.request.functions import hpa_score
 from conductor.solver.request.functions import latency_between
 from conductor.solver.request import generic_objective
+from conductor.solver.request import latency_rules
 from conductor.solver.request import objective
 from conductor.solver.triage_tool.traige_latency import TriageLatency
 
@@ -77,7 +78,8 @@ class Parser(object):
     #    self.cei = cei.ConstraintEngineInterface()
 
     # FIXME(snarayanan): This should just be parse_template
-    def parse_template(self, json_template=None, country_groups=None, regions_maps=None):
+    def parse_template(self, json_template=None, country_groups=None, regions_maps=None,
+                       country_rules=None):
         if json_template is None:
             LOG.error("No template specified")
             return "Error"
@@ -265,7 +267,10 @@ class Parser(object):
                     LOG.debug("Processing objective function latency_between")
                     self.latencyTriage.takeOpimaztionType(operand_data["function"])
                     func = latency_between.LatencyBetween("latency_between")
-                    func.region_group = self.assign_region_group_weight(country_groups, regions_maps)
+                    if country_rules is not None:
+                        func.region_group = self.assign_rule_weights(country_rules)
+                    else:
+                        func.region_group = self.assign_region_group_weight(country_groups, regions_maps)
                     param = operand_data["function_param"][0]
                     if param in self.locations:
                         func.loc_a = self.locations[param]
@@ -338,6 +343,19 @@ class Parser(object):
             print(err)
         return region_latency_weight
 
+    def assign_rule_weights(self, country_rules):
+        """assign the latency weights of resolved country rules and returns a map"""
+        candidate_countries = country_rules.unlisted(self.get_candidate_country_list())
+        if not country_rules.wildcard:
+            self.drop_no_latency_rule_candidates(candidate_countries)
+            return collections.OrderedDict(country_rules.weights)
+
+        # the countries of the other candidates come last
+        region_latency_weight = collections.OrderedDict(country_rules.weights)
+        for country in candidate_countries:
+            region_latency_weight[country] = country_rules.next_weight
+        return region_latency_weight
+
     def get_candidate_country_list(self):
         LOG.info("Processing Get Candidate Countries from demands  ")
         candidate_country_list = list()
@@ -467,38 +485,7 @@ class Parser(object):
         LOG.info("Available countries after processing diff between " + ac)
 
     def filter_invalid_rules(self, countries_list, regions_map):
-        invalid_rules = list()
-        for i, e in enumerate(countries_list):
-            if e is None:
-                continue
-
-            for k, region in enumerate(e.split(',')):
-                LOG.info("Processing the Rule for  " + region)
-                if region.__len__() != 3:
-                    if region == "*":
-                        continue
-                    region_list = regions_map.get(region)
-
-                    if region_list is None:
-                        LOG.info("Invalid region " + region)
-                        invalid_rules.append(region)
-                        continue
-                    countries_list.remove(countries_list[i])
-                    countries_list.insert(i, region_list)
-        for ir in invalid_rules:
-            LOG.info("Filtering out invalid rules from countries list ")
-            LOG.info("invalid rule " + ir)
-
-        countries_list = list(filter(lambda country: (country not in invalid_rules), countries_list))
-
-        available_countries = ''
-        for cl in countries_list:
-            available_countries += cl
-            available_countries += ','
-
-        LOG.info("Available countries after the filteration " + available_countries[:-1])
-
-        return countries_list
+        return latency_rules.filter_invalid_rules(countries_list, regions_map)
 
     def reorder_constraint(self):
         # added manual ranking to the constraint type for optimizing purpose the last 2 are costly interaction
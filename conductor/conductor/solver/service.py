@@ -20,10 +20,12 @@
 
 import collections
 import cotyledon
+import futurist
 import json
 import socket
 import time
 import traceback
+import uuid
 
 from oslo_config import cfg
 from oslo_log import log
@@ -35,6 +37,7 @@ from conductor.common.models.order_lock import OrderLock
 from conductor.common.models import order_lock_history
 from conductor.common.models import plan
 from conductor.common.models import region_placeholders
+from conductor.common.models import table_version
 from conductor.common.models import triage_tool
 from conductor.common.music import messaging as music_messaging
 from conductor.common.music.model import base
@@ -45,7 +48,9 @@ from conductor.i18n import _LI
 from conductor import messaging
 from conductor import service
 from conductor.solver.optimizer import optimizer
+from conductor.solver.request import latency_rules
 from conductor.solver.request import parser
+from conductor.solver import solution_cache
 from conductor.solver.utils import constraint_engine_interface as cei
 
 # To use oslo.log in services:
@@ -115,7 +120,34 @@ SOLVER_OPTS = [
                     'Default value is 10 minutes. (integer value)'),
     cfg.IntOpt('max_solver_counter',
                default=1,
-               min=1)
+               min=1),
+    cfg.IntOpt('concurrent_plans',
+               default=4,
+               min=1,
+               help='Number of plans each solver worker solves at once. '
+                    'Up to this many plans are claimed per polling '
+                    'interval. Default value is 4.'),
+    cfg.BoolOpt('batched_constraint_rpc',
+                default=False,
+                help='Set to True to evaluate the HPA, vim_fit, attribute '
+                     'and service constraints with one data service round '
+                     'trip per constraint, leaving large candidate fields '
+                     'resident in the data service. Requires a data service '
+                     'that supports evaluate_candidates.'),
+    cfg.IntOpt('solution_cache_size',
+               default=0,
+               min=0,
+               help='Number of translations whose solutions each solver '
+                    'worker keeps, so plans translated the same (e.g. '
+                    'retried requests) are not solved again. Order locks '
+                    'still apply to each plan. Set to 0 to solve every '
+                    'plan.'),
+    cfg.IntOpt('solution_cache_ttl',
+               default=300,
+               min=1,
+               help='Seconds the solutions of a translation are kept. '
+                    'Candidates are checked against the live inventory '
+                    'while solving, keep it short.'),
 ]
 
 CONF.register_opts(SOLVER_OPTS, group='solver')
@@ -148,6 +180,8 @@ class SolverServiceLauncher(object):
             keyspace=conf.keyspace, baseclass=country_latency.CountryLatency, classname="CountryLatency")
         self.TriageTool = base.create_dynamic_model(
             keyspace=conf.keyspace, baseclass=triage_tool.TriageTool, classname="TriageTool")
+        self.TableVersion = base.create_dynamic_model(
+            keyspace=conf.keyspace, baseclass=table_version.TableVersion, classname="TableVersion")
         # self.Groups = base.create_dynamic_model(
         #    keyspace=conf.keyspace, baseclass=groups.Groups, classname="Groups")
         # self.GroupRules = base.create_dynamic_model(
@@ -169,6 +203,8 @@ class SolverServiceLauncher(object):
             raise
         if not self.TriageTool:
             raise
+        if not self.TableVersion:
+            raise
 
     def run(self):
         kwargs = {'plan_class': self.Plan,
@@ -176,7 +212,8 @@ class SolverServiceLauncher(object):
                   'order_locks_history': self.OrderLockHistory,
                   'region_placeholders': self.RegionPlaceholders,
                   'country_latency': self.CountryLatency,
-                  'triage_tool': self.TriageTool
+                  'triage_tool': self.TriageTool,
+                  'table_version': self.TableVersion,
                   }
         # kwargs = {'plan_class': self.Plan}
         svcmgr = cotyledon.ServiceManager()
@@ -214,12 +251,22 @@ class SolverService(cotyledon.Service):
         self.RegionPlaceholders = kwargs.get('region_placeholders')
         self.CountryLatency = kwargs.get('country_latency')
         self.TriageTool = kwargs.get('triage_tool')
+        self.TableVersion = kwargs.get('table_version')
+        self.latency_rules = latency_rules.LatencyRules(
+            self.RegionPlaceholders, self.CountryLatency, self.TableVersion)
+        self.solution_cache = None
+        if self.conf.solver.solution_cache_size:
+            self.solution_cache = solution_cache.SolutionCache(
+                self.conf.solver.solution_cache_size,
+                self.conf.solver.solution_cache_ttl)
 
         # Set up the RPC service(s) we want to talk to.
         self.data_service = self.setup_rpc(conf, "data")
 
         # Set up the cei and optimizer
-        self.cei = cei.ConstraintEngineInterface(self.data_service)
+        self.cei = cei.ConstraintEngineInterface(
+            self.data_service,
+            batched=self.conf.solver.batched_constraint_rpc)
         # self.optimizer = optimizer.Optimizer(conf)
 
         # Set up Music access.
@@ -251,7 +298,8 @@ class SolverService(cotyledon.Service):
         Use this only when the solver service is not running concurrently.
         """
 
-        plans = self.Plan.query.get_plan_by_col("status", self.Plan.SOLVING)
+        plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.SOLVING)
         for the_plan in plans:
             the_plan.status = self.Plan.TRANSLATED
             # Use only in active-passive mode, so don't have to be atomic
@@ -281,470 +329,516 @@ class SolverService(cotyledon.Service):
         # TODO(snarayanan): This is really meant to be a control loop
         # As long as self.running is true, we process another request.
 
+        # Plans are solved concurrently, each one on its own thread, which
+        # tags its log records with its plan
+        log_util.setThreadLoggerFilter(LOG)
+        executor = futurist.ThreadPoolExecutor(
+            max_workers=self.conf.solver.concurrent_plans)
+        solving = set()
+
         while self.running:
 
             # Delay time (Seconds) for MUSIC requests.
             time.sleep(self.conf.delay_time)
 
-            # plans = Plan.query().all()
-            # Find the first plan with a status of TRANSLATED.
-            # Change its status to SOLVING.
-            # Then, read the "translated" field as "template".
-            json_template = None
-            p = None
-
-            requests_to_solve = dict()
-            regions_maps = dict()
-            country_groups = list()
-
-            # Instead of using the query.all() method, now creating an index for 'status'
-            # field in conductor.plans table, and query plans by status columns
-            translated_plans = self.Plan.query.get_plan_by_col("status", self.Plan.TRANSLATED)
-            solving_plans = self.Plan.query.get_plan_by_col("status", self.Plan.SOLVING)
-
-            # combine the plans with status = 'translated' and 'solving' together
-            plans = translated_plans + solving_plans
-
-            found_translated_template = False
-
-            for p in plans:
-                if p.status == self.Plan.TRANSLATED:
-                    json_template = p.translation
-                    found_translated_template = True
-                    break
-                elif p.status == self.Plan.SOLVING and (self.current_time_seconds()
-                                                        - self.millisec_to_sec(p.updated)) > self.conf.solver.timeout:
-                    p.status = self.Plan.TRANSLATED
-                    p.update(condition=self.solving_status_condition)
-                    break
-
-            if not json_template:
-                if found_translated_template:
+            solving = self._reap_solved_plans(solving)
+            idle_workers = self.conf.solver.concurrent_plans - len(solving)
+            for p in self._claim_plans(idle_workers):
+                solving.add(executor.submit(self._solve_plan, p))
+
+        executor.shutdown()
+
+    def _reap_solved_plans(self, solving):
+        """Return the plans still being solved, logging failed ones"""
+        still_solving = set()
+        for fut in solving:
+            if not fut.done():
+                still_solving.add(fut)
+            elif fut.exception() is not None:
+                LOG.error(_LE("Solving a plan failed: {}").format(
+                    fut.exception()))
+        return still_solving
+
+    def _claim_plans(self, limit):
+        """Claim up to limit translated plans for this worker
+
+        Plans move from translated to solving with a conditional update,
+        so a plan claimed by another worker is skipped. Plans left solving
+        by a worker that went down are made available again.
+        """
+        claimed = []
+
+        # Instead of using the query.all() method, now creating an index for 'status'
+        # field in conductor.plans table, and query plans by status columns
+        translated_plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.TRANSLATED)
+        solving_plans = self.Plan.query.defer(*self.Plan.PAYLOADS).get_plan_by_col(
+            "status", self.Plan.SOLVING)
+
+        # combine the plans with status = 'translated' and 'solving' together
+        plans = translated_plans + solving_plans
+
+        for p in plans:
+            if p.status == self.Plan.TRANSLATED:
+                if len(claimed) >= limit:
+                    continue
+
+                if not p.translation:
                     message = _LE("Plan {} status is translated, yet "
                                   "the translation wasn't found").format(p.id)
                     LOG.error(message)
                     p.status = self.Plan.ERROR
                     p.message = message
                     p.update(condition=self.translated_status_condition)
-                continue
-
-            if found_translated_template and p and p.solver_counter >= self.conf.solver.max_solver_counter:
-                message = _LE("Tried {} times. Plan {} is unable to solve").format(self.conf.solver.max_solver_counter,
-                                                                                   p.id)
-                LOG.error(message)
-                p.status = self.Plan.ERROR
-                p.message = message
-                p.update(condition=self.translated_status_condition)
-                continue
-
-            log_util.setLoggerFilter(LOG, self.conf.keyspace, p.id)
-
-            p.status = self.Plan.SOLVING
-            p.solver_counter += 1
-            p.solver_owner = socket.gethostname()
-
-            _is_updated = p.update(condition=self.translated_status_condition)
-            if not _is_updated:
-                continue
-
-            # other VMs have updated the status and start solving the plan
-            if 'FAILURE' in _is_updated:
-                continue
-
-            LOG.info(_LI("Sovling starts, changing the template status from translated to solving, "
-                         "atomic update response from MUSIC {}").format(_is_updated))
-
-            LOG.info(_LI("Plan {} with request id {} is solving by machine {}. Tried to solve it for {} times.").
-                     format(p.id, p.name, p.solver_owner, p.solver_counter))
-
-            _is_success = "FAILURE"
-            request = parser.Parser()
-            request.cei = self.cei
-            request.request_id = p.name
-            request.plan_id = p.id
-            # getting the number of solutions need to provide
-            num_solution = getattr(p, 'recommend_max', '1')
-            if num_solution.isdigit():
-                num_solution = int(num_solution)
-
-            # TODO(inam/larry): move this part of logic inside of parser and don't apply it to distance_between
-            try:
-                # getting region placeholders from database and insert/put into regions_maps dictionary
-                region_placeholders = self.RegionPlaceholders.query.all()
-                for region in region_placeholders:
-                    regions_maps.update(region.countries)
-
-                # getting country groups from database and insert into the country_groups list
-                customer_loc = ''
-                location_list = json_template["conductor_solver"]["locations"]
-                for location_id, location_info in location_list.items():
-                    customer_loc = location_info['country']
-
-                countries = self.CountryLatency.query.get_plan_by_col("country_name", customer_loc)
-                LOG.info("Customer Location for Latency Reduction " + customer_loc)
-
-                if len(countries) == 0:
-                    LOG.info("country is not present is country latency table, looking for * wildcard entry")
-                    countries = self.CountryLatency.query.get_plan_by_col("country_name", "*")
-                if len(countries) != 0:
-                    LOG.info("Found '*' wild card entry in country latency table")
-                else:
-                    msg = "No '*' wild card entry found in country latency table. No solution will be provided"
-                    LOG.info(msg)
-                    p.message = msg
-
-                for country in countries:
-                    country_groups = country.groups
+                    continue
 
-                LOG.info("Done getting Latency Country DB Groups ")
-            except Exception as error_msg:
-                LOG.error("Exception thrown while reading region_placeholders and country groups information "
-                          "from database. Exception message: {}".format(error_msg))
-
-            try:
-                request.parse_template(json_template, country_groups, regions_maps)
+                if p.solver_counter >= self.conf.solver.max_solver_counter:
+                    message = _LE("Tried {} times. Plan {} is unable to solve").format(
+                        self.conf.solver.max_solver_counter, p.id)
+                    LOG.error(message)
+                    p.status = self.Plan.ERROR
+                    p.message = message
+                    p.update(condition=self.translated_status_condition)
+                    continue
+
+                log_util.setThreadLoggerContext(self.conf.keyspace, p.id)
+
+                p.status = self.Plan.SOLVING
+                p.solver_counter += 1
+                p.solver_owner = socket.gethostname()
+
+                _is_updated = p.update(condition=self.translated_status_condition)
+                # other VMs have updated the status and start solving the plan
+                if not _is_updated or 'FAILURE' in _is_updated:
+                    continue
+
+                LOG.info(_LI("Sovling starts, changing the template status from translated to solving, "
+                             "atomic update response from MUSIC {}").format(_is_updated))
+
+                LOG.info(_LI("Plan {} with request id {} is solving by machine {}. Tried to solve it for {} times.").
+                         format(p.id, p.name, p.solver_owner, p.solver_counter))
+                claimed.append(p)
+
+            elif p.status == self.Plan.SOLVING and (self.current_time_seconds()
+                                                    - self.millisec_to_sec(p.updated)) > self.conf.solver.timeout:
+                p.status = self.Plan.TRANSLATED
+                p.update(condition=self.solving_status_condition)
+
+        return claimed
+
+    def _solve_plan(self, p):
+        """Solve a claimed plan and store its recommendations"""
+        # The search stops once the plan has been solving for
+        # solver_timeout seconds
+        begin_time = self.current_time_seconds()
+        log_util.setThreadLoggerContext(self.conf.keyspace, p.id)
+        json_template = p.translation
+        requests_to_solve = dict()
+
+        _is_success = "FAILURE"
+        request = parser.Parser()
+        request.cei = self.cei
+        request.request_id = p.name
+        request.plan_id = p.id
+        # getting the number of solutions need to provide
+        num_solution = getattr(p, 'recommend_max', '1')
+        if num_solution.isdigit():
+            num_solution = int(num_solution)
+
+        # TODO(inam/larry): move this part of logic inside of parser and don't apply it to distance_between
+        rules_version = None
+        try:
+            # getting the latency rules of the customer country, read from the
+            # region placeholders and country latency tables when they changed
+            customer_loc = ''
+            location_list = json_template["conductor_solver"]["locations"]
+            for location_id, location_info in location_list.items():
+                customer_loc = location_info['country']
+
+            LOG.info("Customer Location for Latency Reduction " + customer_loc)
+            country_rules = self.latency_rules.country_rules(customer_loc)
+            if country_rules is None:
+                msg = "No '*' wild card entry found in country latency table. No solution will be provided"
+                LOG.info(msg)
+                p.message = msg
+                country_rules = latency_rules.CountryRules([], {})
+
+            LOG.info("Done getting Latency Country DB Groups ")
+            rules_version = self.latency_rules.version
+        except Exception as error_msg:
+            LOG.error("Exception thrown while reading region_placeholders and country groups information "
+                      "from database. Exception message: {}".format(error_msg))
+            country_rules = latency_rules.CountryRules([], {})
+
+        try:
+            # plans translated the same, with the same latency rules, have the
+            # same solutions
+            cache_key = None
+            cached = None
+            if self.solution_cache and rules_version is not None:
+                cache_key = solution_cache.translation_key(json_template, rules_version, num_solution)
+                cached = self.solution_cache.get(cache_key)
+            if cached:
+                LOG.info(_LI("Plan {} is translated like a plan solved before, "
+                             "reusing its solutions").format(p.id))
+                request.request_type, solution_list = cached
+            else:
+                request.parse_template(json_template, country_rules=country_rules)
+                request.cei = self.cei.for_demands(request.demands)
                 request.assgin_constraints_to_demands()
                 requests_to_solve[p.id] = request
-                opt = optimizer.Optimizer(self.conf, _requests=requests_to_solve)
+                opt = optimizer.Optimizer(self.conf, _requests=requests_to_solve,
+                                          _begin_time=begin_time)
+                opt.presolve_constraints()
                 solution_list = opt.get_solution(num_solution)
+                if cache_key and solution_list:
+                    self.solution_cache.put(cache_key, (request.request_type, solution_list))
+
+        except Exception as err:
+            message = _LE("Plan {} status encountered a "
+                          "parsing error: {}").format(p.id, err)
+            LOG.error(traceback.print_exc())
+            p.status = self.Plan.ERROR
+            p.message = message
+            while 'FAILURE' in _is_success:
+                _is_success = p.update(condition=self.solver_owner_condition)
+                LOG.info(_LI("Encountered a parsing error, changing the template status from solving to error, "
+                             "atomic update response from MUSIC {}").format(_is_success))
 
-            except Exception as err:
-                message = _LE("Plan {} status encountered a "
-                              "parsing error: {}").format(p.id, err)
-                LOG.error(traceback.print_exc())
-                p.status = self.Plan.ERROR
-                p.message = message
-                while 'FAILURE' in _is_success:
-                    _is_success = p.update(condition=self.solver_owner_condition)
-                    LOG.info(_LI("Encountered a parsing error, changing the template status from solving to error, "
-                                 "atomic update response from MUSIC {}").format(_is_success))
-
-                continue
-
-            LOG.info("Preparing the recommendations ")
-            # checking if the order is 'initial' or 'speed changed' one
-            is_speed_change = False
-            if request and request.request_type == 'speed changed':
-                is_speed_change = True
-
-            recommendations = []
-            if not solution_list or len(solution_list) < 1:
-                # when order takes too much time to solve
-                if (int(round(time.time())) - self.millisec_to_sec(p.updated)) > self.conf.solver.solver_timeout:
-                    message = _LI("Plan {} is timed out, exceed the expected "
-                                  "time {} seconds").format(p.id, self.conf.solver.timeout)
-
-                # when no solution found
-                else:
-                    message = _LI("Plan {} search failed, no "
-                                  "recommendations found by machine {}").format(p.id, p.solver_owner)
-                LOG.info(message)
-                # Update the plan status
-                p.status = self.Plan.NOT_FOUND
-                p.message = message
+            return
 
-                # Metrics to Prometheus
-                m_svc_name = p.template.get('parameters', {}).get('service_name', 'N/A')
-                PC.VNF_FAILURE.labels('ONAP', m_svc_name).inc()
+        LOG.info("Preparing the recommendations ")
+        # checking if the order is 'initial' or 'speed changed' one
+        is_speed_change = False
+        if request and request.request_type == 'speed changed':
+            is_speed_change = True
 
-                while 'FAILURE' in _is_success:
-                    _is_success = p.update(condition=self.solver_owner_condition)
-                    LOG.info(_LI("Plan serach failed, changing the template status from solving to not found, "
-                                 "atomic update response from MUSIC {}").format(_is_success))
-            else:
-                # Assemble recommendation result JSON
-                for solution in solution_list:
-                    current_rec = dict()
-                    for demand_name in solution:
-                        resource = solution[demand_name]
-
-                        if not is_speed_change:
-                            is_rehome = "false"
-                        else:
-                            is_rehome = "false" if resource.get("existing_placement") == 'true' else "true"
-
-                        location_id = "" if resource.get("cloud_region_version") == '2.5' \
-                                      else resource.get("location_id")
-
-                        rec = {
-                            # FIXME(shankar) A&AI must not be hardcoded here.
-                            # Also, account for more than one Inventory Provider.
-                            "inventory_provider": "aai",
-                            "service_resource_id":
-                                resource.get("service_resource_id"),
-                            "candidate": {
-                                "candidate_id": resource.get("candidate_id"),
-                                "inventory_type": resource.get("inventory_type"),
-                                "cloud_owner": resource.get("cloud_owner"),
-                                "location_type": resource.get("location_type"),
-                                "location_id": location_id,
-                                "is_rehome": is_rehome},
-                            "attributes": {
-                                "physical-location-id":
-                                    resource.get("physical_location_id"),
-                                "cloud_owner": resource.get("cloud_owner"),
-                                'aic_version': resource.get("cloud_region_version")},
-                        }
+        recommendations = []
+        if not solution_list or len(solution_list) < 1:
+            # when order takes too much time to solve
+            if (int(round(time.time())) - self.millisec_to_sec(p.updated)) > self.conf.solver.solver_timeout:
+                message = _LI("Plan {} is timed out, exceed the expected "
+                              "time {} seconds").format(p.id, self.conf.solver.timeout)
 
-                        if rec["candidate"]["inventory_type"] in ["nssi", "nsi", "slice_profiles", "nst", "nsst"]:
-                            rec["candidate"] = resource
-
-                        if resource.get('vim-id'):
-                            rec["candidate"]['vim-id'] = resource.get('vim-id')
-
-                        if rec["candidate"]["inventory_type"] == "service":
-                            rec["attributes"]["host_id"] = resource.get("host_id")
-                            rec["attributes"]["service_instance_id"] = resource.get("candidate_id")
-                            rec["candidate"]["host_id"] = resource.get("host_id")
-
-                            if resource.get('vlan_key'):
-                                rec["attributes"]['vlan_key'] = resource.get('vlan_key')
-                            if resource.get('port_key'):
-                                rec["attributes"]['port_key'] = resource.get('port_key')
-
-                        if rec["candidate"]["inventory_type"] == "vfmodule":
-                            rec["attributes"]["host_id"] = resource.get("host_id")
-                            rec["attributes"]["service_instance_id"] = resource.get("service_instance_id")
-                            rec["candidate"]["host_id"] = resource.get("host_id")
-
-                            if resource.get('vlan_key'):
-                                rec["attributes"]['vlan_key'] = resource.get('vlan_key')
-                            if resource.get('port_key'):
-                                rec["attributes"]['port_key'] = resource.get('port_key')
-
-                            vf_module_data = rec["attributes"]
-                            vf_module_data['nf-name'] = resource.get("nf-name")
-                            vf_module_data['nf-id'] = resource.get("nf-id")
-                            vf_module_data['nf-type'] = resource.get("nf-type")
-                            vf_module_data['vnf-type'] = resource.get("vnf-type")
-                            vf_module_data['vf-module-id'] = resource.get("vf-module-id")
-                            vf_module_data['vf-module-name'] = resource.get("vf-module-name")
-                            vf_module_data['ipv4-oam-address'] = resource.get("ipv4-oam-address")
-                            vf_module_data['ipv6-oam-address'] = resource.get("ipv6-oam-address")
-                            vf_module_data['vservers'] = resource.get("vservers")
-
-                        elif rec["candidate"]["inventory_type"] == "cloud":
-                            if resource.get("all_directives") and resource.get("flavor_map"):
-                                rec["attributes"]["directives"] = \
-                                    self.set_flavor_in_flavor_directives(
-                                        resource.get("flavor_map"), resource.get("all_directives"))
-
-                                # Metrics to Prometheus
-                                m_vim_id = resource.get("vim-id")
-                                m_hpa_score = resource.get("hpa_score", 0)
-                                m_svc_name = p.template['parameters'].get(
-                                    'service_name', 'N/A')
-                                for vnfc, flavor in resource.get("flavor_map").items():
-                                    PC.VNF_COMPUTE_PROFILES.labels('ONAP',
-                                                                   m_svc_name,
-                                                                   demand_name,
-                                                                   vnfc,
-                                                                   flavor,
-                                                                   m_vim_id).inc()
-
-                                PC.VNF_SCORE.labels('ONAP', m_svc_name,
-                                                    demand_name,
-                                                    m_hpa_score).inc()
-
-                            if resource.get('conflict_id'):
-                                rec["candidate"]["conflict_id"] = resource.get("conflict_id")
-
-                        if resource.get('passthrough_attributes'):
-                            for key, value in resource.get('passthrough_attributes').items():
-                                if key in rec["attributes"]:
-                                    LOG.error('Passthrough attribute {} in demand {} already exist for candidate {}'.
-                                              format(key, demand_name, rec['candidate_id']))
-                                else:
-                                    rec["attributes"][key] = value
-                        # TODO(snarayanan): Add total value to recommendations?
-                        # msg = "--- total value of decision = {}"
-                        # LOG.debug(msg.format(_best_path.total_value))
-                        # msg = "--- total cost of decision = {}"
-                        # LOG.debug(msg.format(_best_path.total_cost))
-                        current_rec[demand_name] = rec
-
-                    recommendations.append(current_rec)
-
-                # Update the plan with the solution
-                p.solution = {
-                    "recommendations": recommendations
-                }
-
-                # multiple spin-ups logic
-                '''
-                go through list of recommendations in the solution
-                for cloud candidates, check if (cloud-region-id + e2evnfkey) is in the order_locks table
-                if so, insert the row with status 'parked' in order_locks, changes plan status to 'pending' in plans
-                table (or other status value)
-                otherwise, insert the row with status 'locked' in order_locks, and change status to 'solved' in plans
-                table - continue reservation
-                '''
-
-                # clean up the data/record in order_locks table, deleting all records that failed from MSO
-                order_locks = self.OrderLock.query.all()
-                for order_lock_record in order_locks:
-
-                    plans = getattr(order_lock_record, 'plans')
-                    for plan_id, plan_attributes in plans.items():
-                        plan_dict = json.loads(plan_attributes)
-
-                        if plan_dict.get('status', None) == OrderLock.FAILED:
-                            order_lock_record.delete()
-                            LOG.info(_LI("The order lock record {} with status {} is deleted (due to failure"
-                                         " spinup from MSO) from order_locks table").
-                                     format(order_lock_record, plan_dict.get('status')))
+            # when no solution found
+            else:
+                message = _LI("Plan {} search failed, no "
+                              "recommendations found by machine {}").format(p.id, p.solver_owner)
+            LOG.info(message)
+            # Update the plan status
+            p.status = self.Plan.NOT_FOUND
+            p.message = message
+
+            # Metrics to Prometheus
+            m_svc_name = p.template.get('parameters', {}).get('service_name', 'N/A')
+            PC.VNF_FAILURE.labels('ONAP', m_svc_name).inc()
+
+            while 'FAILURE' in _is_success:
+                _is_success = p.update(condition=self.solver_owner_condition)
+                LOG.info(_LI("Plan serach failed, changing the template status from solving to not found, "
+                             "atomic update response from MUSIC {}").format(_is_success))
+        else:
+            # Assemble recommendation result JSON
+            for solution in solution_list:
+                current_rec = dict()
+                for demand_name in solution:
+                    resource = solution[demand_name]
+
+                    if not is_speed_change:
+                        is_rehome = "false"
+                    else:
+                        is_rehome = "false" if resource.get("existing_placement") == 'true' else "true"
+
+                    location_id = "" if resource.get("cloud_region_version") == '2.5' \
+                                  else resource.get("location_id")
+
+                    rec = {
+                        # FIXME(shankar) A&AI must not be hardcoded here.
+                        # Also, account for more than one Inventory Provider.
+                        "inventory_provider": "aai",
+                        "service_resource_id":
+                            resource.get("service_resource_id"),
+                        "candidate": {
+                            "candidate_id": resource.get("candidate_id"),
+                            "inventory_type": resource.get("inventory_type"),
+                            "cloud_owner": resource.get("cloud_owner"),
+                            "location_type": resource.get("location_type"),
+                            "location_id": location_id,
+                            "is_rehome": is_rehome},
+                        "attributes": {
+                            "physical-location-id":
+                                resource.get("physical_location_id"),
+                            "cloud_owner": resource.get("cloud_owner"),
+                            'aic_version': resource.get("cloud_region_version")},
+                    }
+
+                    if rec["candidate"]["inventory_type"] in ["nssi", "nsi", "slice_profiles", "nst", "nsst"]:
+                        rec["candidate"] = resource
+
+                    if resource.get('vim-id'):
+                        rec["candidate"]['vim-id'] = resource.get('vim-id')
+
+                    if rec["candidate"]["inventory_type"] == "service":
+                        rec["attributes"]["host_id"] = resource.get("host_id")
+                        rec["attributes"]["service_instance_id"] = resource.get("candidate_id")
+                        rec["candidate"]["host_id"] = resource.get("host_id")
+
+                        if resource.get('vlan_key'):
+                            rec["attributes"]['vlan_key'] = resource.get('vlan_key')
+                        if resource.get('port_key'):
+                            rec["attributes"]['port_key'] = resource.get('port_key')
+
+                    if rec["candidate"]["inventory_type"] == "vfmodule":
+                        rec["attributes"]["host_id"] = resource.get("host_id")
+                        rec["attributes"]["service_instance_id"] = resource.get("service_instance_id")
+                        rec["candidate"]["host_id"] = resource.get("host_id")
+
+                        if resource.get('vlan_key'):
+                            rec["attributes"]['vlan_key'] = resource.get('vlan_key')
+                        if resource.get('port_key'):
+                            rec["attributes"]['port_key'] = resource.get('port_key')
+
+                        vf_module_data = rec["attributes"]
+                        vf_module_data['nf-name'] = resource.get("nf-name")
+                        vf_module_data['nf-id'] = resource.get("nf-id")
+                        vf_module_data['nf-type'] = resource.get("nf-type")
+                        vf_module_data['vnf-type'] = resource.get("vnf-type")
+                        vf_module_data['vf-module-id'] = resource.get("vf-module-id")
+                        vf_module_data['vf-module-name'] = resource.get("vf-module-name")
+                        vf_module_data['ipv4-oam-address'] = resource.get("ipv4-oam-address")
+                        vf_module_data['ipv6-oam-address'] = resource.get("ipv6-oam-address")
+                        vf_module_data['vservers'] = resource.get("vservers")
+
+                    elif rec["candidate"]["inventory_type"] == "cloud":
+                        if resource.get("all_directives") and resource.get("flavor_map"):
+                            rec["attributes"]["directives"] = \
+                                self.set_flavor_in_flavor_directives(
+                                    resource.get("flavor_map"), resource.get("all_directives"))
+
+                            # Metrics to Prometheus
+                            m_vim_id = resource.get("vim-id")
+                            m_hpa_score = resource.get("hpa_score", 0)
+                            m_svc_name = p.template['parameters'].get(
+                                'service_name', 'N/A')
+                            for vnfc, flavor in resource.get("flavor_map").items():
+                                PC.VNF_COMPUTE_PROFILES.labels('ONAP',
+                                                               m_svc_name,
+                                                               demand_name,
+                                                               vnfc,
+                                                               flavor,
+                                                               m_vim_id).inc()
+
+                            PC.VNF_SCORE.labels('ONAP', m_svc_name,
+                                                demand_name,
+                                                m_hpa_score).inc()
+
+                        if resource.get('conflict_id'):
+                            rec["candidate"]["conflict_id"] = resource.get("conflict_id")
+
+                    if resource.get('passthrough_attributes'):
+                        for key, value in resource.get('passthrough_attributes').items():
+                            if key in rec["attributes"]:
+                                LOG.error('Passthrough attribute {} in demand {} already exist for candidate {}'.
+                                          format(key, demand_name, rec['candidate_id']))
+                            else:
+                                rec["attributes"][key] = value
+                    # TODO(snarayanan): Add total value to recommendations?
+                    # msg = "--- total value of decision = {}"
+                    # LOG.debug(msg.format(_best_path.total_value))
+                    # msg = "--- total cost of decision = {}"
+                    # LOG.debug(msg.format(_best_path.total_cost))
+                    current_rec[demand_name] = rec
+
+                recommendations.append(current_rec)
+
+            # Update the plan with the solution
+            p.solution = {
+                "recommendations": recommendations
+            }
+
+            # multiple spin-ups logic
+            '''
+            go through list of recommendations in the solution
+            for cloud candidates, check if (cloud-region-id + e2evnfkey) is in the order_locks table
+            if so, insert the row with status 'parked' in order_locks, changes plan status to 'pending' in plans
+            table (or other status value)
+            otherwise, insert the row with status 'locked' in order_locks, and change status to 'solved' in plans
+            table - continue reservation
+            '''
+
+            # read the order locks of all the cloud candidates at once, deleting
+            # the records that failed from MSO
+            order_locks = self._read_order_locks(
+                candidate.get('conflict_id')
+                for solution in solution_list
+                for candidate in solution.values()
+                if candidate.get('inventory_type') == 'cloud' and candidate.get('conflict_id'))
+
+            inserted_order_records_dict = dict()
+            available_dependenies_set = set()
+
+            is_inserted_to_order_locks = True
+            is_conflict_id_missing = False
+            is_order_translated_before_spinup = False
+
+            for solution in solution_list:
+
+                for demand_name, candidate in solution.items():
+                    if candidate.get('inventory_type') == 'cloud':
+                        conflict_id = candidate.get('conflict_id')
+                        service_resource_id = candidate.get('service_resource_id')
+                        # TODO(larry): add more logic for missing conflict_id in template
+                        if not conflict_id:
+                            is_conflict_id_missing = True
                             break
 
-                inserted_order_records_dict = dict()
-                available_dependenies_set = set()
+                        available_dependenies_set.add(conflict_id)
+                        # check if conflict_id exists in order_locks table
+                        order_lock_record = order_locks.get(conflict_id)
+                        if order_lock_record:
+                            is_spinup_completed = getattr(order_lock_record, 'is_spinup_completed')
+                            spinup_completed_timestamp = getattr(order_lock_record,
+                                                                 'spinup_completed_timestamp')
+                            if is_spinup_completed and spinup_completed_timestamp > p.translation_begin_timestamp:
+                                is_order_translated_before_spinup = True
+                                break
+                            elif not is_spinup_completed:
+                                inserted_order_records_dict[conflict_id] = service_resource_id
+
+            if is_conflict_id_missing:
+                message = _LE("Missing conflict identifier field for cloud candidates in the template, "
+                              "could not insert into order_locks table")
+                LOG.debug(message)
+                p.status = self.Plan.SOLVED
+
+            elif is_order_translated_before_spinup:
+                message = _LE("Retriggering Plan {} due to the new order arrives before the "
+                              "spinup completion of the old order ").format(p.id)
+                LOG.debug(message)
+                p.rehome_plan()
+
+            elif len(inserted_order_records_dict) > 0:
+
+                new_dependenies_set = available_dependenies_set - set(inserted_order_records_dict.keys())
+                dependencies = ','.join(str(s) for s in new_dependenies_set)
+
+                order_lock_rows = []
+                for conflict_id, service_resource_id in inserted_order_records_dict.items():
+                    plan = {
+                        p.id: {
+                            "status": OrderLock.UNDER_SPIN_UP,
+                            "created": self.current_time_millis(),
+                            "updated": self.current_time_millis(),
+                            "service_resource_id": service_resource_id
+                        }
+                    }
 
-                is_inserted_to_order_locks = True
-                is_conflict_id_missing = False
-                is_order_translated_before_spinup = False
+                    if dependencies:
+                        plan[p.id]['dependencies'] = dependencies
 
+                    order_lock_rows.append(self.OrderLock(id=conflict_id, plans=plan))
+                is_inserted_to_order_locks = self._insert_order_locks(order_lock_rows)
+            else:
+                new_order_records = dict()
+                history_rows = []
                 for solution in solution_list:
-
                     for demand_name, candidate in solution.items():
                         if candidate.get('inventory_type') == 'cloud':
                             conflict_id = candidate.get('conflict_id')
-                            service_resource_id = candidate.get('service_resource_id')
-                            # TODO(larry): add more logic for missing conflict_id in template
-                            if not conflict_id:
-                                is_conflict_id_missing = True
-                                break
+                            new_order_records[conflict_id] = candidate.get('service_resource_id')
+
+                            deleting_record = order_locks.pop(conflict_id, None)
+                            if deleting_record and getattr(deleting_record, 'is_spinup_completed'):
+                                # persist the record in order_locks_history table
+                                history_rows.append(self.OrderLockHistory(
+                                    id=str(uuid.uuid4()), conflict_id=conflict_id,
+                                    plans=getattr(deleting_record, 'plans'),
+                                    is_spinup_completed=True,
+                                    spinup_completed_timestamp=getattr(deleting_record,
+                                                                       'spinup_completed_timestamp')))
+
+                if history_rows:
+                    # move the older records to order_locks_history table
+                    completed = [row.conflict_id for row in history_rows]
+                    LOG.debug("Moving the order lock records {} from order_locks table to "
+                              "order_locks_history table".format(completed))
+                    self.OrderLockHistory.insert_many(history_rows)
+                    self.OrderLock.delete_many(completed)
+
+                order_lock_rows = []
+                for conflict_id, service_resource_id in new_order_records.items():
+                    plan = {
+                        p.id: {
+                            "status": OrderLock.UNDER_SPIN_UP,
+                            "created": self.current_time_millis(),
+                            "updated": self.current_time_millis(),
+                            "service_resource_id": service_resource_id
+                        }
+                    }
+                    order_lock_rows.append(self.OrderLock(id=conflict_id, plans=plan))
+                is_inserted_to_order_locks = self._insert_order_locks(order_lock_rows)
+
+            if not is_inserted_to_order_locks:
+                message = _LE("Plan {} status encountered an "
+                              "error while inserting order lock message to MUSIC.").format(p.id)
+                LOG.error(message)
+                p.status = self.Plan.ERROR
+                p.message = message
 
-                            available_dependenies_set.add(conflict_id)
-                            # check if conflict_id exists in order_locks table
-                            order_lock_record = self.OrderLock.query.get_plan_by_col("id", conflict_id)
-                            if order_lock_record:
-                                is_spinup_completed = getattr(order_lock_record[0], 'is_spinup_completed')
-                                spinup_completed_timestamp = getattr(order_lock_record[0],
-                                                                     'spinup_completed_timestamp')
-                                if is_spinup_completed and spinup_completed_timestamp > p.translation_begin_timestamp:
-                                    is_order_translated_before_spinup = True
-                                    break
-                                elif not is_spinup_completed:
-                                    inserted_order_records_dict[conflict_id] = service_resource_id
-
-                if is_conflict_id_missing:
-                    message = _LE("Missing conflict identifier field for cloud candidates in the template, "
-                                  "could not insert into order_locks table")
-                    LOG.debug(message)
+            elif p.status == self.Plan.SOLVING:
+                if len(inserted_order_records_dict) > 0:
+                    LOG.info(_LI("The plan with id {} is parked in order_locks table,"
+                                 "waiting for MSO release calls").format(p.id))
+                    p.status = self.Plan.WAITING_SPINUP
+                else:
+                    LOG.info(_LI("The plan with id {} is inserted in order_locks table.").
+                             format(p.id))
                     p.status = self.Plan.SOLVED
 
-                elif is_order_translated_before_spinup:
-                    message = _LE("Retriggering Plan {} due to the new order arrives before the "
-                                  "spinup completion of the old order ").format(p.id)
-                    LOG.debug(message)
-                    p.rehome_plan()
-
-                elif len(inserted_order_records_dict) > 0:
-
-                    new_dependenies_set = available_dependenies_set - set(inserted_order_records_dict.keys())
-                    dependencies = ','.join(str(s) for s in new_dependenies_set)
-
-                    for conflict_id, service_resource_id in inserted_order_records_dict.items():
-                        plan = {
-                            p.id: {
-                                "status": OrderLock.UNDER_SPIN_UP,
-                                "created": self.current_time_millis(),
-                                "updated": self.current_time_millis(),
-                                "service_resource_id": service_resource_id
-                            }
-                        }
+        while 'FAILURE' in _is_success \
+              and (self.current_time_seconds() - self.millisec_to_sec(p.updated)) <= self.conf.solver.timeout:
+            _is_success = p.update(condition=self.solver_owner_condition)
+            LOG.info(_LI("Plan search complete, changing the template status from solving to {}, "
+                         "atomic update response from MUSIC {}").format(p.status, _is_success))
 
-                        if dependencies:
-                            plan[p.id]['dependencies'] = dependencies
-
-                        order_lock_row = self.OrderLock(id=conflict_id, plans=plan)
-                        response = order_lock_row.insert()
-
-                        # TODO(larry): add more logs for inserting order lock record (insert/update)
-                        LOG.info(_LI("Inserting the order lock record to order_locks table in MUSIC, "
-                                     "conditional insert operation response from MUSIC {}").format(response))
-                        if response and response.status_code == 200:
-                            body = response.json()
-                            LOG.info("Succcessfully inserted the record in order_locks table with "
-                                     "the following response message {}".format(body))
-                        else:
-                            is_inserted_to_order_locks = False
-                else:
-                    for solution in solution_list:
-                        for demand_name, candidate in solution.items():
-                            if candidate.get('inventory_type') == 'cloud':
-                                conflict_id = candidate.get('conflict_id')
-                                service_resource_id = candidate.get('service_resource_id')
-
-                                order_lock_record = self.OrderLock.query.get_plan_by_col("id", conflict_id)
-                                if order_lock_record:
-                                    deleting_record = order_lock_record[0]
-                                    plans = getattr(deleting_record, 'plans')
-                                    is_spinup_completed = getattr(deleting_record, 'is_spinup_completed')
-                                    spinup_completed_timestamp = getattr(deleting_record, 'spinup_completed_timestamp')
-
-                                    if is_spinup_completed:
-                                        # persist the record in order_locks_history table
-                                        order_lock_history_record = \
-                                            self.OrderLockHistory(conflict_id=conflict_id, plans=plans,
-                                                                  is_spinup_completed=is_spinup_completed,
-                                                                  spinup_completed_timestamp=spinup_completed_timestamp
-                                                                  )
-                                        LOG.debug("Inserting the history record with conflict id {}"
-                                                  " to order_locks_history table".format(conflict_id))
-                                        order_lock_history_record.insert()
-                                        # remove the older record
-                                        LOG.debug("Deleting the order lock record {} from order_locks table"
-                                                  .format(deleting_record))
-                                        deleting_record.delete()
-
-                                plan = {
-                                    p.id: {
-                                        "status": OrderLock.UNDER_SPIN_UP,
-                                        "created": self.current_time_millis(),
-                                        "updated": self.current_time_millis(),
-                                        "service_resource_id": service_resource_id
-                                    }
-                                }
-                                order_lock_row = self.OrderLock(id=conflict_id, plans=plan)
-                                response = order_lock_row.insert()
-                                # TODO(larry): add more logs for inserting order lock record (insert/update)
-                                LOG.info(_LI("Inserting the order lock record to order_locks table in MUSIC, "
-                                             "conditional insert operation response from MUSIC {}").format(response))
-                                if response and response.status_code == 200:
-                                    body = response.json()
-                                    LOG.info("Succcessfully inserted the record in order_locks table "
-                                             "with the following response message {}".format(body))
-                                else:
-                                    is_inserted_to_order_locks = False
-
-                if not is_inserted_to_order_locks:
-                    message = _LE("Plan {} status encountered an "
-                                  "error while inserting order lock message to MUSIC.").format(p.id)
-                    LOG.error(message)
-                    p.status = self.Plan.ERROR
-                    p.message = message
+        LOG.info(_LI("Plan {} search complete, {} solution(s) found by machine {}").
+                 format(p.id, len(solution_list), p.solver_owner))
+        LOG.debug("Plan {} detailed solution: {}".
+                  format(p.id, p.solution))
+        LOG.info("Plan name: {}".format(p.name))
 
-                elif p.status == self.Plan.SOLVING:
-                    if len(inserted_order_records_dict) > 0:
-                        LOG.info(_LI("The plan with id {} is parked in order_locks table,"
-                                     "waiting for MSO release calls").format(p.id))
-                        p.status = self.Plan.WAITING_SPINUP
-                    else:
-                        LOG.info(_LI("The plan with id {} is inserted in order_locks table.").
-                                 format(p.id))
-                        p.status = self.Plan.SOLVED
+    def _read_order_locks(self, conflict_ids):
+        """Return the order lock records of the conflict ids, by conflict id
 
-            while 'FAILURE' in _is_success \
-                  and (self.current_time_seconds() - self.millisec_to_sec(p.updated)) <= self.conf.solver.timeout:
-                _is_success = p.update(condition=self.solver_owner_condition)
-                LOG.info(_LI("Plan search complete, changing the template status from solving to {}, "
-                             "atomic update response from MUSIC {}").format(p.status, _is_success))
-
-            LOG.info(_LI("Plan {} search complete, {} solution(s) found by machine {}").
-                     format(p.id, len(solution_list), p.solver_owner))
-            LOG.debug("Plan {} detailed solution: {}".
-                      format(p.id, p.solution))
-            LOG.info("Plan name: {}".format(p.name))
+        The records are read in bulk. Those with a plan that failed to spin
+        up in MSO are deleted instead.
+        """
+        order_locks = {}
+        failed = []
+        for order_lock_record in self.OrderLock.query.get_many(set(conflict_ids)):
+            plans = getattr(order_lock_record, 'plans')
+            if any(json.loads(plan_attributes).get('status', None) == OrderLock.FAILED
+                   for plan_attributes in plans.values()):
+                failed.append(order_lock_record.id)
+            else:
+                order_locks[order_lock_record.id] = order_lock_record
+        if failed:
+            self.OrderLock.delete_many(failed)
+            LOG.info(_LI("The order lock records {} are deleted (due to failure spinup "
+                         "from MSO) from order_locks table").format(failed))
+        return order_locks
+
+    def _insert_order_locks(self, order_lock_rows):
+        """Insert the order lock records of a plan in bulk
+
+        Returns True if all of them were inserted.
+        """
+        if not order_lock_rows:
+            return True
+        response = self.OrderLock.insert_many(order_lock_rows)
+        LOG.info(_LI("Inserting {} order lock records to order_locks table, "
+                     "conditional insert operation response {}").format(len(order_lock_rows), response))
+        return bool(response)
 
     def terminate(self):
         """Terminate"""
@@ -0,0 +1,96 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+
+"""Solutions of plans, by translation
+
+Retried homing requests are translated the same, down to the
+candidates the data service found for their demands, so they have the
+same solutions. The solver keeps the solutions of recent translations
+so it does not parse and search them again. Each plan still goes
+through the order locks on its own.
+"""
+
+import collections
+import copy
+import hashlib
+import json
+import threading
+import time
+
+from oslo_log import log
+
+LOG = log.getLogger(__name__)
+
+# Fields of a translation that differ between plans solved the same
+PLAN_FIELDS = ('plan_id',)
+
+
+def translation_key(translation, *context):
+    """Return the key of the solutions of a translation
+
+    The context holds whatever else the solutions depend on, e.g. the
+    version of the latency rules and the number of solutions asked for.
+    """
+    solver = dict((name, value)
+                  for name, value in translation['conductor_solver'].items()
+                  if name not in PLAN_FIELDS)
+    text = json.dumps([solver, context], sort_keys=True,
+                      separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class SolutionCache(object):
+    """LRU cache of solutions, which expire after ttl seconds
+
+    Candidates are checked against the live inventory (e.g. vim_fit)
+    while searching, so the solutions of a translation only hold for a
+    while. Solutions are copied in and out, as plans change them.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expiry time, solutions), least recently used first
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        """Return the solutions of a key, None if unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, solutions = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(solutions)
+
+    def put(self, key, solutions):
+        """Keep the solutions of a key, evicting the least recently used"""
+        solutions = copy.deepcopy(solutions)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, solutions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                evicted, _ = self._entries.popitem(last=False)
+                LOG.debug("Evicted the solutions of translation {}".format(
+                    evicted))
@@ -17,8 +17,10 @@
 # -------------------------------------------------------------------------
 #
 
+import collections
 import copy
 import json
+import zlib
 
 from conductor.common.models.triage_tool import TriageTool
 from conductor.common.music.model import base
@@ -32,7 +34,29 @@ except ImportError:
 
 
 CONF = cfg.CONF
+
+TRIAGE_OPTS = [
+    cfg.StrOpt('triage_granularity',
+               default='full',
+               choices=['full', 'sampled', 'summary'],
+               help='What the solver records for the triage tool. full '
+                    'records every candidate with the status of each of '
+                    'its constraints, sampled only one in '
+                    'triage_sample_rate candidates, summary only the '
+                    'number of candidates each constraint passed and '
+                    'dropped per demand.'),
+    cfg.IntOpt('triage_sample_rate',
+               default=10,
+               min=1,
+               help='With sampled triage granularity, one in this many '
+                    'candidates is recorded.'),
+]
+
+CONF.register_opts(TRIAGE_OPTS, group='solver')
+
 io = StringIO()
+
+
 class TriageData(object):
     def __init__(self):
         self.TriageTool = base.create_dynamic_model(
@@ -47,6 +71,31 @@ class TriageData(object):
         self.triage['request_id'] = None
         self.sorted_demand = []
 
+        self.granularity = CONF.solver.triage_granularity
+        self.sample_rate = CONF.solver.triage_sample_rate
+        # Entries of triage['candidates'], by node id and by demand name.
+        # Entries equal to each other have the same node id.
+        self._by_node = collections.defaultdict(list)
+        self._by_demand = collections.defaultdict(list)
+        # demand name -> constraint name -> passed/dropped -> count
+        self._summary = collections.OrderedDict()
+
+    def _index(self, entry):
+        self._by_node[entry['node_id']].append(entry)
+        self._by_demand[entry['name']].append(entry)
+
+    def _sampled(self, node_id):
+        return zlib.crc32(node_id.encode()) % self.sample_rate == 0
+
+    def _demand_summary(self, demand_name):
+        return self._summary.setdefault(
+            demand_name, {'constraints': collections.OrderedDict(), 'rollbacks': 0})
+
+    def _count(self, demand_name, constraint_name, status, count=1):
+        constraints = self._demand_summary(demand_name)['constraints']
+        counts = constraints.setdefault(constraint_name, {'passed': 0, 'dropped': 0})
+        counts[status] += count
+
     def getSortedDemand(self, sorted_demand):
         for d in sorted_demand:
             if not d.name in self.sorted_demand:
@@ -55,24 +104,19 @@ class TriageData(object):
         self.sorted_demand
 
     def aasignNodeIdToCandidate(self, candiate, current_demand, request, plan_id):
-        demand_name = current_demand.name
         self.triage['plan_id'] = plan_id
         self.triage['request_id'] = request
-        candidateCopyStructure = []
-        candidateCopy = copy.copy(candiate)
-        for cs in candidateCopy:
-            candidate_stru = {}
-            # candidate_stru['complex_name'] = cs['complex_name']
-            # candidate_stru['inventory_type'] = cs['inventory_type']
-            # candidate_stru['candidate_id'] = cs['candidate_id']
-            # candidate_stru['physical_location_id'] = cs['physical_location_id']
-            # candidate_stru['location_id'] = cs['location_id']
-            candidate_stru['node_id'] = cs['node_id']
-            candidate_stru['constraints'] =cs['constraints']
-            candidate_stru['name'] = cs['name']
-            candidateCopyStructure.append(candidate_stru)
-        for cr in candidateCopyStructure:
-            if not cr in self.triage['candidates']:
+        if self.granularity == 'summary':
+            return
+        sampled = self.granularity == 'sampled'
+        for cs in copy.copy(candiate):
+            if sampled and not self._sampled(cs['node_id']):
+                continue
+            cr = {}
+            cr['node_id'] = cs['node_id']
+            cr['constraints'] = cs['constraints']
+            cr['name'] = cs['name']
+            if cr not in self._by_node[cr['node_id']]:
                 for c in current_demand.constraint_list:
                     constraint = {}
                     constraint['name'] = c.name
@@ -80,46 +124,53 @@ class TriageData(object):
                     constraint['constraint_type'] = c.constraint_type
                     cr['constraints'].append(constraint)
                 self.triage['candidates'].append(cr)
+                self._index(cr)
 
-
-    def checkCandidateAfter(self,solver):
+    def checkCandidateAfter(self, solver):
+        constraint_name = solver['constraint_name_for_can']
+        if self.granularity == 'summary':
+            self._count(solver['solver_demand_name'], constraint_name, 'passed',
+                        len(solver['candidate_after_list']))
+            return self.triage
         for ca in solver['candidate_after_list']:
-            for resource_candidate in self.triage['candidates']:
-                if ca['node_id'] == resource_candidate['node_id']:
-                    for rcl in resource_candidate['constraints']:
-                        if (rcl['name'] == solver['constraint_name_for_can']):
-                            rcl['status'] = "passed"
+            for resource_candidate in self._by_node.get(ca['node_id'], ()):
+                for rcl in resource_candidate['constraints']:
+                    if rcl['name'] == constraint_name:
+                        rcl['status'] = "passed"
         return self.triage
 
     def droppedCadidatesStatus(self, dropped_candidate):
+        if self.granularity == 'summary':
+            for dc in dropped_candidate:
+                self._count(dc['name'], dc['constraints'][-1]['constraint_name_dropped'], 'dropped')
+            return self.triage
         for dc in dropped_candidate:
-            for ca in self.triage['candidates']:
-                if dc['node_id'] == ca['node_id']:
-                    ca['type'] ='dropped'
-                    for cca in ca['constraints']:
-                        for dl in dc['constraints']:
-                            if 'constraint_name_dropped' in list(dl.keys()):    # Python 3 Conversion -- dict object to list object
-                                if(cca['name'] == dl['constraint_name_dropped']):
-                                    dc['status'] = "dropped"
+            entries = self._by_node.get(dc['node_id'], ())
+            for ca in entries:
+                ca['type'] ='dropped'
+            if not entries:
+                continue
+            dropped_names = set(dl['constraint_name_dropped'] for dl in dc['constraints']
+                                if 'constraint_name_dropped' in dl)
+            for ca in entries:
+                if any(cca['name'] in dropped_names for cca in ca['constraints']):
+                    dc['status'] = "dropped"
+                    break
         return self.triage
 
     def rollBackStatus(self, demanHadNoCandidate, decisionWeneedtoRollback):
+        if self.granularity == 'summary':
+            self._demand_summary(demanHadNoCandidate.name)['rollbacks'] += 1
+            return
         if len(decisionWeneedtoRollback.decisions) >0:
             count = self.sorted_demand.index(demanHadNoCandidate.name)
             count = count-1
             if count == 0:
                 decision_rolba = list(decisionWeneedtoRollback.decisions.values())   # Python 3 Conversion -- dict object to list object
                 for x in decision_rolba:
-                    for canrb in self.triage['candidates']:
-                        if x['node_id'] == canrb['node_id'] :
-                            canrb['type'] = "rollback"
-                            # The folloing print statement was missing a test case - run tox to see
-                            #print x['node_id'], ' +++ ', canrb['node_id']
-                            children = []
-                            for childCand in self.triage['candidates']:
-                                if demanHadNoCandidate.name == childCand['name']:
-                                    children.append(childCand)
-                            canrb['children'] = children
+                    for canrb in self._by_node.get(x['node_id'], ()):
+                        canrb['type'] = "rollback"
+                        canrb['children'] = list(self._by_demand.get(demanHadNoCandidate.name, ()))
 
             elif len(decisionWeneedtoRollback.decisions) == 0:
                 self.triage['name'] = demanHadNoCandidate.name
@@ -128,36 +179,58 @@ class TriageData(object):
                 decision_rolba = decisionWeneedtoRollback.decisions
                 #print decision_rolba[count]
                 candRollBack = decision_rolba[count]
-                for resource_rollback in self.triage['candidates']:
-                    if candRollBack['node_id'] == resource_rollback['node_id']:
-                        resource_rollback['type'] = "rollback"
+                for resource_rollback in self._by_node.get(candRollBack['node_id'], ()):
+                    resource_rollback['type'] = "rollback"
+
+    def _unique_candidates(self):
+        """Return the candidates, without those equal to a later one"""
+        later = collections.defaultdict(list)
+        unique = []
+        for cand in reversed(self.triage['candidates']):
+            same_node = later[cand['node_id']]
+            if cand not in same_node:
+                unique.append(cand)
+            same_node.append(cand)
+        unique.reverse()
+        return unique
 
+    def _summary_solution(self, decision_list):
+        """Return the summary of the triage, with the chosen candidates"""
+        return {
+            'summary': self._summary,
+            'solutions': [dict((demand_name, candidate.get('node_id'))
+                               for demand_name, candidate in decision.items())
+                          for decision in decision_list],
+        }
 
     def getSolution(self, decision_list):
 
-        if len(decision_list) == 0:
+        if self.granularity == 'summary':
+            triaP = json.dumps(self._summary_solution(decision_list))
+        elif len(decision_list) == 0:
             self.children['children']=(self.triage['candidates'])
             self.triage['final_candidate']= self.children
             triaP = json.dumps(self.triage['final_candidate'])
         else:
-            self.triage['candidates'] = [i for n, i in enumerate(self.triage['candidates']) if i not in self.triage['candidates'][n+1:]]
+            self.triage['candidates'] = self._unique_candidates()
+            self._by_node.clear()
+            self._by_demand.clear()
+            for cand in self.triage['candidates']:
+                self._index(cand)
 
             counter = 0
             d1 = []; d2 = []; d3 = []; d4 = []; d5 = []; d6 = []
+            solution_ids = set()
             for fc in decision_list:
                 for final_cand in list(fc.values()):   # Python 3 Conversion -- dict object to list object
-                    for final_resou in self.triage['candidates']:
-                        if final_cand['node_id'] == final_resou['node_id']:
-                            if 'type' in list(final_resou.keys()) :    # Python 3 Conversion -- dict object to list object
-                                if not final_resou['type'] == "dropped":
-                                    final_resou['type'] = 'solution'
-                                    final_resou['children'] = []
-                            else:
-                                final_resou['type'] = 'solution'
-                                final_resou['children'] = []
-
-                        elif not 'type' in list(final_resou.keys()):    # Python 3 Conversion -- dict object to list object
-                            final_resou['type'] = 'not tried'
+                    solution_ids.add(final_cand['node_id'])
+            for final_resou in self.triage['candidates']:
+                if final_resou['node_id'] in solution_ids:
+                    if final_resou.get('type') != "dropped":
+                        final_resou['type'] = 'solution'
+                        final_resou['children'] = []
+                elif solution_ids and not 'type' in final_resou:
+                    final_resou['type'] = 'not tried'
             #
             for cand in self.triage['candidates']:
                 if cand['name'] == self.sorted_demand[0]:
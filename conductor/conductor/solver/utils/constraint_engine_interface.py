@@ -30,12 +30,86 @@ from oslo_log import log
 
 LOG = log.getLogger(__name__)
 
+# Candidate fields the data service keeps resident per plan and demand when
+# constraints are evaluated in batched mode. They are large (e.g. the flavor
+# catalog of a cloud region) and never changed by constraints, so they only
+# need to cross the message bus once.
+RESIDENT_FIELDS = ('flavors',)
+
+# Zone categories answered from the candidate itself
+ZONE_FIELDS = {'region': 'location_id',
+               'complex': 'complex_name',
+               'country': 'country'}
+
+
+class CandidateIndex(object):
+    """Per-plan lookup of candidate coordinates and zones
+
+    Candidates are matched by identity fields rather than by object, as
+    constraints may hand back copies of them. The same candidate may be
+    offered to several demands at different costs (e.g. an existing
+    placement), so the cost is read from the candidate itself.
+    """
+
+    def __init__(self, candidate_list=()):
+        self.entries = {}
+        for candidate in candidate_list:
+            self.add(candidate)
+
+    @staticmethod
+    def key(candidate):
+        return (candidate.get('inventory_type'),
+                candidate.get('candidate_id'),
+                candidate.get('location_id'))
+
+    @classmethod
+    def keys(cls, candidate_list):
+        """Return the set of the keys of the candidates"""
+        return set(cls.key(candidate) for candidate in candidate_list)
+
+    def add(self, candidate):
+        key = self.key(candidate)
+        if key not in self.entries:
+            lat = candidate.get('latitude')
+            lon = candidate.get('longitude')
+            self.entries[key] = {
+                'location': (float(lat), float(lon)) if lat and lon else None,
+                'zones': dict((category, candidate[field])
+                              for category, field in ZONE_FIELDS.items()
+                              if field in candidate)}
+        return self.entries[key]
+
+    def get(self, candidate):
+        return self.entries.get(self.key(candidate))
+
 
 class ConstraintEngineInterface(object):
-    def __init__(self, client):
+    def __init__(self, client, batched=False, candidate_index=None):
         self.client = client
+        self.batched = batched
+        self.candidate_index = candidate_index
+
+    def for_demands(self, demands):
+        """Return an interface indexing the candidates of the demands
+
+        The solver shares one interface across plans, so the index is
+        kept by a copy bound to the plan being solved. Locations the
+        candidates lack are looked up when first needed, then kept.
+        """
+        index = CandidateIndex([candidate for demand in demands.values()
+                                for candidate in demand.resources.values()])
+        return ConstraintEngineInterface(self.client, self.batched, index)
+
+    def _index_entry(self, candidate):
+        if self.candidate_index is None:
+            return None
+        return self.candidate_index.get(candidate)
 
     def get_candidate_location(self, candidate):
+        entry = self._index_entry(candidate)
+        if entry and entry['location'] is not None:
+            return entry['location']
+
         # Try calling a method (remember, "calls" are synchronous)
         # FIXME(jdandrea): Doing this because Music calls are expensive.
         lat = candidate.get('latitude')
@@ -49,16 +123,18 @@ class ConstraintEngineInterface(object):
                                         method="get_candidate_location",
                                         args=args)
             LOG.debug("get_candidate_location response: {}".format(response))
+        if entry and response:
+            entry['location'] = tuple(response)
         return response
 
     def get_candidate_zone(self, candidate, _category=None):
+        entry = self._index_entry(candidate)
+        if entry and _category in entry['zones']:
+            return entry['zones'][_category]
+
         # FIXME(jdandrea): Doing this because Music calls are expensive.
-        if _category == 'region':
-            response = candidate['location_id']
-        elif _category == 'complex':
-            response = candidate['complex_name']
-        elif _category == 'country':
-            response = candidate['country']
+        if _category in ZONE_FIELDS:
+            response = candidate[ZONE_FIELDS[_category]]
         else:
             ctxt = {}
             args = {"candidate": candidate, "category": _category}
@@ -66,25 +142,37 @@ class ConstraintEngineInterface(object):
                                         method="get_candidate_zone",
                                         args=args)
             LOG.debug("get_candidate_zone response: {}".format(response))
+        if entry and response is not None:
+            entry['zones'][_category] = response
         return response
 
-    def get_candidates_from_service(self, constraint_name,
-                                    constraint_type, candidate_list,
-                                    controller, inventory_type,
-                                    request, cost, demand_name,
-                                    request_type):
-        ctxt = {}
+    @staticmethod
+    def service_request(constraint_name, constraint_type, controller,
+                        inventory_type, request, cost, demand_name,
+                        request_type):
+        """Return the data service method and args of a service check"""
         args = {"constraint_name": constraint_name,
                 "constraint_type": constraint_type,
-                "candidate_list": candidate_list,
                 "controller": controller,
                 "inventory_type": inventory_type,
                 "request": request,
                 "cost": cost,
                 "demand_name": demand_name,
                 "request_type": request_type}
+        return "get_candidates_from_service", args
+
+    def get_candidates_from_service(self, constraint_name,
+                                    constraint_type, candidate_list,
+                                    controller, inventory_type,
+                                    request, cost, demand_name,
+                                    request_type):
+        ctxt = {}
+        method, args = self.service_request(
+            constraint_name, constraint_type, controller, inventory_type,
+            request, cost, demand_name, request_type)
+        args["candidate_list"] = candidate_list
         response = self.client.call(ctxt=ctxt,
-                                    method="get_candidates_from_service",
+                                    method=method,
                                     args=args)
         LOG.debug("get_candidates_from_service response: {}".format(response))
         # response is a list of (candidate, cost) tuples
@@ -104,19 +192,35 @@ class ConstraintEngineInterface(object):
                    response: {}".format(response))
         return response
 
+    @staticmethod
+    def attributes_request(demand_name, properties):
+        """Return the data service method and args of an attribute check"""
+        args = {"properties": properties,
+                "demand_name": demand_name}
+        return "get_candidates_by_attributes", args
+
     def get_candidates_by_attributes(self, demand_name,
                                      candidate_list, properties):
         ctxt = {}
-        args = {"candidate_list": candidate_list,
-                "properties": properties,
-                "demand_name": demand_name}
+        method, args = self.attributes_request(demand_name, properties)
+        args["candidate_list"] = candidate_list
         response = self.client.call(ctxt=ctxt,
-                                    method="get_candidates_by_attributes",
+                                    method=method,
                                     args=args)
         LOG.debug("get_candidates_by_attribute response: {}".format(response))
         # response is a list of (candidate, cost) tuples
         return response
 
+    @staticmethod
+    def hpa_request(id, type, directives, flavorProperties):
+        """Return the data service method and args of an HPA match"""
+        args = {"flavorProperties": flavorProperties,
+                "id": id,
+                "type": type,
+                "directives": directives,
+                "method_name": "get_candidates_with_hpa"}
+        return "invoke_method", args
+
     def get_candidates_with_hpa(self, id, type, directives, candidate_list,
                                 flavorProperties):
         """Get candidates with an addition of flavor_mapping for matching cloud candidates with hpa constraints.
@@ -127,18 +231,21 @@ class ConstraintEngineInterface(object):
         :return: candidate_list with hpa features and flavor mapping
         """
         ctxt = {}
-        args = {"candidate_list": candidate_list,
-                "flavorProperties": flavorProperties,
-                "id": id,
-                "type": type,
-                "directives": directives,
-                "method_name": "get_candidates_with_hpa"}
+        method, args = self.hpa_request(id, type, directives,
+                                        flavorProperties)
+        args["candidate_list"] = candidate_list
         response = self.client.call(ctxt=ctxt,
-                                    method="invoke_method",
+                                    method=method,
                                     args=args)
         LOG.debug("get_candidates_with_hpa response: {}".format(response))
         return response
 
+    @staticmethod
+    def vim_capacity_request(vim_request):
+        """Return the data service method and args of a VIM capacity check"""
+        args = {"request": vim_request}
+        return "get_candidates_with_vim_capacity", args
+
     def get_candidates_with_vim_capacity(self, candidate_list, vim_request):
         """Returns the candidate_list with required vim capacity.
 
@@ -147,11 +254,77 @@ class ConstraintEngineInterface(object):
         :return: candidate_list with required vim capacity.
         """
         ctxt = {}
-        args = {"candidate_list": candidate_list,
-                "request": vim_request}
+        method, args = self.vim_capacity_request(vim_request)
+        args["candidate_list"] = candidate_list
         response = self.client.call(ctxt=ctxt,
-                                    method="get_candidates_with_vim_capacity",
+                                    method=method,
                                     args=args)
         LOG.debug(
             "get_candidates_with_vim_capacity response: {}".format(response))
         return response
+
+    def _evaluate_unbatched(self, candidate_list, requests):
+        """Run a series of candidate checks one data service call each"""
+        ctxt = {}
+        for method, args in requests:
+            args = dict(args, candidate_list=candidate_list)
+            candidate_list = self.client.call(ctxt=ctxt,
+                                              method=method,
+                                              args=args)
+            if not candidate_list:
+                break
+        return candidate_list
+
+    def evaluate_candidates(self, plan_id, demand_name, candidate_list,
+                            requests):
+        """Run a series of candidate checks in one data service round trip.
+
+        Candidates are sent without their RESIDENT_FIELDS. If the data
+        service does not hold those yet for this plan and demand it names
+        the missing candidates, and the call is repeated once with the
+        resident fields of every candidate attached, as it may reach a
+        data worker missing others. Should candidates still be missing,
+        the checks are run one call each, with the full candidates.
+
+        :param plan_id: plan the candidates belong to
+        :param demand_name: demand the candidates belong to
+        :param candidate_list: list of candidates to process
+        :param requests: list of (method, args) pairs as returned by the
+                         *_request helpers, applied in order
+        :return: the remaining candidates, or None on failure
+        """
+        ctxt = {"plan_id": plan_id}
+        candidates_by_id = {c["candidate_id"]: c for c in candidate_list}
+        args = {"demand_name": demand_name,
+                "candidate_list": [
+                    {k: v for k, v in c.items() if k not in RESIDENT_FIELDS}
+                    for c in candidate_list],
+                "requests": requests}
+        response = self.client.call(ctxt=ctxt,
+                                    method="evaluate_candidates",
+                                    args=args)
+        if response and response.get("missing"):
+            args["resident"] = {
+                candidate_id: {k: candidate[k] for k in RESIDENT_FIELDS
+                               if k in candidate}
+                for candidate_id, candidate in candidates_by_id.items()}
+            response = self.client.call(ctxt=ctxt,
+                                        method="evaluate_candidates",
+                                        args=args)
+        LOG.debug("evaluate_candidates response: {}".format(response))
+        if response and response.get("missing"):
+            LOG.warning("Resident fields of candidates {} are missing for "
+                        "demand {}, checking them unbatched".format(
+                            response.get("missing"), demand_name))
+            return self._evaluate_unbatched(candidate_list, requests)
+        if not response:
+            return None
+
+        # Put the resident fields back on the returned candidates.
+        selected = response.get("candidate_list")
+        for candidate in selected:
+            original = candidates_by_id.get(candidate["candidate_id"], {})
+            for k in RESIDENT_FIELDS:
+                if k in original:
+                    candidate[k] = original[k]
+        return selected
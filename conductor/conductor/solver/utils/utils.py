@@ -20,6 +20,7 @@
 
 from functools import reduce
 import math
+import numpy as np
 import operator
 from oslo_log import log
 
@@ -40,6 +41,9 @@ OPERATOR_FUNCTIONS = {'sum': lambda x: reduce(operator.add, x),
                       'max': lambda x: reduce(lambda a, b: a if a < b else b, x)}
 
 
+EARTH_RADIUS = 6371.0  # km
+
+
 def compute_air_distance(_src, _dst):
     """Compute Air Distance
 
@@ -52,7 +56,7 @@ def compute_air_distance(_src, _dst):
     if _src == _dst:
         return distance
 
-    radius = 6371.0  # km
+    radius = EARTH_RADIUS
 
     dlat = math.radians(_dst[0] - _src[0])
     dlon = math.radians(_dst[1] - _src[1])
@@ -66,6 +70,44 @@ def compute_air_distance(_src, _dst):
     return distance
 
 
+def _as_coordinates(_locations):
+    """Return an n x 2 float array of (lat, lon)s"""
+    if isinstance(_locations, np.ndarray):
+        return _locations.reshape(-1, _locations.shape[-1])[:, :2]
+    return np.array([(loc[0], loc[1]) for loc in _locations],
+                    dtype=float).reshape(-1, 2)
+
+
+def compute_air_distance_matrix(_srcs, _dsts):
+    """Compute Air Distances between two sets of locations
+
+    input: two sequences (or n x 2 arrays) of (lat, lon)s
+    output: len(_srcs) x len(_dsts) array of air distances as km
+    """
+    src = np.radians(_as_coordinates(_srcs))
+    dst = np.radians(_as_coordinates(_dsts))
+    src_lat = src[:, 0:1]
+    src_lon = src[:, 1:2]
+
+    sin_dlat = np.sin((dst[:, 0] - src_lat) / 2.0)
+    sin_dlon = np.sin((dst[:, 1] - src_lon) / 2.0)
+    a = sin_dlat * sin_dlat + \
+        np.cos(src_lat) * np.cos(dst[:, 0]) * sin_dlon * sin_dlon
+    a = np.clip(a, 0.0, 1.0)
+    c = 2.0 * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+
+    return EARTH_RADIUS * c
+
+
+def compute_air_distances(_src, _dsts):
+    """Compute Air Distances from one location to many
+
+    input: a (lat, lon) and a sequence (or n x 2 array) of (lat, lon)s
+    output: array of air distances as km
+    """
+    return compute_air_distance_matrix([_src], _dsts)[0]
+
+
 def compute_latency_score(_src, _dst, _region_group):
     """Compute the Network latency score between src and dst"""
     earth_half_circumference = 20000
@@ -0,0 +1,98 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (C) 2021 Wipro Limited.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the etcd API"""
+
+import json
+import unittest
+
+import mock
+
+from conductor.common.etcd import api
+from conductor.common.models.plan import Plan
+
+
+class TestEtcdAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = {
+            'conductor/plans': json.dumps(Plan.schema()),
+            'conductor/plans/p1': json.dumps({
+                'id': 'p1', 'status': 'translated', 'translation': '{}'}),
+        }
+        self.client = mock.MagicMock()
+        self.client.get.side_effect = lambda key: (
+            self.rows.get(key), mock.MagicMock())
+        self.client.put.side_effect = self.rows.__setitem__
+        self.etcd = api.EtcdAPI()
+        mock.patch.object(self.etcd, 'get_client',
+                          return_value=self.client).start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+
+    def test_row_update_keeps_other_columns(self):
+        self.etcd.row_update('conductor', 'plans', 'id', 'p1',
+                             {'status': 'solving'})
+        self.assertEqual({'id': 'p1', 'status': 'solving',
+                          'translation': '{}'},
+                         json.loads(self.rows['conductor/plans/p1']))
+
+    def test_row_read_columns(self):
+        self.assertEqual({'p1': {'id': 'p1', 'status': 'translated'}},
+                         self.etcd.row_read('conductor', 'plans', 'id', 'p1',
+                                            columns=['id', 'status']))
+
+    def test_rows_create_in_transactions(self):
+        self.client.transaction.return_value = (True, [])
+        rows = [{'id': 'p{}'.format(i), 'status': 'template'}
+                for i in range(300)]
+        api.CONF.set_override('max_txn_ops', 128, 'etcd_api')
+        self.addCleanup(api.CONF.clear_override, 'max_txn_ops', 'etcd_api')
+        self.assertTrue(self.etcd.rows_create('conductor', 'plans', 'id',
+                                              rows))
+        self.assertEqual(
+            [128, 128, 44],
+            [len(c[1]['success'])
+             for c in self.client.transaction.call_args_list])
+
+    def test_rows_create_validates_rows(self):
+        self.assertFalse(self.etcd.rows_create(
+            'conductor', 'plans', 'id', [{'id': 'p2', 'unknown': 1}]))
+        self.client.transaction.assert_not_called()
+
+    def _transaction(self, compare, success, failure):
+        """Run transactions of gets against the rows"""
+        return True, [[(self.rows[key], mock.MagicMock(version=1))]
+                      if key in self.rows else [] for key in success]
+
+    def test_rows_read_in_transactions(self):
+        self.client.transactions.get.side_effect = lambda key: key
+        self.client.transaction.side_effect = self._transaction
+        api.CONF.set_override('max_txn_ops', 2, 'etcd_api')
+        self.addCleanup(api.CONF.clear_override, 'max_txn_ops', 'etcd_api')
+        self.assertEqual(
+            {'p1': {'id': 'p1', 'status': 'translated'}},
+            self.etcd.rows_read('conductor', 'plans', 'id',
+                                ['p0', 'p1', 'p2'], columns=['id', 'status']))
+        self.assertEqual(2, self.client.transaction.call_count)
+        self.client.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
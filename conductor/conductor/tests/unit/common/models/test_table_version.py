@@ -0,0 +1,101 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (C) 2019 IBM.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test class for model table_version"""
+
+import unittest
+
+import mock
+
+from conductor.common import db_backend
+from conductor.common.models.region_placeholders import RegionPlaceholders \
+    as RegionPlaceholders_
+from conductor.common.models.table_version import TableVersion
+from conductor.common.music import api
+from conductor.common.music.model import base
+
+
+class TestTableVersion(unittest.TestCase):
+
+    def setUp(self):
+        self.db_api = getattr(db_backend, 'DB_API', None)
+        db_backend.DB_API = api.MockAPI()
+        db_backend.DB_API.keyspace_create('conductor')
+        self.TableVersion = base.create_dynamic_model(
+            keyspace='conductor', baseclass=TableVersion,
+            classname='TableVersion')
+
+    def tearDown(self):
+        db_backend.DB_API = self.db_api
+
+    def test_TableVersion(self):
+        table_version = TableVersion('latency_rules', 'v1')
+        self.assertEqual(True, table_version.atomic())
+        self.assertEqual("id", table_version.pk_name())
+        self.assertEqual('latency_rules', table_version.pk_value())
+        self.assertEqual({'id': 'latency_rules', 'version': 'v1'},
+                         table_version.values())
+        self.assertEqual("text", table_version.schema().get("version"))
+
+    def test_bump(self):
+        self.assertIsNone(self.TableVersion.current('latency_rules'))
+        self.TableVersion.bump('latency_rules')
+        version = self.TableVersion.current('latency_rules')
+        self.assertIsNotNone(version)
+        self.TableVersion.bump('latency_rules')
+        self.assertNotEqual(version,
+                            self.TableVersion.current('latency_rules'))
+
+    def test_reload(self):
+        RegionPlaceholders = base.create_dynamic_model(
+            keyspace='conductor', baseclass=RegionPlaceholders_,
+            classname='RegionPlaceholders')
+        RegionPlaceholders('EMEA', {'EMEA': 'FRA'}).insert()
+
+        def _current():
+            return sorted(
+                row.region_name for row in TableVersion.current_rows(
+                    RegionPlaceholders.query.all(),
+                    self.TableVersion.current('region_placeholders')))
+
+        self.assertEqual(['EMEA'], _current())
+        self.assertTrue(self.TableVersion.reload(RegionPlaceholders, [
+            RegionPlaceholders('APAC', {'APAC': 'JPN'}),
+            RegionPlaceholders('LATAM', {'LATAM': 'BRA'})]))
+        self.assertEqual(['APAC', 'LATAM'], _current())
+        # the previous generation is kept for the readers still at it
+        self.assertEqual(3, len(RegionPlaceholders.query.all()))
+
+        self.assertTrue(self.TableVersion.reload(RegionPlaceholders, [
+            RegionPlaceholders('NA', {'NA': 'USA'})]))
+        self.assertEqual(['NA'], _current())
+        self.assertEqual(3, len(RegionPlaceholders.query.all()))
+
+    def test_failed_reload_keeps_the_version(self):
+        RegionPlaceholders = base.create_dynamic_model(
+            keyspace='conductor', baseclass=RegionPlaceholders_,
+            classname='RegionPlaceholders')
+        with mock.patch.object(db_backend.DB_API, 'rows_create',
+                               return_value=False):
+            self.assertFalse(self.TableVersion.reload(RegionPlaceholders, [
+                RegionPlaceholders('NA', {'NA': 'USA'})]))
+        self.assertIsNone(self.TableVersion.current('region_placeholders'))
+
+
+if __name__ == '__main__':
+    unittest.main()
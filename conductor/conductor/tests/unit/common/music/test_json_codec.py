@@ -0,0 +1,87 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the codecs of JSON columns"""
+
+import json
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from conductor.common.models import plan
+from conductor.common.music.model import base
+
+
+class TestJSONCodecs(unittest.TestCase):
+
+    def tearDown(self):
+        cfg.CONF.clear_override('json_codec', 'db_options')
+
+    def test_codecs_agree(self):
+        value = {'conductor_solver': {
+            'demands': {'vG': {'candidates': [
+                {'candidate_id': 'region-1', 'cost': 1.5,
+                 'latitude': '32.89', 'city': u'Düsseldorf',
+                 'flavors': {'flavor': []}, 'existing': None}]}},
+            'counts': {1: 'one'},
+            'big': 2 ** 70}}
+        expected = json.loads(json.dumps(value))
+        for name, codec in base.JSON_CODECS.items():
+            self.assertEqual(expected, codec.loads(codec.dumps(value)), name)
+            self.assertEqual(expected, codec.loads(json.dumps(value)), name)
+
+    def test_json_codec_falls_back_to_standard_library(self):
+        cfg.CONF.set_override('json_codec', 'orjson', 'db_options')
+        with mock.patch.dict(base.JSON_CODECS, clear=True,
+                             json=base.JSONCodec()):
+            self.assertIsInstance(base.json_codec(), base.JSONCodec)
+            cfg.CONF.set_override('json_codec', 'auto', 'db_options')
+            self.assertIs(base.JSON_CODECS['json'], base.json_codec())
+
+    @unittest.skipUnless(base.orjson, "orjson is not installed")
+    def test_auto_prefers_orjson(self):
+        self.assertIsInstance(base.json_codec(), base.OrjsonCodec)
+        cfg.CONF.set_override('json_codec', 'json', 'db_options')
+        self.assertIs(base.JSON_CODECS['json'], base.json_codec())
+
+
+class TestPlanPayloads(unittest.TestCase):
+
+    def _plan(self, translation):
+        return plan.Plan('plan', 10, 1, '{}', id='plan-1',
+                         status=plan.Plan.SOLVING, translation=translation,
+                         solution='{}', _insert=False)
+
+    def test_unread_columns_are_written_back_as_read(self):
+        translation = json.dumps({'conductor_solver': {'demands': {}}})
+        p = self._plan(translation)
+        with mock.patch.object(base, 'json_codec',
+                               side_effect=AssertionError('decoded')):
+            values = p.values()
+        self.assertEqual(translation, values['translation'])
+
+    def test_read_columns_are_encoded(self):
+        p = self._plan('{"conductor_solver": {"demands": {}}}')
+        p.translation['conductor_solver']['demands']['vG'] = {}
+        self.assertEqual({'conductor_solver': {'demands': {'vG': {}}}},
+                         json.loads(p.values()['translation']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#
+# -------------------------------------------------------------------------
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the Music messaging component"""
+
+import time
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from conductor.common import db_backend
+from conductor.common.music import api
+from conductor.common.music.messaging import component
+from conductor.common.music.messaging import message
+from conductor.common.music.model import base
+
+
+class EchoEndpoint(object):
+    """Endpoint answering every call right away"""
+
+    def echo(self, ctx, arg):
+        return {'response': arg}
+
+
+class TestRPCClient(unittest.TestCase):
+    """Exercise RPCClient.call against the Music mock backend"""
+
+    def setUp(self):
+        self.db_api = getattr(db_backend, 'DB_API', None)
+        db_backend.DB_API = api.MockAPI()
+        db_backend.DB_API.keyspace_create(
+            cfg.CONF.messaging_server.keyspace)
+        self.target = component.Target('test_topic')
+        self.client = component.RPCClient(conf=cfg.CONF, transport=None,
+                                          target=self.target)
+        self.server = component.RPCService(
+            1, cfg.CONF, transport=None, target=self.target,
+            endpoints=[EchoEndpoint()], flush=False)
+
+    def tearDown(self):
+        db_backend.DB_API = self.db_api
+        cfg.CONF.clear_override('db_backend', 'db_options')
+
+    def _call(self, checks_before_response=0):
+        """Call with a fake clock, answering after some status checks
+
+        The call is never answered with checks_before_response None.
+        Returns the response and the waits before each status check.
+        """
+        clock = [time.time()]
+        waits = []
+
+        def _sleep(seconds):
+            waits.append(seconds)
+            clock[0] += seconds
+            if checks_before_response is not None and \
+                    len(waits) == checks_before_response + 1:
+                self.server._do()
+
+        with mock.patch.object(component.time, 'time',
+                               side_effect=lambda: clock[0]), \
+                mock.patch.object(component.time, 'sleep',
+                                  side_effect=_sleep):
+            response = self.client.call(ctxt={}, method='echo',
+                                        args={'value': 42})
+        return response, waits
+
+    def test_call_returns_response(self):
+        response, waits = self._call()
+        self.assertEqual({'value': 42}, response)
+        self.assertEqual([0.05], waits)
+        # The message is removed once the response is consumed.
+        self.assertEqual([], self.target.topic_class.query.all())
+
+    def test_call_backs_off_up_to_check_interval(self):
+        response, waits = self._call(checks_before_response=6)
+        self.assertEqual({'value': 42}, response)
+        self.assertEqual([0.05 * 2 ** i for i in range(5)] + [1, 1], waits)
+
+    def test_call_waits_until_response_timeout(self):
+        cfg.CONF.set_override('response_timeout', 3, 'messaging_server')
+        self.addCleanup(cfg.CONF.clear_override, 'response_timeout',
+                        'messaging_server')
+        response, waits = self._call(checks_before_response=None)
+        self.assertFalse(response)
+        # The last wait is cut short at the timeout
+        self.assertEqual([0.05 * 2 ** i for i in range(5)] + [1], waits[:-1])
+        self.assertAlmostEqual(3, sum(waits))
+
+    def test_call_watches_on_etcd(self):
+        cfg.CONF.set_override('db_backend', 'etcd', 'db_options')
+
+        def _watch(condition, timeout):
+            self.server._do()
+            return True
+
+        with mock.patch.object(message.Message, 'watch',
+                               side_effect=_watch) as watch_mock, \
+                mock.patch.object(component.time, 'sleep') as sleep_mock:
+            response = self.client.call(ctxt={}, method='echo',
+                                        args={'value': 7})
+        self.assertEqual({'value': 7}, response)
+        self.assertEqual(1, watch_mock.call_count)
+        sleep_mock.assert_not_called()
+
+
+class TestRPCService(unittest.TestCase):
+    """Exercise RPCService message dispatch against the Music mock"""
+
+    def setUp(self):
+        self.db_api = getattr(db_backend, 'DB_API', None)
+        db_backend.DB_API = api.MockAPI()
+        db_backend.DB_API.keyspace_create(
+            cfg.CONF.messaging_server.keyspace)
+        self.target = component.Target('test_topic')
+        self.RPC = self.target.topic_class
+        self.server = component.RPCService(
+            1, cfg.CONF, transport=None, target=self.target,
+            endpoints=[EchoEndpoint()], flush=False)
+
+    def tearDown(self):
+        db_backend.DB_API = self.db_api
+
+    def test_do_reads_status_index_only(self):
+        msg = self.RPC(action=self.RPC.CALL, ctxt={}, method='echo',
+                       args={'value': 1})
+        with mock.patch('conductor.common.music.model.search.Query.all',
+                        side_effect=AssertionError('full table scan')):
+            self.server._do()
+        msg = self.RPC.query.one(msg.id)
+        self.assertTrue(msg.ok)
+        self.assertEqual({'value': 1}, msg.response)
+
+    def test_do_requeues_stale_working_message(self):
+        msg = self.RPC(action=self.RPC.CALL, ctxt={}, method='echo',
+                       args={'value': 2})
+        msg.status = self.RPC.WORKING
+        msg.update()
+        stale = message.current_time_millis() - \
+            (cfg.CONF.messaging_server.response_timeout + 10) * 1000
+        db_backend.DB_API.row_update(
+            self.RPC.__keyspace__, self.RPC.__tablename__, 'id', msg.id,
+            {'updated': stale})
+
+        self.server._do()
+        self.assertTrue(self.RPC.query.one(msg.id).ok)
+
+    def test_payloads_are_decoded_lazily(self):
+        msg = self.RPC(action=self.RPC.CALL, ctxt={}, method='echo',
+                       args={'value': 3})
+        codec = base.json_codec()
+        with mock.patch.object(codec, 'loads',
+                               wraps=codec.loads) as loads_mock:
+            msg = self.RPC.query.one(msg.id)
+            self.assertTrue(msg.enqueued)
+            loads_mock.assert_not_called()
+            self.assertEqual({'value': 3}, msg.args)
+            self.assertEqual(1, loads_mock.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
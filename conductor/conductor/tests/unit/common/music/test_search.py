@@ -0,0 +1,115 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the Music ORM queries"""
+
+import json
+import unittest
+
+import mock
+
+from conductor.common import db_backend
+from conductor.common.models import plan
+from conductor.common.music import api
+from conductor.common.music.model import base
+
+
+class TestDeferredColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.db_api = getattr(db_backend, 'DB_API', None)
+        db_backend.DB_API = api.MockAPI()
+        db_backend.DB_API.keyspace_create('conductor')
+        self.Plan = base.create_dynamic_model(
+            keyspace='conductor', baseclass=plan.Plan, classname='Plan')
+        self.translation = {'conductor_solver': {'demands': {'vG': {}}}}
+        self.plan = self.Plan('plan', 10, 1, {'name': 'template'},
+                              status=plan.Plan.TRANSLATED,
+                              translation=self.translation)
+        self.row_read = mock.patch.object(
+            db_backend.DB_API, 'row_read',
+            wraps=db_backend.DB_API.row_read).start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+        db_backend.DB_API = self.db_api
+
+    def _polled(self):
+        plans = self.Plan.query.defer(*plan.Plan.PAYLOADS).get_plan_by_col(
+            'status', plan.Plan.TRANSLATED)
+        self.assertEqual(1, len(plans))
+        return plans[0]
+
+    def test_deferred_columns_are_not_read(self):
+        p = self._polled()
+
+        columns = self.row_read.call_args[1]['columns']
+        self.assertIn('status', columns)
+        self.assertNotIn('translation', columns)
+        self.assertEqual(self.plan.id, p.id)
+        self.assertEqual(plan.Plan.TRANSLATED, p.status)
+        self.assertEqual(1, self.row_read.call_count)
+
+    def test_deferred_columns_are_read_once_when_accessed(self):
+        p = self._polled()
+
+        self.assertEqual(self.translation, p.translation)
+        self.assertEqual({'name': 'template'}, p.template)
+        self.assertEqual({}, p.solution)
+        self.assertEqual(2, self.row_read.call_count)
+        self.assertEqual(['solution', 'template', 'translation'],
+                         self.row_read.call_args[1]['columns'])
+
+    def test_deferred_columns_of_a_deleted_row_are_empty(self):
+        p = self._polled()
+        self.plan.delete()
+
+        self.assertIsNone(p.translation)
+        self.assertIsNone(p.template)
+        self.assertEqual(plan.Plan.TRANSLATED, p.status)
+
+    def test_update_leaves_deferred_columns_unchanged(self):
+        p = self._polled()
+        p.status = plan.Plan.SOLVING
+        p.solution = {'recommendations': []}
+        with mock.patch.object(db_backend.DB_API, 'row_update',
+                               wraps=db_backend.DB_API.row_update) as update:
+            p.update()
+
+        values = update.call_args[1]['values']
+        self.assertNotIn('translation', values)
+        self.assertEqual({'recommendations': []},
+                         json.loads(values['solution']))
+        stored = self.Plan.query.one(self.plan.id)
+        self.assertEqual(plan.Plan.SOLVING, stored.status)
+        self.assertEqual(self.translation, stored.translation)
+
+    def test_backends_reading_whole_rows_do_not_defer(self):
+        with mock.patch.object(db_backend.DB_API, 'reads_columns', False):
+            p = self._polled()
+
+        self.assertNotIn('columns', self.row_read.call_args[1])
+        self.assertEqual(self.translation, p.translation)
+        self.assertEqual(1, self.row_read.call_count)
+
+    def test_only_json_columns_are_deferred(self):
+        self.assertRaises(ValueError, self.Plan.query.defer, 'status')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#
+# -------------------------------------------------------------------------
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+import logging
+import threading
+import unittest
+
+import mock
+
+from conductor.common.utils import conductor_logging_util as log_util
+
+
+class TestThreadLoggerFilter(unittest.TestCase):
+
+    def _record(self):
+        return logging.LogRecord('conductor', logging.INFO, __file__, 0,
+                                 'message', None, None)
+
+    @mock.patch.object(log_util, 'getTransactionId',
+                       side_effect=lambda keyspace, plan_id: 'tx-' + plan_id)
+    def test_records_are_tagged_with_the_plan_of_their_thread(self, tx_mock):
+        logger_filter = log_util.ThreadLoggerFilter()
+        plans_set = threading.Barrier(2)
+        tagged = {}
+
+        def _log(plan_id):
+            log_util.setThreadLoggerContext('conductor', plan_id)
+            # Both threads have taken up their plan before logging
+            plans_set.wait(5)
+            record = self._record()
+            logger_filter.filter(record)
+            tagged[plan_id] = (record.plan_id, record.transaction_id)
+
+        threads = [threading.Thread(target=_log, args=(plan_id,))
+                   for plan_id in ('plan-1', 'plan-2')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual({'plan-1': ('plan-1', 'tx-plan-1'),
+                          'plan-2': ('plan-2', 'tx-plan-2')}, tagged)
+
+        # Threads that took up no plan are not tagged
+        record = self._record()
+        logger_filter.filter(record)
+        self.assertIsNone(record.plan_id)
+        self.assertIsNone(record.transaction_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2018 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+import os
+import shutil
+import tempfile
+import unittest
+
+from conductor.common.utils import snapshot_util
+
+
+class TestSharedSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, 'regions.snapshot')
+        self.writer = snapshot_util.SharedSnapshot(self.path)
+        self.reader = snapshot_util.SharedSnapshot(self.path)
+
+    def test_load_before_publish(self):
+        self.assertIsNone(self.reader.load())
+
+    def test_publish_and_load(self):
+        records = {'region-1': {'complex': {'city': 'Middletown'}},
+                   'region-2': {'flavors': {'flavor': []}}}
+        published = self.writer.publish(records)
+        snapshot = self.reader.load()
+
+        self.assertEqual(1, published.version)
+        self.assertEqual(records, dict(snapshot))
+        self.assertIs(snapshot, self.reader.load())
+
+    def test_publish_swaps_versions(self):
+        self.writer.publish({'region-1': {'version': 1}})
+        old = self.reader.load()
+        self.writer.publish({'region-2': {'version': 2}})
+        new = self.reader.load()
+
+        self.assertEqual(2, new.version)
+        self.assertEqual({'region-2': {'version': 2}}, dict(new))
+        # A mapped snapshot stays readable after it is replaced
+        self.assertEqual({'region-1': {'version': 1}}, dict(old))
+        # No temporary files are left behind
+        self.assertEqual(['regions.snapshot'], os.listdir(self.tmp_dir))
+
+    def test_writer_lock_is_exclusive(self):
+        with self.writer.writer() as writing:
+            self.assertTrue(writing)
+            with self.reader.writer() as other_writing:
+                self.assertFalse(other_writing)
+        with self.reader.writer() as writing:
+            self.assertTrue(writing)
+
+    def test_load_rejects_other_files(self):
+        with open(self.path, 'wb') as other_file:
+            other_file.write(b'not a snapshot at all, really not')
+        self.assertRaises(snapshot_util.SnapshotError, self.reader.load)
+
+
+if __name__ == "__main__":
+    unittest.main()
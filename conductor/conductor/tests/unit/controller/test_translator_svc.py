@@ -27,6 +27,7 @@ import futurist
 from mock import patch
 from mock import PropertyMock
 
+import conductor.common.prometheus_metrics as PC
 from conductor.common import db_backend
 from conductor.controller.translator_svc import TranslatorService
 from conductor.common.models import plan
@@ -112,6 +113,38 @@ class TestTranslatorServiceNoException(unittest.TestCase):
         self.translator_svc._reset_template_status()
         mock_update.assert_called_once()
 
+    @patch('conductor.controller.translator_svc.log_util.setLoggerFilter')
+    @patch('conductor.controller.translator_svc.time.sleep')
+    @patch('conductor.controller.translator_svc.TranslatorService.translate')
+    @patch('conductor.common.music.model.search.Query.get_plan_by_col')
+    @patch('conductor.common.music.model.base.Base.update')
+    def test_check_for_templates_claims_idle_workers(self, mock_update,
+                                                     mock_plans,
+                                                     mock_translate,
+                                                     mock_sleep, mock_log):
+        cfg.CONF.set_override('translation_workers', 2, 'controller')
+        self.addCleanup(cfg.CONF.clear_override, 'translation_workers',
+                        'controller')
+        template_plans = [
+            self.Plan(str(uuid.uuid4()), self.conf.controller.timeout,
+                      self.conf.controller.limit, None,
+                      status=self.Plan.TEMPLATE)
+            for _ in range(3)]
+        mock_plans.side_effect = \
+            lambda col, status: template_plans \
+            if status == self.Plan.TEMPLATE else []
+        mock_update.return_value = 'SUCCESS'
+
+        executor = futurist.ThreadPoolExecutor(max_workers=2)
+        self.translator_svc._TranslatorService__check_for_templates(executor)
+        executor.shutdown()
+
+        self.assertEqual(2, mock_translate.call_count)
+        self.assertEqual(2, PC.TRANSLATION_PLANS_CLAIMED._value.get())
+        self.assertEqual(0, PC.TRANSLATION_PLANS_IN_FLIGHT._value.get())
+        self.assertEqual([self.Plan.TRANSLATING] * 2 + [self.Plan.TEMPLATE],
+                         [p.status for p in template_plans])
+
     @patch('conductor.controller.translator_svc.TranslatorService._gracefully_stop')
     def test_terminate(self, mock_stop):
         self.translator_svc.terminate()
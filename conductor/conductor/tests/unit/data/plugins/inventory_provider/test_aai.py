@@ -20,11 +20,17 @@
 import copy
 import json
 import mock
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
 from oslo_config import cfg
+from prometheus_client import REGISTRY
 
+from conductor import service as conductor_service
 import conductor.data.plugins.inventory_provider.aai as aai
 from conductor.data.plugins.inventory_provider.aai import AAI
 from conductor.data.plugins.inventory_provider.sdc import SDC
@@ -447,6 +453,180 @@ class TestAAI(unittest.TestCase):
         self.assertEqual(None,
                          self.aai_ep._refresh_cache())
 
+    def test_refresh_cache_fetches_shared_complexes_once(self):
+        cfg.CONF.register_opts(conductor_service.OPTS)
+        cfg.CONF.set_override('HPA_enabled', True)
+        self.addCleanup(cfg.CONF.clear_override, 'HPA_enabled')
+
+        def _region(region_id, complex_id):
+            link = '/aai/v10/cloud-infrastructure/complexes/complex/' + \
+                complex_id
+            return {
+                'cloud-owner': 'att-aic',
+                'cloud-region-id': region_id,
+                'cloud-region-version': 'aic3.0',
+                'relationship-list': {'relationship': [{
+                    'related-to': 'complex',
+                    'related-link': link,
+                    'relationship-data': [{
+                        'relationship-key': 'complex.physical-location-id',
+                        'relationship-value': complex_id}]}]}}
+
+        response = mock.MagicMock()
+        response.status_code = 200
+        response.json.return_value = {'cloud-region': [
+            _region('region-1', 'complex-a'),
+            _region('region-2', 'complex-a'),
+            _region('region-3', 'complex-b')]}
+        mock.patch.object(AAI, '_request', return_value=response).start()
+        complex_info = {'complex-name': 'c1', 'latitude': '28.5',
+                        'longitude': '-81.3', 'city': 'Middletown',
+                        'country': 'USA'}
+        get_complex = mock.patch.object(
+            AAI, '_get_complex', return_value=complex_info).start()
+        get_flavors = mock.patch.object(
+            AAI, '_get_flavors',
+            side_effect=lambda owner, region_id: {'flavor': [region_id]}
+        ).start()
+
+        old_cache = self.aai_ep._aai_cache
+        self.aai_ep._refresh_cache()
+
+        self.assertEqual(['complex-a', 'complex-b'],
+                         sorted(c[1]['complex_id']
+                                for c in get_complex.call_args_list))
+        self.assertEqual(3, get_flavors.call_count)
+        regions = self.aai_ep._aai_cache['cloud_region']
+        self.assertIsNot(old_cache, self.aai_ep._aai_cache)
+        self.assertEqual(['region-1', 'region-2', 'region-3'],
+                         sorted(regions))
+        self.assertEqual('complex-a', regions['region-2']['physical_location_id'])
+        self.assertEqual({'flavor': ['region-3']},
+                         regions['region-3']['flavors'])
+
+    def test_refresh_cache_in_progress_keeps_current_cache(self):
+        request = mock.patch.object(AAI, '_request').start()
+        self.aai_ep._aai_cache = {'cloud_region': {'region-1': {}}}
+        with self.aai_ep._refresh_lock:
+            self.aai_ep._refresh_cache()
+        request.assert_not_called()
+        self.assertEqual({'cloud_region': {'region-1': {}}},
+                         self.aai_ep._aai_cache)
+
+    def test_get_regions_waits_for_the_first_refresh(self):
+        refresh_started = threading.Event()
+        finish_refresh = threading.Event()
+
+        def _build_cache():
+            refresh_started.set()
+            finish_refresh.wait(5)
+            return {'cloud_region': {'region-1': {}}}
+
+        build_cache = mock.patch.object(
+            AAI, '_build_cache', side_effect=_build_cache).start()
+        self.aai_ep._aai_cache = {}
+        self.aai_ep.last_refresh_time = None
+        refresher = threading.Thread(target=self.aai_ep._refresh_cache)
+        refresher.start()
+        self.addCleanup(refresher.join)
+        self.assertTrue(refresh_started.wait(5))
+
+        regions = []
+        waiting = threading.Thread(
+            target=lambda: regions.append(self.aai_ep._get_regions()))
+        waiting.start()
+        time.sleep(0.1)
+        self.assertEqual([], regions)
+
+        finish_refresh.set()
+        waiting.join(5)
+        self.assertEqual([{'region-1': {}}], regions)
+        self.assertEqual(1, build_cache.call_count)
+
+    def test_refresh_cache_shares_regions_between_workers(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.conf.set_override('shared_cache_dir', tmp_dir, 'aai')
+        self.addCleanup(self.conf.clear_override, 'shared_cache_dir', 'aai')
+        build_cache = mock.patch.object(
+            AAI, '_build_cache', side_effect=lambda: {
+                'cloud_region': {'region-1': {'flavors': {'flavor': []}}},
+                'service': {}}).start()
+        refreshing_worker = AAI()
+        other_worker = AAI()
+
+        refreshing_worker._refresh_cache()
+        self.assertEqual({'region-1': {'flavors': {'flavor': []}}},
+                         dict(other_worker._get_regions()))
+        self.assertEqual(1, build_cache.call_count)
+
+        # A worker does not refresh while another worker is refreshing
+        other_worker.cache_refresh_interval = 0
+        with refreshing_worker._shared_regions.writer():
+            other_worker._refresh_cache()
+        self.assertEqual(1, build_cache.call_count)
+        other_worker._refresh_cache()
+        self.assertEqual(2, build_cache.call_count)
+
+    def _wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_get_regions_serves_stale_cache_while_refreshing(self):
+        refresh_started = threading.Event()
+        finish_refresh = threading.Event()
+
+        def _build_cache():
+            refresh_started.set()
+            finish_refresh.wait(5)
+            return {'cloud_region': {'region-2': {}}}
+
+        mock.patch.object(AAI, '_build_cache', side_effect=_build_cache).start()
+        refreshes = REGISTRY.get_sample_value(
+            'aai_cache_refresh_duration_seconds_count') or 0
+        self.aai_ep._aai_cache = {'cloud_region': {'region-1': {}}}
+        self.aai_ep.last_refresh_time = time.time() - \
+            self.aai_ep.cache_refresh_interval * 60 - 1
+
+        self.assertEqual({'region-1': {}}, self.aai_ep._get_regions())
+        self.assertTrue(refresh_started.wait(5))
+        self.assertEqual({'region-1': {}}, self.aai_ep._get_regions())
+
+        finish_refresh.set()
+        self.assertTrue(self._wait_for(
+            lambda: 'region-2' in self.aai_ep._get_regions()))
+        self.assertEqual(refreshes + 1, REGISTRY.get_sample_value(
+            'aai_cache_refresh_duration_seconds_count'))
+
+    def test_get_complex_serves_stale_entry_while_revalidating(self):
+        response = mock.MagicMock()
+        response.status_code = 200
+        response.json.return_value = {
+            'city': 'Middletown', 'latitude': '28.5', 'longitude': '-81.3',
+            'country': 'USA'}
+        mock.patch.object(AAI, '_request', return_value=response).start()
+        expired = time.time() - \
+            self.aai_ep.complex_cache_refresh_interval * 60 - 1
+        self.aai_ep._aai_complex_cache['complex_id'] = \
+            (expired, {'city': 'Old Town'})
+
+        self.assertEqual({'city': 'Old Town'}, self.aai_ep._get_complex(
+            "/v10/complex/complex_id", "complex_id"))
+        self.assertTrue(self._wait_for(
+            lambda: self.aai_ep._get_complex(
+                "/v10/complex/complex_id", "complex_id").get('city') ==
+            'Middletown'))
+
+    def test_next_refresh_delay_is_jittered(self):
+        interval = self.aai_ep.cache_refresh_interval * 60
+        jitter = self.conf.aai.cache_refresh_jitter
+        delays = [self.aai_ep._next_refresh_delay() for _ in range(20)]
+        self.assertTrue(all(interval * (1 - jitter) <= delay <=
+                            interval * (1 + jitter) for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
     def test_get_aai_rel_link(self):
 
         relatonship_response_file = './conductor/tests/unit/data/plugins/inventory_provider/relationship_list.json'
@@ -948,3 +1128,23 @@ tenant/3c6c471ada7747fe8ff7f28e100b61e8/vservers/vserver/00bddefc-126e-4e4f-a18d
         self.mock_get_profiles.start()
 
         self.assertEquals([service_profile], self.aai_ep.get_profile_instances(nsi_response["service-instance"][0]))
+
+    def test_resolve_vnfs_concurrently_keeps_vnf_order(self):
+        triage_translator_data = {'dropped_candidates': [
+            {'name': 'vG', 'translation_dropped': []}]}
+
+        def _resolve(vnf, triage_data):
+            # Later VNFs finish first.
+            time.sleep(0.01 * (3 - vnf))
+            triage_data['dropped_candidates'][0][
+                'translation_dropped'].append({'candidate_id': 'c{}'.format(vnf)})
+            return ['c{}'.format(vnf)]
+
+        candidates = self.aai_ep.resolve_vnfs_concurrently(
+            _resolve, [0, 1, 2], 'vG', triage_translator_data)
+
+        self.assertEqual(['c0', 'c1', 'c2'], candidates)
+        dropped = triage_translator_data['dropped_candidates'][0]
+        self.assertEqual(['c0', 'c1', 'c2'],
+                         [d['candidate_id']
+                          for d in dropped['translation_dropped']])
@@ -233,6 +233,60 @@ class TestDataEndpoint(unittest.TestCase):
         self.assertEqual(expected_response,
                          self.data_ep.resolve_demands(ctxt, req_json))
 
+    @mock.patch.object(service.LOG, 'error')
+    @mock.patch.object(log_util, 'getTransactionId')
+    @mock.patch.object(stevedore.ExtensionManager, 'map_method')
+    def test_resolve_all_demands(self, ext_mock, logutil_mock, error_mock):
+        ctxt = {
+            'plan_id': 'plan_abc',
+            'keyspace': cfg.CONF.keyspace
+        }
+        logutil_mock.return_value = uuid.uuid4()
+
+        def _resolve(method, demands, plan_info, triage_translator_data):
+            name = list(demands)[0]
+            triage_translator_data['dropped_candidates'] = [
+                {'name': name, 'translation_dropped': []}]
+            if name == 'vMissing':
+                return []
+            if name == 'vFailing':
+                raise Exception('A&AI is down')
+            resolved = {name: demands[name]}
+            if name == 'vGMuxInfra':
+                resolved['required_candidates'] = [
+                    {'candidate_id': 'vGMuxInfra-1'}]
+            return [resolved]
+
+        ext_mock.side_effect = _resolve
+        demands = {
+            'vG': [{'inventory_type': 'cloud'}],
+            'vMissing': [{'inventory_type': 'cloud'}],
+            'vFailing': [{'inventory_type': 'cloud'}],
+            'vGMuxInfra': [{'inventory_type': 'service'}],
+        }
+        req_json = {
+            'demands': demands,
+            'plan_info': {'plan_id': 'plan_abc', 'plan_name': 'plan_name'},
+            'triage_translator_data': {'plan_id': 'plan_abc',
+                                       'plan_name': 'plan_name'},
+        }
+        result = self.data_ep.resolve_all_demands(ctxt, req_json)
+
+        self.assertTrue(result['error'])
+        self.assertEqual(4, ext_mock.call_count)
+        # The failing demand is reported like the one nothing answered for
+        self.assertEqual(2, error_mock.call_count)
+        self.assertEqual({'vG': [{'inventory_type': 'cloud'}],
+                          'vGMuxInfra': [{'inventory_type': 'service'}],
+                          'required_candidates': {
+                              'vGMuxInfra': [
+                                  {'candidate_id': 'vGMuxInfra-1'}]}},
+                         result['response']['resolved_demands'])
+        self.assertEqual(
+            [[{'name': 'vG', 'translation_dropped': []}],
+             [{'name': 'vGMuxInfra', 'translation_dropped': []}]],
+            result['response']['trans']['translator_triage'])
+
     @mock.patch.object(service.LOG, 'error')
     @mock.patch.object(service.LOG, 'debug')
     @mock.patch.object(service.LOG, 'info')
@@ -391,6 +445,52 @@ class TestDataEndpoint(unittest.TestCase):
                          self.data_ep.get_candidates_with_vim_capacity(ctxt,
                                                                        args))
 
+    @mock.patch.object(service.LOG, 'info')
+    @mock.patch.object(stevedore.ExtensionManager, 'names')
+    @mock.patch.object(stevedore.ExtensionManager, 'map_method')
+    def test_evaluate_candidates(self, vim_mock, ext_mock1, info_mock):
+        req_json_file = './conductor/tests/unit/data/candidate_list.json'
+        req_json = yaml.safe_load(open(req_json_file).read())
+        candidate_list = req_json['candidate_list']
+        ext_mock1.return_value = ['MultiCloud']
+        vim_mock.return_value = [['att-aic_NYCNY55']]
+        flavors = {'flavor': [{'flavor-id': 'f1'}]}
+        ctxt = {'plan_id': 'plan-1'}
+        args = {'demand_name': 'vG',
+                'candidate_list': copy.deepcopy(candidate_list),
+                'requests': [['get_candidates_with_vim_capacity',
+                              {'request': {'vCPU': 10}}]]}
+
+        # Nothing is resident yet for this plan and demand.
+        self.assertEqual(
+            {'response': {'missing': [c['candidate_id']
+                                      for c in candidate_list]},
+             'error': False},
+            self.data_ep.evaluate_candidates(ctxt, copy.deepcopy(args)))
+
+        args['resident'] = {c['candidate_id']: {} for c in candidate_list}
+        args['resident'][candidate_list[1]['candidate_id']] = \
+            {'flavors': flavors}
+        self.assertEqual(
+            {'response': {'candidate_list': candidate_list},
+             'error': False},
+            self.data_ep.evaluate_candidates(ctxt, copy.deepcopy(args)))
+        self.assertEqual(
+            {'flavors': flavors},
+            self.data_ep.resident_candidates['plan-1']['vG'][
+                candidate_list[1]['candidate_id']])
+
+        # Later calls only carry the light candidates.
+        del args['resident']
+        self.assertEqual(
+            {'response': {'candidate_list': candidate_list},
+             'error': False},
+            self.data_ep.evaluate_candidates(ctxt, copy.deepcopy(args)))
+
+        args['requests'] = [['resolve_demands', {}]]
+        self.assertTrue(
+            self.data_ep.evaluate_candidates(ctxt, args)['error'])
+
 
 def generate_args(candidate_list, flavorProperties, vf_id, model_type, directives):
     arg_candidate_list = copy.deepcopy(candidate_list)
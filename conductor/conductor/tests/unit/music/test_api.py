@@ -20,6 +20,7 @@ import unittest
 
 import mock
 from conductor.common import rest
+from conductor.common.music.api import MockAPI
 from conductor.common.music.api import MusicAPI
 from oslo_config import cfg
 
@@ -250,5 +251,45 @@ class TestMusicApi(unittest.TestCase):
                                                       'pk_name', 'pk_value'))
 
 
+class TestMockApi(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_api = MockAPI()
+        self.mock_api.keyspace_create('conductor')
+        self.mock_api.table_create('conductor', 'plans', {})
+        self.mock_api.row_create('conductor', 'plans', 'id', 'p1',
+                                 {'id': 'p1', 'status': 'translated',
+                                  'solver_counter': 0})
+
+    def _row(self, pk_value):
+        return self.mock_api._keyspaces['conductor']['plans'].get(pk_value)
+
+    def test_row_update_keeps_other_columns(self):
+        self.assertEqual('SUCCESS', self.mock_api.row_update(
+            'conductor', 'plans', 'id', 'p1', {'status': 'solving'}))
+        self.assertEqual({'id': 'p1', 'status': 'solving',
+                          'solver_counter': 0}, self._row('p1'))
+
+    def test_row_update_with_condition(self):
+        self.assertEqual('FAILURE', self.mock_api.row_update(
+            'conductor', 'plans', 'id', 'p1', {'status': 'solving'},
+            condition={'status': 'solved'}))
+        self.assertEqual('translated', self._row('p1')['status'])
+        self.assertEqual('SUCCESS', self.mock_api.row_update(
+            'conductor', 'plans', 'id', 'p1', {'status': 'solving'},
+            condition={'status': 'translated'}))
+        self.assertEqual('solving', self._row('p1')['status'])
+
+    def test_row_update_missing_row(self):
+        self.assertEqual('FAILURE', self.mock_api.row_update(
+            'conductor', 'plans', 'id', 'p2', {'status': 'solving'},
+            condition={'status': 'translated'}))
+        self.assertIsNone(self._row('p2'))
+        # Without a condition the row is written, as before
+        self.assertEqual('SUCCESS', self.mock_api.row_update(
+            'conductor', 'plans', 'id', 'p2', {'status': 'solving'}))
+        self.assertEqual({'status': 'solving'}, self._row('p2'))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test class for the constraint base class"""
+
+import unittest
+
+from conductor.solver.optimizer.constraints import constraint
+from conductor.solver.optimizer.decision_path import DecisionPath
+from conductor.solver.request.demand import Demand
+
+
+class EvenConstraint(constraint.Constraint):
+    """Keeps candidates with an even id, remembering what it solved"""
+
+    def __init__(self, *args):
+        constraint.Constraint.__init__(self, *args)
+        self.solved = []
+
+    def solve(self, _decision_path, _candidate_list, _request):
+        self.solved.append([c['candidate_id'] for c in _candidate_list])
+        _candidate_list[:] = [dict(c, checked=True) for c in _candidate_list
+                              if int(c['candidate_id']) % 2 == 0]
+        return _candidate_list
+
+
+class TestConstraint(unittest.TestCase):
+
+    def setUp(self):
+        self.candidates = [{'candidate_id': str(i), 'inventory_type': 'cloud'}
+                           for i in range(6)]
+        self.decision_path = DecisionPath()
+        self.decision_path.set_decisions({})
+        self.decision_path.current_demand = Demand('vG')
+
+    def _ids(self, candidates):
+        return [c['candidate_id'] for c in candidates]
+
+    def test_memoized_solve_reuses_verdicts(self):
+        even = EvenConstraint('even', 'even', ['vG'])
+        even.path_independent = True
+
+        first = even.memoized_solve(self.decision_path,
+                                    self.candidates[:4], None)
+        self.assertEqual(['0', '2'], self._ids(first))
+        self.assertTrue(all(c['checked'] for c in first))
+
+        # A unique candidate was removed and new ones showed up
+        second = even.memoized_solve(self.decision_path,
+                                     self.candidates[1:], None)
+        self.assertEqual(['2', '4'], self._ids(second))
+        self.assertEqual([['0', '1', '2', '3'], ['4', '5']], even.solved)
+
+        # Verdicts are kept per demand
+        self.decision_path.current_demand = Demand('vGMuxInfra')
+        even.memoized_solve(self.decision_path, self.candidates[:1], None)
+        self.assertEqual(['0'], even.solved[-1])
+
+    def test_memoized_solve_path_dependent(self):
+        even = EvenConstraint('even', 'even', ['vG'])
+        for _ in range(2):
+            self.assertEqual(['0', '2'], self._ids(even.memoized_solve(
+                self.decision_path, self.candidates[:4], None)))
+        self.assertEqual(2, len(even.solved))
+        self.assertEqual({}, even.verdicts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+import operator
+import unittest
+
+import mock
+
+from conductor.solver.optimizer.constraints.access_distance import \
+    AccessDistance
+from conductor.solver.optimizer.constraints.cloud_distance import \
+    CloudDistance
+from conductor.solver.optimizer.decision_path import DecisionPath
+from conductor.solver.request.demand import Location
+
+
+class TestDistance(unittest.TestCase):
+
+    def setUp(self):
+        self.request = mock.MagicMock()
+        self.request.cei.get_candidate_location.side_effect = \
+            lambda candidate: (candidate['latitude'],
+                               candidate['longitude'])
+        # Dallas, Houston, New York and Chicago
+        self.candidates = [
+            {'candidate_id': 'dfw', 'latitude': 32.90, 'longitude': -97.04},
+            {'candidate_id': 'iah', 'latitude': 29.99, 'longitude': -95.34},
+            {'candidate_id': 'jfk', 'latitude': 40.64, 'longitude': -73.78},
+            {'candidate_id': 'ord', 'latitude': 41.98, 'longitude': -87.90},
+        ]
+        self.decision_path = DecisionPath()
+        self.decision_path.set_decisions({})
+
+    def _ids(self, candidates):
+        return [c['candidate_id'] for c in candidates]
+
+    def test_access_distance(self):
+        location = Location('customer_loc')
+        location.value = (32.78, -96.80)
+        constraint = AccessDistance('access', 'access_distance', ['vG'],
+                                    _comparison_operator=operator.le,
+                                    _threshold=400, _location=location)
+        self.assertEqual(['dfw', 'iah'], self._ids(constraint.solve(
+            self.decision_path, self.candidates, self.request)))
+
+    def test_cloud_distance(self):
+        constraint = CloudDistance('cloud', 'cloud_distance', ['vG', 'vGMuxInfra'],
+                                   _comparison_operator=operator.le,
+                                   _threshold=1600)
+        # Nothing decided yet, all candidates are kept
+        self.assertEqual(self.candidates, constraint.solve(
+            self.decision_path, self.candidates, self.request))
+
+        self.decision_path.decisions['vG'] = self.candidates[0]
+        self.decision_path.decisions['vGMuxInfra'] = self.candidates[3]
+        self.assertEqual(['dfw', 'iah', 'ord'], self._ids(constraint.solve(
+            self.decision_path, self.candidates, self.request)))
+        self.assertEqual([], constraint.solve(
+            self.decision_path, [], self.request))
+
+
+if __name__ == "__main__":
+    unittest.main()
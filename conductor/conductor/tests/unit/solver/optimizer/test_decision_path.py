@@ -36,6 +36,15 @@ class TestDecisionPath(unittest.TestCase):
         self.assertEqual(0.0, self.decisionPath.total_value)
         self.assertEqual(0.0, self.decisionPath.total_cost)
 
+    def test_set_decisions_shares_candidates(self):
+        candidate = {'candidate_id': '1', 'flavors': {'flavors': []}}
+        prior = {'vG': candidate}
+        self.decisionPath.set_decisions(prior)
+        self.decisionPath.decisions['vGMuxInfra'] = {'candidate_id': '2'}
+
+        self.assertIs(candidate, self.decisionPath.decisions['vG'])
+        self.assertEqual(['vG'], list(prior))
+
 
 if __name__ == '__main__':
     unittest.main()
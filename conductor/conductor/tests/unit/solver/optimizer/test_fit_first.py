@@ -0,0 +1,113 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test class for optimizer fit_first.py"""
+
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from conductor.common import db_backend
+from conductor.solver.optimizer.fit_first import FitFirst
+from conductor.solver.request import demand
+from conductor.solver.request.functions import distance_between
+from conductor.solver.request import objective
+
+
+class TestFitFirst(unittest.TestCase):
+
+    DEMANDS = 10
+    CANDIDATES = 20
+
+    @mock.patch('conductor.common.music.model.base.Base.table_create')
+    @mock.patch('conductor.common.music.model.base.Base.insert')
+    def setUp(self, insert_mock, table_create_mock):
+        db_backend.get_client()
+        self.fit_first = FitFirst(cfg.CONF)
+        self.request = mock.MagicMock()
+        self.request.cei.get_candidate_location.side_effect = \
+            lambda candidate: (candidate['latitude'],
+                               candidate['longitude'])
+
+        customer = demand.Location('customer_loc')
+        customer.value = (32.0, -97.0)
+        self.objective = objective.Objective()
+        self.objective.goal = "min"
+        self.objective.operation = "sum"
+
+        self.demands = []
+        for d in range(self.DEMANDS):
+            dmd = demand.Demand('demand_{}'.format(d))
+            for c in range(self.CANDIDATES):
+                candidate_id = 'c{}-{}'.format(d, c)
+                dmd.resources[candidate_id] = {
+                    'candidate_id': candidate_id,
+                    'cost': 1.0,
+                    'latitude': 32.0 + (c % 7) * 0.5,
+                    'longitude': -97.0 - c - d * 0.01,
+                }
+            self.demands.append(dmd)
+
+            function = distance_between.DistanceBetween('distance_between')
+            function.loc_a = customer
+            function.loc_z = dmd
+            operand = objective.Operand()
+            operand.operation = "product"
+            operand.weight = 1.0
+            operand.function = function
+            self.objective.operand_list.append(operand)
+
+    def _search(self):
+        self.request.cei.get_candidate_location.reset_mock()
+        best_path = self.fit_first.search(list(self.demands),
+                                          self.objective, self.request)
+        return (dict((name, candidate['candidate_id'])
+                     for name, candidate in best_path.decisions.items()),
+                best_path.total_value,
+                self.request.cei.get_candidate_location.call_count)
+
+    def test_search_picks_closest_candidates(self):
+        decisions, _, _ = self._search()
+        self.assertEqual(self.DEMANDS, len(decisions))
+        for d in range(self.DEMANDS):
+            # c0 of each demand sits closest to the customer
+            self.assertEqual('c{}-0'.format(d),
+                             decisions['demand_{}'.format(d)])
+
+    def test_search_incremental_matches_full_compute(self):
+        decisions, total_value, calls = self._search()
+
+        def _full_compute(_decision_path, _request, _prepared):
+            self.objective.compute(_decision_path, _request)
+
+        with mock.patch.object(self.objective, 'compute_delta',
+                               side_effect=_full_compute):
+            full_decisions, full_total_value, full_calls = self._search()
+
+        self.assertEqual(full_decisions, decisions)
+        self.assertAlmostEqual(full_total_value, total_value)
+        # Only the operand of the demand being decided is evaluated
+        # for each candidate.
+        self.assertLess(calls, full_calls)
+        self.assertEqual(self.DEMANDS * self.CANDIDATES +
+                         sum(range(self.DEMANDS)), calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test class for optimizer optimizer.py"""
+
+import copy
+import time
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from conductor.common import db_backend
+from conductor.solver.optimizer.constraints import attribute
+from conductor.solver.optimizer.constraints import constraint
+from conductor.solver.optimizer.constraints import vim_fit
+from conductor.solver.optimizer import optimizer
+from conductor.solver.request import demand
+from conductor.solver.request.functions import distance_between
+from conductor.solver.request import objective
+from conductor.solver.request import parser
+
+
+class _Dropping(constraint.Constraint):
+    """Path dependent constraint dropping one candidate"""
+
+    def __init__(self, _name, _demand_list, _candidate_id):
+        constraint.Constraint.__init__(self, _name, 'dropping', _demand_list)
+        self.candidate_id = _candidate_id
+
+    def solve(self, _decision_path, _candidate_list, _request):
+        return [c for c in _candidate_list
+                if c['candidate_id'] != self.candidate_id]
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        self.request = parser.Parser()
+        self.request.request_id = 'request-1'
+        self.request.plan_id = 'plan-1'
+        self.request.cei = mock.MagicMock()
+        self.request.cei.get_candidate_location.side_effect = \
+            lambda candidate: (candidate['latitude'],
+                               candidate['longitude'])
+
+        customer = demand.Location('customer_loc')
+        customer.value = (32.0, -97.0)
+        self.request.locations['customer_loc'] = customer
+        self.request.objective = objective.Objective()
+        self.request.objective.goal = "min"
+        self.request.objective.operation = "sum"
+
+        for name in ('vG', 'vGMuxInfra'):
+            dmd = demand.Demand(name)
+            for c in range(3):
+                candidate_id = '{}-{}'.format(name, c)
+                dmd.resources[candidate_id] = {
+                    'candidate_id': candidate_id,
+                    'cost': 1.0,
+                    'uniqueness': 'true',
+                    'latitude': 32.0 + c,
+                    'longitude': -97.0,
+                }
+            self.request.demands[name] = dmd
+
+            function = distance_between.DistanceBetween('distance_between')
+            function.loc_a = customer
+            function.loc_z = dmd
+            operand = objective.Operand()
+            operand.operation = "product"
+            operand.weight = 1.0
+            operand.function = function
+            self.request.objective.operand_list.append(operand)
+
+    @mock.patch('conductor.solver.triage_tool.triage_data.TriageData.'
+                'getSolution')
+    @mock.patch('conductor.common.music.model.base.Base.table_create')
+    @mock.patch('conductor.common.music.model.base.Base.insert')
+    def test_get_solution_without_copying_demands(self, insert_mock,
+                                                  table_create_mock,
+                                                  get_solution_mock):
+        db_backend.get_client()
+        remaining = self.request.demands['vG'].resources['vG-2']
+        opt = optimizer.Optimizer(cfg.CONF,
+                                  _requests={'plan-1': self.request})
+        with mock.patch.object(optimizer.copy, 'deepcopy',
+                               side_effect=AssertionError('deepcopy')):
+            solutions = opt.get_solution(2)
+
+        self.assertEqual(
+            [{'vG': 'vG-0', 'vGMuxInfra': 'vGMuxInfra-0'},
+             {'vG': 'vG-1', 'vGMuxInfra': 'vGMuxInfra-1'}],
+            [dict((name, candidate['candidate_id'])
+                  for name, candidate in solution.items())
+             for solution in solutions])
+        # Unique candidates of both solutions are gone, the remaining
+        # one is the candidate the request was parsed with.
+        self.assertEqual(['vG-2'],
+                         list(self.request.demands['vG'].resources))
+        self.assertIs(remaining,
+                      self.request.demands['vG'].resources['vG-2'])
+
+    @mock.patch('conductor.solver.triage_tool.triage_data.TriageData.'
+                'getSolution')
+    @mock.patch('conductor.common.music.model.base.Base.table_create')
+    @mock.patch('conductor.common.music.model.base.Base.insert')
+    def test_get_solution_stops_at_plan_timeout(self, insert_mock,
+                                                table_create_mock,
+                                                get_solution_mock):
+        db_backend.get_client()
+        begin_time = int(round(time.time())) - \
+            cfg.CONF.solver.solver_timeout - 1
+        opt = optimizer.Optimizer(cfg.CONF,
+                                  _requests={'plan-1': self.request},
+                                  _begin_time=begin_time)
+        self.assertEqual([], opt.get_solution(2))
+
+    @mock.patch('conductor.solver.triage_tool.triage_data.TriageData.'
+                'getSolution')
+    @mock.patch('conductor.common.music.model.base.Base.table_create')
+    @mock.patch('conductor.common.music.model.base.Base.insert')
+    def test_get_solution_memoizes_constraints(self, insert_mock,
+                                               table_create_mock,
+                                               get_solution_mock):
+        db_backend.get_client()
+        self.request.cei.batched = False
+        self.request.cei.get_candidates_by_attributes.side_effect = \
+            lambda demand_name, candidate_list, properties: \
+            list(candidate_list)
+        for name, dmd in self.request.demands.items():
+            dmd.constraint_list.append(attribute.Attribute(
+                'attribute_' + name, 'attribute', [name],
+                _properties={'global-customer-id': 'customer-123'}))
+
+        opt = optimizer.Optimizer(cfg.CONF,
+                                  _requests={'plan-1': self.request})
+        self.assertEqual(3, len(opt.get_solution(3)))
+        # Attributes are checked once per demand for all three searches
+        self.assertEqual(
+            2, self.request.cei.get_candidates_by_attributes.call_count)
+
+    @mock.patch('conductor.solver.triage_tool.triage_data.TriageData.'
+                'getSolution')
+    @mock.patch('conductor.common.music.model.base.Base.table_create')
+    @mock.patch('conductor.common.music.model.base.Base.insert')
+    def test_get_solution_resets_triage_state_of_memoized_candidates(
+            self, insert_mock, table_create_mock, get_solution_mock):
+        db_backend.get_client()
+        self.request.cei.batched = False
+        # The data service hands back copies of the candidates
+        self.request.cei.get_candidates_with_vim_capacity.side_effect = \
+            lambda candidate_list, vim_request: copy.deepcopy(candidate_list)
+        vim_capacity = vim_fit.VimFit('vim_fit_vG', 'vim_fit', ['vG'],
+                                      _properties={'request': {}})
+        self.request.demands['vG'].constraint_list.extend(
+            [vim_capacity, _Dropping('dropping', ['vG'], 'vG-2')])
+
+        opt = optimizer.Optimizer(cfg.CONF,
+                                  _requests={'plan-1': self.request})
+        self.assertEqual(2, len(opt.get_solution(2)))
+        memoized = vim_capacity.verdicts['vG'][(None, 'vG-2', None)]
+        # Each search drops the memoized copy, only the last one tells
+        self.assertEqual(
+            [{'constraint_name_dropped': 'dropping', 'name': 'vG'}],
+            [c for c in memoized['constraints']
+             if 'constraint_name_dropped' in c])
+
+    @mock.patch('conductor.solver.triage_tool.triage_data.TriageData.'
+                'getSolution')
+    @mock.patch('conductor.common.music.model.base.Base.table_create')
+    @mock.patch('conductor.common.music.model.base.Base.insert')
+    def test_presolve_constraints(self, insert_mock, table_create_mock,
+                                  get_solution_mock):
+        db_backend.get_client()
+
+        def _slow_attributes(demand_name, candidate_list, properties):
+            time.sleep(0.3)
+            return [c for c in candidate_list if c['candidate_id'] !=
+                    demand_name + '-0']
+
+        self.request.cei.batched = False
+        self.request.cei.get_candidates_by_attributes.side_effect = \
+            _slow_attributes
+        for name, dmd in self.request.demands.items():
+            dmd.constraint_list.append(attribute.Attribute(
+                'attribute_' + name, 'attribute', [name],
+                _properties={'global-customer-id': 'customer-123'}))
+
+        opt = optimizer.Optimizer(cfg.CONF,
+                                  _requests={'plan-1': self.request})
+        started_at = time.time()
+        opt.presolve_constraints()
+        # Both demands are solved at the same time
+        self.assertLess(time.time() - started_at, 0.55)
+        self.assertEqual(
+            2, self.request.cei.get_candidates_by_attributes.call_count)
+
+        solutions = opt.get_solution(1)
+        self.assertEqual({'vG': 'vG-1', 'vGMuxInfra': 'vGMuxInfra-1'},
+                         dict((name, candidate['candidate_id'])
+                              for name, candidate in solutions[0].items()))
+        self.assertEqual(
+            2, self.request.cei.get_candidates_by_attributes.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (C) 2019 IBM.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test class for optimizer search.py"""
+
+import copy
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from conductor.solver.optimizer.constraints.attribute import Attribute
+from conductor.solver.optimizer.constraints.threshold import Threshold
+from conductor.solver.optimizer.decision_path import DecisionPath
+from conductor.solver.optimizer.search import Search
+from conductor.solver.request.demand import Demand
+
+
+def candidates(count):
+    return [{'candidate_id': 'c{}'.format(i), 'inventory_type': 'cloud',
+             'location_id': 'region-{}'.format(i), 'latency': i,
+             'name': 'vG', 'node_id': 'vG|c{}'.format(i), 'constraints': []}
+            for i in range(count)]
+
+
+class TestSearch(unittest.TestCase):
+
+    @mock.patch('conductor.common.music.model.base.create_dynamic_model')
+    def setUp(self, create_dynamic_model):
+        self.search = Search(cfg.CONF)
+        self.decision_path = DecisionPath()
+        self.decision_path.current_demand = Demand('vG')
+
+    def test_dropped_candidate(self):
+        before = candidates(4)
+        # Constraints may hand back copies of the candidates they keep
+        after = [copy.deepcopy(before[0]), before[2]]
+        with mock.patch.object(self.search.triageSolver,
+                               'droppedCadidatesStatus') as dropped_status:
+            self.search.dropped_candidate(before, after, 'latency', 'vG')
+        dropped_status.assert_called_once_with([before[1], before[3]])
+        self.assertEqual([{'constraint_name_dropped': 'latency',
+                           'name': 'vG'}], before[1]['constraints'])
+        self.assertEqual([], before[0]['constraints'])
+
+    def test_threshold_filters_by_candidate(self):
+        threshold = Threshold('latency', 'threshold', ['vG'], _properties={
+            'evaluate': [{'attribute': 'latency', 'threshold': 2,
+                          'operator': 'lte'}]})
+        self.assertEqual(
+            ['c1', 'c2'],
+            [c['candidate_id'] for c in threshold.solve(
+                self.decision_path, candidates(5)[1:], None)])
+
+    def test_attribute_keeps_candidates_selected_as_copies(self):
+        candidate_list = candidates(3)
+        request = mock.MagicMock()
+        request.cei.batched = False
+        request.cei.get_candidates_by_attributes.return_value = [
+            dict(candidate_list[2], extra='field')]
+        attribute = Attribute('attribute', 'attribute', ['vG'],
+                              _properties={})
+        self.assertEqual([candidate_list[2]], attribute.solve(
+            self.decision_path, candidate_list, request))
+
+
+if __name__ == '__main__':
+    unittest.main()
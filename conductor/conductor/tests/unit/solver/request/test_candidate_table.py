@@ -0,0 +1,154 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the columnar candidate table"""
+
+import copy
+import json
+import operator
+import tracemalloc
+import unittest
+
+import mock
+import numpy as np
+
+from conductor.common.music.model import base
+from conductor.solver.optimizer.constraints import access_distance
+from conductor.solver.request import candidate_table
+from conductor.solver.request import demand
+
+
+def _candidate(i):
+    return {'candidate_id': 'region-{}'.format(i),
+            'inventory_provider': 'aai',
+            'inventory_type': 'cloud',
+            'cloud_owner': 'att-aic',
+            'cloud_region_version': '1.0',
+            'location_id': 'region-{}'.format(i),
+            'complex_name': 'complex-{}'.format(i % 10),
+            'city': 'Middletown',
+            'country': 'USA',
+            'latitude': str(32.0 + i % 5),
+            'longitude': '-97.0',
+            'cost': 1.0,
+            'uniqueness': 'true'}
+
+
+class TestCandidateTable(unittest.TestCase):
+
+    def setUp(self):
+        self.candidates = [_candidate(i) for i in range(3)]
+        self.table = candidate_table.CandidateTable(self.candidates)
+
+    def test_rows_read_like_candidates(self):
+        row = self.table['region-1']
+        self.assertEqual(self.candidates[1], row)
+        self.assertEqual(self.candidates[1], dict(row))
+        self.assertEqual('cloud', row['inventory_type'])
+        self.assertIsNone(row.get('node_id'))
+        self.assertNotIn('node_id', row)
+        self.assertNotEqual(self.table['region-0'], row)
+        self.assertIs(row, self.table['region-1'])
+        self.assertEqual(['region-0', 'region-1', 'region-2'],
+                         list(self.table))
+
+    def test_rows_are_written_in_place(self):
+        row = self.table['region-1']
+        row['node_id'] = 'vG|region-1'
+        row['constraints'] = []
+        del row['uniqueness']
+
+        self.assertEqual('vG|region-1', self.table['region-1']['node_id'])
+        self.assertNotIn('uniqueness', self.table['region-1'])
+        self.assertNotIn('node_id', self.table['region-0'])
+        self.assertIsInstance(copy.copy(row), dict)
+        self.assertEqual(dict(row), copy.deepcopy(row))
+
+    def test_pop_keeps_rows_in_use(self):
+        row = self.table.pop('region-1')
+        self.assertEqual(['region-0', 'region-2'], list(self.table))
+        self.assertEqual('region-1', row['candidate_id'])
+
+    def test_rows_encode_as_json(self):
+        encoded = json.dumps({'candidate_list': list(self.table.values())},
+                             default=base.json_default)
+        self.assertEqual({'candidate_list': self.candidates},
+                         json.loads(encoded))
+
+    def test_strings_are_interned(self):
+        table = candidate_table.CandidateTable(
+            json.loads(json.dumps([_candidate(i) for i in range(2)])))
+        self.assertIs(table['region-0']['city'], table['region-1']['city'])
+
+    def test_numeric_columns(self):
+        self.table['region-2']['latitude'] = 'unknown'
+        np.testing.assert_array_equal([32.0, 33.0, np.nan],
+                                      self.table.numeric('latitude'))
+        np.testing.assert_array_equal([[33.0, -97.0]],
+                                      self.table.coordinates([1]))
+
+    def test_table_is_smaller_than_candidate_dicts(self):
+        candidates = json.dumps([_candidate(i) for i in range(10000)])
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            dicts = json.loads(candidates)
+            dicts_size = tracemalloc.get_traced_memory()[0] - before
+            del dicts
+
+            before = tracemalloc.get_traced_memory()[0]
+            table = candidate_table.CandidateTable(json.loads(candidates))
+            table_size = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(10000, len(table))
+        self.assertLess(table_size, dicts_size / 2)
+
+
+class TestAccessDistanceOnTable(unittest.TestCase):
+
+    def test_solve_filters_table_rows(self):
+        dmd = demand.Demand('vG')
+        for i in range(5):
+            dmd.resources['region-{}'.format(i)] = _candidate(i)
+        # A candidate without coordinates is located by the data service
+        del dmd.resources['region-4']['latitude']
+        request = mock.MagicMock()
+        request.cei.get_candidate_location.return_value = (32.0, -97.0)
+        location = demand.Location('customer')
+        location.value = (32.0, -97.0)
+        constraint = access_distance.AccessDistance(
+            'near_customer', 'access_distance', ['vG'],
+            _comparison_operator=operator.le, _threshold=150,
+            _location=location)
+
+        solved = constraint.solve(None, list(dmd.resources.values()),
+                                  request)
+
+        # one degree of latitude is about 111 km
+        self.assertEqual(['region-0', 'region-1', 'region-4'],
+                         [c['candidate_id'] for c in solved])
+        self.assertIs(dmd.resources['region-0'], solved[0])
+        request.cei.get_candidate_location.assert_called_once_with(
+            dmd.resources['region-4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the cached latency rules"""
+
+import collections
+import unittest
+
+import mock
+
+from conductor.common import db_backend
+from conductor.common.models import country_latency
+from conductor.common.models import region_placeholders
+from conductor.common.models import table_version
+from conductor.common.music import api
+from conductor.common.music.model import base
+from conductor.solver.request import latency_rules
+from conductor.solver.request import parser
+
+
+class TestLatencyRules(unittest.TestCase):
+
+    def setUp(self):
+        self.db_api = getattr(db_backend, 'DB_API', None)
+        db_backend.DB_API = api.MockAPI()
+        db_backend.DB_API.keyspace_create('conductor')
+        models = [base.create_dynamic_model(
+            keyspace='conductor', baseclass=baseclass,
+            classname=baseclass.__name__)
+            for baseclass in (region_placeholders.RegionPlaceholders,
+                              country_latency.CountryLatency,
+                              table_version.TableVersion)]
+        self.RegionPlaceholders, self.CountryLatency, self.TableVersion = \
+            models
+        self.RegionPlaceholders('EMEA', {'EMEA': 'FRA,DEU'}).insert()
+        self.CountryLatency('USA', ['USA,MEX', 'EMEA', 'XYZW']).insert()
+        self.CountryLatency('*', ['USA', '*']).insert()
+        self.rules = latency_rules.LatencyRules(*models)
+        self.row_read = mock.patch.object(
+            db_backend.DB_API, 'row_read',
+            wraps=db_backend.DB_API.row_read).start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+        db_backend.DB_API = self.db_api
+
+    def test_rules_are_resolved_with_their_weights(self):
+        rules = self.rules.country_rules('USA')
+        self.assertFalse(rules.wildcard)
+        self.assertEqual(['USA,MEX', 'FRA,DEU'], rules.groups)
+        self.assertEqual(collections.OrderedDict(
+            [('USA', 0), ('MEX', 0), ('FRA', 1), ('DEU', 1)]), rules.weights)
+
+        rules = self.rules.country_rules('CAN')
+        self.assertTrue(rules.wildcard)
+        self.assertEqual({'USA': 0}, rules.weights)
+        self.assertEqual(1, rules.next_weight)
+
+    def test_tables_are_read_again_once_loaded(self):
+        self.rules.country_rules('USA')
+        self.rules.country_rules('CAN')
+        # the versions, then the two tables, then only the versions
+        self.assertEqual(4, self.row_read.call_count)
+
+        self.CountryLatency('CAN', ['CAN']).insert()
+        self.assertTrue(self.rules.country_rules('CAN').wildcard)
+        self.TableVersion.reload(self.CountryLatency, [
+            self.CountryLatency('CAN', ['CAN']),
+            self.CountryLatency('*', ['*'])])
+        self.row_read.reset_mock()
+
+        self.assertEqual(['CAN'], self.rules.country_rules('CAN').groups)
+        self.assertIsNone(self.rules.country_rules('USA').weights.get('MEX'))
+        self.assertEqual(4, self.row_read.call_count)
+
+
+class TestRuleWeights(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = parser.Parser()
+        self.parser.get_candidate_country_list = mock.MagicMock(
+            return_value=['USA', 'CAN', 'CAN'])
+        self.parser.drop_no_latency_rule_candidates = mock.MagicMock()
+
+    def test_unlisted_countries_come_last_with_wildcard(self):
+        rules = latency_rules.CountryRules(['USA,MEX', '*'], {})
+        self.assertEqual(collections.OrderedDict(
+            [('USA', 0), ('MEX', 0), ('CAN', 1)]),
+            self.parser.assign_rule_weights(rules))
+        self.parser.drop_no_latency_rule_candidates.assert_not_called()
+
+    def test_unlisted_countries_are_dropped_without_wildcard(self):
+        rules = latency_rules.CountryRules(['USA,MEX'], {})
+        self.assertEqual({'USA': 0, 'MEX': 0},
+                         self.parser.assign_rule_weights(rules))
+        self.parser.drop_no_latency_rule_candidates.assert_called_once_with(
+            ['CAN'])
+        # the cached weights are not changed by a plan
+        self.assertEqual(['USA', 'MEX'], list(rules.weights))
+
+
+if __name__ == '__main__':
+    unittest.main()
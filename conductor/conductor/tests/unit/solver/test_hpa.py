@@ -87,6 +87,45 @@ class TestHPA(unittest.TestCase):
                          self.hpa.solve(mock_decision_path,
                                         self.candidate_list, request_mock))
 
+    @mock.patch.object(hpa.LOG, 'error')
+    @mock.patch.object(hpa.LOG, 'info')
+    @mock.patch.object(cei.LOG, 'debug')
+    def test_solve_batched(self, debug_mock, info_mock, error_mock):
+        mock_decision_path = mock.MagicMock()
+        mock_decision_path.current_demand.name = 'vG'
+        request_mock = mock.MagicMock()
+        request_mock.plan_id = 'plan-1'
+        client_mock = mock.MagicMock()
+        request_mock.cei = cei.ConstraintEngineInterface(client_mock,
+                                                         batched=True)
+
+        candidate_list = copy.deepcopy(self.candidate_list)
+        candidate_list[1]['flavors'] = {'flavor': [{'flavor-id': 'f1'}]}
+        hpa_candidate = copy.deepcopy(self.candidate_list[1])
+        hpa_candidate['flavor_map'] = {'flavor_label_1': 'vim-flavor-1'}
+        client_mock.call.side_effect = [
+            {'missing': [c['candidate_id'] for c in candidate_list]},
+            {'candidate_list': [hpa_candidate]}]
+
+        response = self.hpa.solve(mock_decision_path, candidate_list,
+                                  request_mock)
+
+        # The resident flavors are put back on the selected candidate.
+        expected = copy.deepcopy(hpa_candidate)
+        expected['flavors'] = candidate_list[1]['flavors']
+        self.assertEqual([expected], response)
+
+        # Every vm label goes in the same call, flavors only on the retry.
+        self.assertEqual(2, client_mock.call.call_count)
+        first_args = client_mock.call.call_args_list[0][1]['args']
+        retry_args = client_mock.call.call_args_list[1][1]['args']
+        self.assertEqual(len(self.hpa.properties['evaluate']),
+                         len(first_args['requests']))
+        self.assertNotIn('flavors', first_args['candidate_list'][1])
+        self.assertEqual(candidate_list[1]['flavors'],
+                         retry_args['resident'][
+                             candidate_list[1]['candidate_id']]['flavors'])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2018 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for solution_cache"""
+
+import unittest
+
+import mock
+
+from conductor.solver import solution_cache
+
+
+def translation(plan_id, demands):
+    return {'conductor_solver': {'plan_id': plan_id, 'demands': demands}}
+
+
+class TestSolutionCache(unittest.TestCase):
+
+    def test_translation_key(self):
+        demands = {'vG': {'candidates': [{'candidate_id': 'region-1'}]}}
+        key = solution_cache.translation_key(
+            translation('plan-1', demands), ('v1', 'v1'), 1)
+        # Keys do not depend on the plan or the order of fields
+        self.assertEqual(key, solution_cache.translation_key(
+            translation('plan-2', dict(reversed(list(demands.items())))),
+            ('v1', 'v1'), 1))
+        self.assertNotEqual(key, solution_cache.translation_key(
+            translation('plan-1', demands), ('v2', 'v1'), 1))
+        self.assertNotEqual(key, solution_cache.translation_key(
+            translation('plan-1', {'vG': {'candidates': []}}),
+            ('v1', 'v1'), 1))
+
+    def test_solutions_are_copied(self):
+        cache = solution_cache.SolutionCache(2, 60)
+        solutions = [{'vG': {'candidate_id': 'region-1'}}]
+        cache.put('key', solutions)
+        solutions[0]['vG']['candidate_id'] = 'region-2'
+        cached = cache.get('key')
+        self.assertEqual([{'vG': {'candidate_id': 'region-1'}}], cached)
+        cached[0]['vG']['vim-id'] = 'vim-1'
+        self.assertEqual([{'vG': {'candidate_id': 'region-1'}}],
+                         cache.get('key'))
+
+    def test_least_recently_used_are_evicted(self):
+        cache = solution_cache.SolutionCache(2, 60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual([1, None, 3],
+                         [cache.get(key) for key in ('a', 'b', 'c')])
+
+    @mock.patch.object(solution_cache.time, 'time')
+    def test_solutions_expire(self, mock_time):
+        mock_time.return_value = 1000
+        cache = solution_cache.SolutionCache(2, 60)
+        cache.put('a', 1)
+        mock_time.return_value = 1059
+        self.assertEqual(1, cache.get('a'))
+        mock_time.return_value = 1060
+        self.assertIsNone(cache.get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
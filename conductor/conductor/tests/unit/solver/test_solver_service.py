@@ -0,0 +1,191 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the solver service plan scheduling"""
+
+import json
+import threading
+import time
+import unittest
+import uuid
+
+import mock
+from oslo_config import cfg
+
+from conductor.common import db_backend
+from conductor.common.models import order_lock
+from conductor.common.models import plan
+from conductor.common.music import api
+from conductor.common.music.model import base
+from conductor.solver import service
+from conductor.solver import solution_cache
+
+
+class TestSolverServiceScheduling(unittest.TestCase):
+    """Claim and solve plans against the Music mock backend"""
+
+    def setUp(self):
+        self.db_api = getattr(db_backend, 'DB_API', None)
+        self.addCleanup(setattr, db_backend, 'DB_API', self.db_api)
+        for name, value, group in (('keyspace', 'conductor', None),
+                                   ('concurrent', True, 'solver'),
+                                   ('delay_time', 0, None)):
+            cfg.CONF.set_override(name, value, group)
+            self.addCleanup(cfg.CONF.clear_override, name, group)
+
+        mock_api = api.MockAPI()
+        db_backend.DB_API = mock_api
+        mock_api.keyspace_create(cfg.CONF.keyspace)
+        mock_api.keyspace_create(cfg.CONF.messaging_server.keyspace)
+        self.Plan = base.create_dynamic_model(
+            keyspace=cfg.CONF.keyspace, baseclass=plan.Plan,
+            classname="Plan")
+        self.OrderLock = base.create_dynamic_model(
+            keyspace=cfg.CONF.keyspace, baseclass=order_lock.OrderLock,
+            classname="OrderLock")
+        self.solver = service.SolverService(
+            worker_id=1, conf=cfg.CONF, plan_class=self.Plan,
+            order_locks=self.OrderLock)
+        # SolverService connects to the configured backend, use the mock
+        db_backend.DB_API = mock_api
+
+    def _translated_plans(self, count):
+        return [self.Plan(str(uuid.uuid4()), 10, 1, None,
+                          status=self.Plan.TRANSLATED,
+                          translation={'conductor_solver': {}})
+                for _ in range(count)]
+
+    def _statuses(self):
+        return sorted(p.status for p in self.Plan.query.all())
+
+    @mock.patch.object(service.log_util, 'setThreadLoggerContext')
+    def test_claim_plans_up_to_limit(self, mock_log):
+        self._translated_plans(3)
+
+        claimed = self.solver._claim_plans(2)
+        self.assertEqual(2, len(claimed))
+        self.assertEqual([self.Plan.SOLVING] * 2 + [self.Plan.TRANSLATED],
+                         self._statuses())
+
+        # Plans claimed by a worker are not claimed again
+        claimed = self.solver._claim_plans(3)
+        self.assertEqual(1, len(claimed))
+        self.assertEqual([self.Plan.SOLVING] * 3, self._statuses())
+
+    def _plans_per_minute(self, concurrent_plans, count=24, solve_time=0.05):
+        cfg.CONF.set_override('concurrent_plans', concurrent_plans, 'solver')
+        self.addCleanup(cfg.CONF.clear_override, 'concurrent_plans',
+                        'solver')
+        self._translated_plans(count)
+
+        def _solve_plan(p):
+            # Stands in for the data service round trips of a plan
+            time.sleep(solve_time)
+            p.status = self.Plan.SOLVED
+            p.update(condition=self.solver.solving_status_condition)
+
+        self.solver.running = True
+        started_at = time.time()
+        with mock.patch.object(self.solver, '_solve_plan',
+                               side_effect=_solve_plan), \
+                mock.patch.object(service.log_util, 'setThreadLoggerFilter'), \
+                mock.patch.object(service.log_util, 'setThreadLoggerContext'):
+            runner = threading.Thread(target=self.solver.run)
+            runner.start()
+            while self._statuses() != [self.Plan.SOLVED] * count:
+                time.sleep(0.01)
+            elapsed = time.time() - started_at
+            self.solver.running = False
+            runner.join()
+        return count * 60 / elapsed
+
+    def test_concurrent_plans_throughput(self):
+        serial = self._plans_per_minute(1)
+        for p in self.Plan.query.all():
+            p.delete()
+        concurrent = self._plans_per_minute(8)
+        self.assertGreater(
+            concurrent, 3 * serial,
+            "{:.0f} plans/minute solving 8 plans at once, {:.0f} plans/minute "
+            "solving one plan at a time".format(concurrent, serial))
+
+    def _order_lock(self, conflict_id, status, is_spinup_completed=False):
+        return self.OrderLock(
+            id=conflict_id, plans={'plan-0': {'status': status}},
+            is_spinup_completed=is_spinup_completed)
+
+    def test_read_order_locks_in_bulk(self):
+        self.OrderLock.insert_many([
+            self._order_lock('c1', order_lock.OrderLock.UNDER_SPIN_UP),
+            self._order_lock('c2', order_lock.OrderLock.FAILED),
+            self._order_lock('c3', order_lock.OrderLock.COMPLETED, True)])
+
+        with mock.patch.object(db_backend.DB_API, 'row_read',
+                               side_effect=AssertionError('row read')):
+            order_locks = self.solver._read_order_locks(['c1', 'c2', 'c4'])
+        self.assertEqual(['c1'], list(order_locks))
+        # Records that failed to spin up are deleted
+        self.assertEqual(['c1', 'c3'], sorted(
+            lock.id for lock in self.OrderLock.query.all()))
+
+    def test_insert_order_locks_parks_plans_of_existing_records(self):
+        self.OrderLock.insert_many([
+            self._order_lock('c1', order_lock.OrderLock.UNDER_SPIN_UP)])
+        status = {'status': order_lock.OrderLock.UNDER_SPIN_UP}
+
+        self.assertTrue(self.solver._insert_order_locks([
+            self.OrderLock(id='c1', plans={'plan-1': status}),
+            self.OrderLock(id='c2', plans={'plan-1': status})]))
+        order_locks = self.solver._read_order_locks(['c1', 'c2'])
+        self.assertEqual(
+            {'status': order_lock.OrderLock.PARKED},
+            json.loads(order_locks['c1'].plans['plan-1']))
+        self.assertEqual(status, json.loads(order_locks['c2'].plans['plan-1']))
+
+    @mock.patch.object(service.log_util, 'setThreadLoggerContext')
+    @mock.patch.object(service.parser.Parser, 'parse_template')
+    @mock.patch.object(service.optimizer, 'Optimizer')
+    def test_plans_translated_the_same_are_solved_once(self, optimizer,
+                                                       parse_template,
+                                                       mock_log):
+        self.solver.solution_cache = solution_cache.SolutionCache(8, 60)
+        self.solver.latency_rules = mock.MagicMock(version=('v1', 'v1'))
+        solution = {'vG': {'candidate_id': 'service-1',
+                           'inventory_type': 'service'}}
+        optimizer.return_value.get_solution.return_value = [solution]
+        for plan_id in ('plan-1', 'plan-2'):
+            self.Plan('plan', 10, '1', None, status=self.Plan.TRANSLATED,
+                      translation={'conductor_solver': {
+                          'plan_id': plan_id, 'request_type': '',
+                          'locations': {}, 'demands': {}}})
+
+        with mock.patch.object(self.solver.cei, 'for_demands'):
+            for p in self.solver._claim_plans(2):
+                self.solver._solve_plan(p)
+        self.assertEqual(1, optimizer.call_count)
+        plans = self.Plan.query.all()
+        self.assertEqual([self.Plan.SOLVED] * 2, [p.status for p in plans])
+        self.assertEqual(plans[0].solution, plans[1].solution)
+        self.assertEqual(
+            'service-1',
+            plans[1].solution['recommendations'][0]['vG']['candidate']
+            ['candidate_id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2018 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for triage_data"""
+
+import json
+import mock
+import unittest
+
+from conductor.solver.triage_tool import triage_data
+from oslo_config import cfg
+
+
+class Constraint(object):
+    def __init__(self, name):
+        self.name = name
+        self.constraint_type = 'attribute'
+
+
+class Demand(object):
+    def __init__(self, name, constraints):
+        self.name = name
+        self.constraint_list = [Constraint(c) for c in constraints]
+
+
+def candidate(demand_name, candidate_id):
+    return {'candidate_id': candidate_id, 'name': demand_name,
+            'node_id': demand_name + '|' + candidate_id, 'constraints': []}
+
+
+class TestTriageData(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.object(triage_data.base, 'create_dynamic_model'):
+            self.triage = triage_data.TriageData()
+        self.row = mock.MagicMock()
+        self.triage.TriageTool.query.get_plan_by_col.return_value = [self.row]
+        self.demand = Demand('vG', ['c1', 'c2'])
+        self.triage.getSortedDemand([self.demand])
+
+    def tearDown(self):
+        cfg.CONF.clear_override('triage_granularity', 'solver')
+        cfg.CONF.clear_override('triage_sample_rate', 'solver')
+
+    def _solve(self, candidates):
+        """Drop candidate r2 at constraint c1, pass the others"""
+        self.triage.aasignNodeIdToCandidate(candidates, self.demand,
+                                            'request', 'plan-1')
+        dropped = candidates[2]
+        dropped['constraints'].append({'constraint_name_dropped': 'c1',
+                                       'name': 'vG'})
+        self.triage.droppedCadidatesStatus([dropped])
+        for name in ('c1', 'c2'):
+            self.triage.checkCandidateAfter({
+                'candidate_after_list': candidates[:2],
+                'constraint_name_for_can': name,
+                'solver_demand_name': 'vG'})
+
+    def test_full_triage(self):
+        candidates = [candidate('vG', 'r%d' % i) for i in range(3)]
+        self.triage.aasignNodeIdToCandidate(candidates, self.demand,
+                                            'request', 'plan-1')
+        # The same candidates, assigned again, are recorded once
+        self._solve(candidates)
+        self.assertEqual(3, len(self.triage.triage['candidates']))
+
+        self.triage.getSolution([{'vG': candidates[0]}])
+        children = json.loads(self.row.triage_solver)['children']
+        self.assertEqual(['vG|r0', 'vG|r1', 'vG|r2'],
+                         [c['node_id'] for c in children])
+        self.assertEqual(['solution', 'not tried', 'dropped'],
+                         [c['type'] for c in children])
+        self.assertEqual(['passed', 'passed'],
+                         [c['status'] for c in children[0]['constraints']
+                          if 'status' in c])
+        self.assertEqual('dropped', candidates[2]['status'])
+        self.row.update.assert_called_once_with()
+
+    def test_sampled_triage(self):
+        cfg.CONF.set_override('triage_granularity', 'sampled', 'solver')
+        cfg.CONF.set_override('triage_sample_rate', 4, 'solver')
+        with mock.patch.object(triage_data.base, 'create_dynamic_model'):
+            triage = triage_data.TriageData()
+        candidates = [candidate('vG', 'r%d' % i) for i in range(100)]
+        triage.aasignNodeIdToCandidate(candidates, self.demand,
+                                       'request', 'plan-1')
+        recorded = [c['node_id'] for c in triage.triage['candidates']]
+        self.assertTrue(0 < len(recorded) < 100)
+        self.assertEqual([c['node_id'] for c in candidates
+                          if triage._sampled(c['node_id'])], recorded)
+
+    def test_summary_triage(self):
+        cfg.CONF.set_override('triage_granularity', 'summary', 'solver')
+        with mock.patch.object(triage_data.base, 'create_dynamic_model'):
+            self.triage = triage_data.TriageData()
+        self.triage.TriageTool.query.get_plan_by_col.return_value = [self.row]
+        candidates = [candidate('vG', 'r%d' % i) for i in range(3)]
+        self._solve(candidates)
+        self.triage.rollBackStatus(self.demand, mock.MagicMock())
+        self.assertEqual([], self.triage.triage['candidates'])
+
+        self.triage.getSolution([{'vG': candidates[0]}])
+        self.assertEqual({
+            'summary': {'vG': {
+                'constraints': {'c1': {'passed': 2, 'dropped': 1},
+                                'c2': {'passed': 2, 'dropped': 0}},
+                'rollbacks': 1}},
+            'solutions': [{'vG': 'vG|r0'}]},
+            json.loads(self.row.triage_solver))
+
+
+if __name__ == '__main__':
+    unittest.main()
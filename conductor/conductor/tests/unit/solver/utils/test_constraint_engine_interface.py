@@ -0,0 +1,172 @@
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+"""Test classes for the constraint engine interface"""
+
+import unittest
+
+import mock
+
+from conductor.solver.optimizer import decision_path
+from conductor.solver.request import demand
+from conductor.solver.request.functions import distance_between
+from conductor.solver.request import objective
+from conductor.solver.utils import constraint_engine_interface as cei
+
+
+class TestConstraintEngineInterface(unittest.TestCase):
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.located = {'inventory_type': 'cloud',
+                        'candidate_id': 'DLLSTX55',
+                        'location_id': 'DLLSTX55',
+                        'complex_name': 'dalls_one',
+                        'latitude': '32.897480',
+                        'longitude': '-97.040443',
+                        'cost': 1.0}
+        self.unlocated = {'inventory_type': 'service',
+                          'candidate_id': 'service-1',
+                          'location_id': 'NYCNY55',
+                          'cost': 2.0}
+        vg = demand.Demand('vG')
+        vg.resources = {'DLLSTX55': self.located,
+                        'service-1': self.unlocated}
+        vgmux = demand.Demand('vGMuxInfra')
+        vgmux.resources = {'service-1': dict(self.unlocated)}
+        self.demands = {'vG': vg, 'vGMuxInfra': vgmux}
+
+    def test_for_demands_resolves_locations_once(self):
+        self.client.call.return_value = (40.7128, -74.0060)
+        shared = cei.ConstraintEngineInterface(self.client, batched=True)
+        indexed = shared.for_demands(self.demands)
+
+        self.assertIsNone(shared.candidate_index)
+        self.assertTrue(indexed.batched)
+        # Locations the candidates lack are only looked up when needed
+        self.client.call.assert_not_called()
+
+        # Lookups, even on copies of the candidates, hit the index
+        for _ in range(3):
+            self.assertEqual((32.897480, -97.040443),
+                             indexed.get_candidate_location(
+                                 dict(self.located)))
+            self.assertEqual((40.7128, -74.0060),
+                             indexed.get_candidate_location(
+                                 dict(self.unlocated)))
+            self.assertEqual('dalls_one', indexed.get_candidate_zone(
+                self.located, 'complex'))
+        self.assertEqual(1, self.client.call.call_count)
+
+    def test_costs_are_those_of_the_demand(self):
+        # The existing placement of vGMuxInfra costs less there only
+        self.demands['vGMuxInfra'].resources['service-1']['cost'] = 0.5
+        request = mock.MagicMock()
+        request.cei = cei.ConstraintEngineInterface(
+            self.client).for_demands(self.demands)
+        customer = demand.Location('customer_loc')
+        customer.value = (40.7128, -74.0060)
+
+        costs = []
+        for name, dmd in sorted(self.demands.items()):
+            operand = objective.Operand()
+            operand.operation = "sum"
+            operand.weight = 1.0
+            operand.function = distance_between.DistanceBetween(
+                'distance_between')
+            operand.function.loc_a = customer
+            operand.function.loc_z = dmd
+            path = decision_path.DecisionPath()
+            path.decisions = {name: dmd.resources['service-1']}
+            with mock.patch.object(request.cei, 'get_candidate_location',
+                                   return_value=customer.value):
+                costs.append(operand.compute(path, request))
+        self.assertEqual([2.0, 0.5], costs)
+
+    def test_zone_lookups_are_cached(self):
+        self.client.call.return_value = None
+        indexed = cei.ConstraintEngineInterface(
+            self.client).for_demands(self.demands)
+        self.client.call.reset_mock()
+        self.client.call.return_value = 'zone-a'
+
+        for _ in range(3):
+            self.assertEqual('zone-a', indexed.get_candidate_zone(
+                self.located, 'availability_zone'))
+        self.assertEqual(1, self.client.call.call_count)
+
+    def test_unindexed_candidates_fall_back(self):
+        self.client.call.return_value = (1.0, 2.0)
+        interface = cei.ConstraintEngineInterface(self.client)
+        self.assertEqual((32.897480, -97.040443),
+                         interface.get_candidate_location(self.located))
+        self.assertEqual('DLLSTX55', interface.get_candidate_zone(
+            self.located, 'region'))
+        self.assertEqual((1.0, 2.0),
+                         interface.get_candidate_location(self.unlocated))
+
+    def test_evaluate_candidates_sends_all_resident_fields(self):
+        candidates = [{'candidate_id': 'region-1', 'flavors': ['f1']},
+                      {'candidate_id': 'region-2', 'flavors': ['f2']}]
+        self.client.call.side_effect = [
+            {'missing': ['region-1']},
+            {'candidate_list': [{'candidate_id': 'region-2'}]}]
+        interface = cei.ConstraintEngineInterface(self.client, batched=True)
+
+        selected = interface.evaluate_candidates(
+            'plan-1', 'vG', candidates,
+            [interface.attributes_request('vG', {})])
+
+        self.assertEqual([{'candidate_id': 'region-2', 'flavors': ['f2']}],
+                         selected)
+        # The retry may reach a data worker missing other candidates
+        self.assertEqual(
+            {'region-1': {'flavors': ['f1']},
+             'region-2': {'flavors': ['f2']}},
+            self.client.call.call_args[1]['args']['resident'])
+
+    def test_evaluate_candidates_still_missing_are_checked_unbatched(self):
+        candidates = [{'candidate_id': 'region-1', 'flavors': ['f1']},
+                      {'candidate_id': 'region-2', 'flavors': ['f2']}]
+        self.client.call.side_effect = [
+            {'missing': ['region-1']},
+            {'missing': ['region-2']},
+            candidates[1:],
+            candidates[1:]]
+        interface = cei.ConstraintEngineInterface(self.client, batched=True)
+
+        selected = interface.evaluate_candidates(
+            'plan-1', 'vG', candidates,
+            [interface.attributes_request('vG', {}),
+             interface.vim_capacity_request({})])
+
+        self.assertEqual(candidates[1:], selected)
+        calls = self.client.call.call_args_list
+        self.assertEqual(['evaluate_candidates', 'evaluate_candidates',
+                          'get_candidates_by_attributes',
+                          'get_candidates_with_vim_capacity'],
+                         [call[1]['method'] for call in calls])
+        # Unbatched checks get the candidates with their resident fields
+        self.assertEqual(candidates,
+                         calls[2][1]['args']['candidate_list'])
+        self.assertEqual(candidates[1:],
+                         calls[3][1]['args']['candidate_list'])
+
+
+if __name__ == '__main__':
+    unittest.main()
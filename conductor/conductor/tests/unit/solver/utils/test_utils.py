@@ -16,7 +16,11 @@
 #
 # -------------------------------------------------------------------------
 #
+import operator
+import random
+import time
 import unittest
+
 import conductor.solver.utils.utils as utils
 
 class TestUtils(unittest.TestCase):
@@ -30,5 +34,48 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(1.242742, utils.convert_km_to_miles(2.0))
         self.assertEqual(2.0, utils.convert_miles_to_km(1.242742))
 
+    def _random_locations(self, count):
+        rnd = random.Random(42)
+        return [(rnd.uniform(-90, 90), rnd.uniform(-180, 180))
+                for _ in range(count)]
+
+    def test_air_distances_match_scalar(self):
+        src = (32.897480, -97.040443)
+        dsts = self._random_locations(100) + [src]
+        distances = utils.compute_air_distances(src, dsts)
+        self.assertEqual(len(dsts), len(distances))
+        for dst, distance in zip(dsts, distances):
+            self.assertAlmostEqual(utils.compute_air_distance(src, dst),
+                                   distance, places=6)
+        self.assertEqual(0.0, distances[-1])
+
+    def test_air_distance_matrix(self):
+        srcs = self._random_locations(5)
+        dsts = self._random_locations(3)
+        matrix = utils.compute_air_distance_matrix(srcs, dsts)
+        self.assertEqual((5, 3), matrix.shape)
+        for i, src in enumerate(srcs):
+            for j, dst in enumerate(dsts):
+                self.assertAlmostEqual(utils.compute_air_distance(src, dst),
+                                       matrix[i][j], places=6)
+        self.assertEqual((0, 3),
+                         utils.compute_air_distance_matrix([], dsts).shape)
+
+    def test_air_distances_benchmark(self):
+        src = (32.897480, -97.040443)
+        dsts = self._random_locations(10000)
+
+        started_at = time.time()
+        loop_mask = [operator.le(utils.compute_air_distance(src, dst), 5000)
+                     for dst in dsts]
+        loop_elapsed = time.time() - started_at
+
+        started_at = time.time()
+        mask = operator.le(utils.compute_air_distances(src, dsts), 5000)
+        vector_elapsed = time.time() - started_at
+
+        self.assertEqual(loop_mask, mask.tolist())
+        self.assertLess(vector_elapsed, loop_elapsed)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+"""Time filtering candidates by a constraint
+
+Solves a threshold constraint dropping half of the candidates, then
+lists the dropped candidates for the triage tool, the way the solver
+did before (list membership of candidates) and the way it does now
+(sets of candidate keys):
+
+    python tools/constraint_filter_benchmark.py --candidates 1000 5000 20000
+
+The former takes quadratic time, so it is skipped beyond
+--max-quadratic candidates.
+"""
+
+import argparse
+import time
+
+import mock
+
+from conductor.solver.optimizer.constraints.threshold import Threshold
+from conductor.solver.optimizer.decision_path import DecisionPath
+from conductor.solver.optimizer.search import Search
+from conductor.solver.request.demand import Demand
+
+PROPERTIES = {'evaluate': [
+    {'attribute': 'latency', 'threshold': 50, 'operator': 'lte'}]}
+
+
+def candidates(count):
+    return [{'candidate_id': 'candidate-{}'.format(i),
+             'inventory_type': 'cloud',
+             'location_id': 'region-{}'.format(i),
+             'cloud_owner': 'owner', 'cost': 1.0, 'latency': i % 100,
+             'name': 'vG', 'node_id': 'vG|candidate-{}'.format(i),
+             'constraints': []} for i in range(count)]
+
+
+def by_membership(candidate_list):
+    """Filter and list the dropped candidates the way the solver did"""
+    conflict_list = [c for c in candidate_list if c['latency'] > 50]
+    after = [c for c in candidate_list if c not in conflict_list]
+    return [c for c in candidate_list if c not in after]
+
+
+def by_key(search, decision_path, candidate_list):
+    threshold = Threshold('latency', 'threshold', ['vG'],
+                          _properties=PROPERTIES)
+    after = threshold.solve(decision_path, candidate_list, None)
+    search.dropped_candidate(candidate_list, after, 'latency', 'vG')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candidates', type=int, nargs='+',
+                        default=[1000, 5000, 20000],
+                        help='candidates of the demand')
+    parser.add_argument('--max-quadratic', type=int, default=5000,
+                        help='most candidates to time list membership for')
+    args = parser.parse_args()
+
+    with mock.patch('conductor.common.music.model.base.create_dynamic_model'):
+        search = Search(None)
+    search.triageSolver.droppedCadidatesStatus = lambda dropped: None
+    decision_path = DecisionPath()
+    decision_path.current_demand = Demand('vG')
+
+    print("{:>10} {:>14} {:>14}".format(
+        'candidates', 'membership (s)', 'keys (s)'))
+    for count in args.candidates:
+        membership = '-'
+        if count <= args.max_quadratic:
+            candidate_list = candidates(count)
+            started_at = time.time()
+            by_membership(candidate_list)
+            membership = '{:.3f}'.format(time.time() - started_at)
+        candidate_list = candidates(count)
+        started_at = time.time()
+        by_key(search, decision_path, candidate_list)
+        print("{:>10} {:>14} {:>14.3f}".format(
+            count, membership, time.time() - started_at))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+"""Time the codecs of JSON columns on plan translations
+
+Builds a translation of cloud candidates with their HPA flavors, as the
+controller stores it for the solver, and times encoding it and decoding
+it as a plan column with each available codec, e.g.:
+
+    python tools/json_codec_benchmark.py --candidates 5000
+"""
+
+import argparse
+import time
+
+from oslo_config import cfg
+
+from conductor.common.music.model import base
+
+
+def flavor(i):
+    return {
+        'flavor-id': 'flavor-id-{}'.format(i),
+        'flavor-name': 'flavor.{}'.format(i),
+        'flavor-vcpus': 4,
+        'flavor-ram': 8192,
+        'flavor-disk': 40,
+        'hpa-capabilities': {'hpa-capability': [{
+            'hpa-capability-id': 'hpa-capability-{}-{}'.format(i, j),
+            'hpa-feature': 'basicCapabilities',
+            'hpa-version': 'v1',
+            'architecture': 'generic',
+            'hpa-feature-attributes': [
+                {'hpa-attribute-key': 'numVirtualCpu',
+                 'hpa-attribute-value': '{"value": 4}'},
+                {'hpa-attribute-key': 'virtualMemSize',
+                 'hpa-attribute-value': '{"value": 8, "unit": "GB"}'}],
+        } for j in range(3)]},
+    }
+
+
+def candidate(i, flavors):
+    return {
+        'candidate_id': 'cloud-region-{}'.format(i),
+        'inventory_provider': 'aai',
+        'inventory_type': 'cloud',
+        'cost': 1.0,
+        'uniqueness': 'true',
+        'location_id': 'cloud-region-{}'.format(i),
+        'location_type': 'att_aic',
+        'cloud_owner': 'att-aic',
+        'cloud_region_version': '1.1',
+        'physical_location_id': 'DLLSTX{:04d}'.format(i % 1000),
+        'complex_name': 'dalls_{}'.format(i % 1000),
+        'latitude': '{:.6f}'.format(32.0 + i % 90 / 10.0),
+        'longitude': '{:.6f}'.format(-97.0 + i % 90 / 10.0),
+        'city': 'Dallas',
+        'state': 'TX',
+        'country': 'USA',
+        'region': 'US',
+        'vim-id': 'att-aic_cloud-region-{}'.format(i),
+        'flavors': {'flavor': [flavor(f) for f in range(flavors)]},
+    }
+
+
+def translation(candidates, flavors, demands=('vG', 'vGMuxInfra')):
+    return {'conductor_solver': {
+        'version': '2020-08-13',
+        'plan_id': 'b0c0ffee-0000-4000-8000-000000000000',
+        'request_type': '',
+        'locations': {'customer_loc': {'latitude': 32.89748,
+                                       'longitude': -97.040443,
+                                       'country': 'USA'}},
+        'demands': dict(
+            (name, {'candidates': [candidate(i, flavors)
+                                   for i in range(candidates)]})
+            for name in demands),
+        'constraints': {
+            'distance-vG': {'type': 'distance_to_location',
+                            'demands': ['vG'],
+                            'properties': {
+                                'distance': {'operator': '<',
+                                             'value': 100,
+                                             'unit': 'km'},
+                                'location': 'customer_loc'}}},
+        'objective': {'minimize': {'sum': [
+            {'product': [1, {'distance_between': ['customer_loc', name]}]}
+            for name in demands]}},
+    }}
+
+
+class Row(object):
+    translation = base.JSONPayload('translation')
+
+
+def decode(text):
+    row = Row()
+    row._raw_payloads = {'translation': text}
+    return row.translation
+
+
+def timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started_at = time.time()
+        result = function()
+        elapsed = time.time() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=2000,
+                        help='cloud candidates per demand')
+    parser.add_argument('--flavors', type=int, default=10,
+                        help='flavors per cloud candidate')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs of which the best one is reported')
+    args = parser.parse_args()
+
+    value = translation(args.candidates, args.flavors)
+    print("{:<8} {:>10} {:>12} {:>12}".format(
+        'codec', 'size (MB)', 'encode (ms)', 'decode (ms)'))
+    for name, codec in sorted(base.JSON_CODECS.items()):
+        cfg.CONF.set_override('json_codec', name, 'db_options')
+        encode_time, text = timed(lambda: codec.dumps(value), args.repeat)
+        decode_time, _ = timed(lambda: decode(text), args.repeat)
+        print("{:<8} {:>10.1f} {:>12.1f} {:>12.1f}".format(
+            name, len(text) / 1e6, encode_time * 1000, decode_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
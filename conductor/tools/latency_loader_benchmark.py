@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------
+#   Copyright (c) 2015-2017 AT&T Intellectual Property
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# -------------------------------------------------------------------------
+#
+
+"""Time uploads of country latency rules
+
+Loads country latency rules the way the loader did before it wrote
+them in bulk (reading the table, then deleting and inserting one row at
+a time) and the way it does now (TableVersion.reload). The in-memory
+backend waits --latency milliseconds per round trip, a bulk write
+taking one round trip per --batch rows, like an etcd transaction:
+
+    python tools/latency_loader_benchmark.py --rows 10000
+"""
+
+import argparse
+import math
+import time
+import uuid
+
+from conductor.common import db_backend
+from conductor.common.models import country_latency
+from conductor.common.models import table_version
+from conductor.common.music import api
+from conductor.common.music.model import base
+
+KEYSPACE = 'conductor'
+
+
+class RemoteAPI(api.MockAPI):
+    """In-memory backend counting and waiting for round trips"""
+
+    def __init__(self, latency, batch):
+        super(RemoteAPI, self).__init__()
+        self.latency = latency
+        self.batch = batch
+        self.round_trips = 0
+
+    def _wait(self, round_trips=1):
+        self.round_trips += round_trips
+        time.sleep(self.latency * round_trips)
+
+    def row_create(self, *args, **kwargs):
+        self._wait()
+        return super(RemoteAPI, self).row_create(*args, **kwargs)
+
+    def row_read(self, *args, **kwargs):
+        self._wait()
+        return super(RemoteAPI, self).row_read(*args, **kwargs)
+
+    def row_delete(self, *args, **kwargs):
+        self._wait()
+        return super(RemoteAPI, self).row_delete(*args, **kwargs)
+
+    def rows_create(self, keyspace, table, pk_name, rows):
+        self._wait(math.ceil(len(rows) / self.batch))
+        return super(RemoteAPI, self).rows_create(keyspace, table, pk_name,
+                                                  rows)
+
+    def rows_delete(self, keyspace, table, pk_name, pk_values):
+        self._wait(math.ceil(len(pk_values) / self.batch))
+        return super(RemoteAPI, self).rows_delete(keyspace, table, pk_name,
+                                                  pk_values)
+
+
+def rules(model, count):
+    return [model(
+        'C{:05d}'.format(i), ['USA,MEX', 'CAN', '*']) for i in range(count)]
+
+
+def row_by_row(model, rows):
+    """Reload the table the way the loader did it before"""
+    for row in model.query.all():
+        model().delete(row.id)
+    for row in rows:
+        row.insert()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='country latency rules per upload')
+    parser.add_argument('--latency', type=float, default=1.0,
+                        help='milliseconds per round trip to the backend')
+    parser.add_argument('--batch', type=int, default=128,
+                        help='rows per bulk round trip')
+    args = parser.parse_args()
+
+    print("{:<12} {:>12} {:>12}".format('loader', 'round trips', 'time (s)'))
+    for name in ('row by row', 'bulk'):
+        db_backend.DB_API = RemoteAPI(args.latency / 1000.0, args.batch)
+        db_backend.DB_API.keyspace_create(KEYSPACE)
+        model = base.create_dynamic_model(
+            keyspace=KEYSPACE, baseclass=country_latency.CountryLatency,
+            classname='CountryLatency')
+        versions = base.create_dynamic_model(
+            keyspace=KEYSPACE, baseclass=table_version.TableVersion,
+            classname='TableVersion')
+        # the upload replaces the rules of a previous one
+        previous = rules(model, args.rows)
+        for row in previous:
+            row.id = str(uuid.uuid4())
+        model.insert_many(previous)
+
+        uploaded = rules(model, args.rows)
+        db_backend.DB_API.round_trips = 0
+        started_at = time.time()
+        if name == 'bulk':
+            versions.reload(model, uploaded)
+        else:
+            row_by_row(model, uploaded)
+        print("{:<12} {:>12} {:>12.1f}".format(
+            name, db_backend.DB_API.round_trips, time.time() - started_at))
+
+
+if __name__ == '__main__':
+    main()